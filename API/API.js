@@ -5,6 +5,7 @@ const mariadb = require('mariadb');
 const fs = require('fs');
 const bcrypt = require('bcryptjs');
 const cors = require('cors');
+const { searchTerms } = require('./searchTerms');
 app.use(cors());
 
 //hashing function
@@ -16,6 +17,27 @@ async function hashString(input, saltRounds = 10) {
     }
 }
 
+//discount as a percentage of the initial price, as stored in Product_Retailer.discount_pct
+function discountPct(initial_price, final_price) {
+    if (!(initial_price > 0)) {
+        return 0;
+    }
+    return Math.round((initial_price - final_price) / initial_price * 10000) / 100;
+}
+
+//rewrites the Search_Term rows of a product from its title, brand and category
+async function indexProduct(conn, product_id) {
+    await conn.query("DELETE FROM Search_Term WHERE product_id = ?", [product_id]);
+    const rows = await conn.query("SELECT P.title, B.name, C.cat_name FROM Product AS P LEFT JOIN Brand AS B ON B.id = P.brand_id LEFT JOIN Category AS C ON C.id = P.category_id WHERE P.id = ?", [product_id]);
+    if (rows.length === 0) {
+        return;
+    }
+    const terms = searchTerms([rows[0].title, rows[0].name || '', rows[0].cat_name || ''].join(' '));
+    if (terms.length > 0) {
+        await conn.query(`INSERT INTO Search_Term (term, product_id) VALUES ${terms.map(() => '(?,?)').join(', ')}`, terms.flatMap(term => [term, product_id]));
+    }
+}
+
 //variables for connections
 const port = 3000;
 //Pooling database connection for quick connections
@@ -73,13 +95,22 @@ app.post('/Get/Products', express.json(), async (req, res) => {
             }
             if (filters['search']) {
                 const search = filters['search'];
-                where.push(`title LIKE ?`);
-                values.push(`%${search}%`);
+                const terms = searchTerms(search);
+                if (terms.length > 0) {
+                    //every word must prefix-match an indexed term of the product (an index range scan on Search_Term)
+                    for (const term of terms) {
+                        where.push(`P.id IN (SELECT product_id FROM Search_Term WHERE term LIKE ?)`);
+                        values.push(`${term}%`);
+                    }
+                } else {
+                    where.push(`title LIKE ?`);
+                    values.push(`%${search}%`);
+                }
             }
         }
 
         
-        let baseQuery = "SELECT P.id, P.image_url, P.title, PR.final_price, PR.initial_price, R.name, R.id AS rID, ((PR.initial_price - PR.final_price)/PR.initial_price) AS Discount, AVG(RT.score) AS Rating, B.name AS brand, C.cat_name, CASE WHEN EXISTS (SELECT 1 FROM Watchlist_Item WHERE user_id = ? AND product_id = P.id) THEN TRUE ELSE FALSE END AS watchlist FROM Product AS P INNER JOIN Product_Retailer AS PR ON P.id = PR.product_id INNER JOIN Retailer AS R ON R.id = PR.retailer_id INNER JOIN Brand AS B ON B.id = P.brand_id INNER JOIN Category AS C ON C.id = P.category_id LEFT JOIN Review AS RT ON RT.product_id = P.id";
+        let baseQuery = "SELECT P.id, P.image_url, P.title, PR.final_price, PR.initial_price, R.name, R.id AS rID, PR.discount_pct AS Discount, AVG(RT.score) AS Rating, B.name AS brand, C.cat_name, CASE WHEN EXISTS (SELECT 1 FROM Watchlist_Item WHERE user_id = ? AND product_id = P.id) THEN TRUE ELSE FALSE END AS watchlist FROM Product AS P INNER JOIN Product_Retailer AS PR ON P.id = PR.product_id INNER JOIN Retailer AS R ON R.id = PR.retailer_id INNER JOIN Brand AS B ON B.id = P.brand_id INNER JOIN Category AS C ON C.id = P.category_id LEFT JOIN Review AS RT ON RT.product_id = P.id";
         if (where.length > 0) {
             baseQuery += " WHERE " + where.join(" AND ");
         }
@@ -99,16 +130,13 @@ app.post('/Get/Products', express.json(), async (req, res) => {
             }
         }
 
-        let ORDERQuery = "ORDER BY RAND()";
-        if (orderConditions.length > 0) {
-            ORDERQuery += `, ${orderConditions.join(", ")}`;
-        }
-
-        baseQuery += ` ${ORDERQuery}`;
+        //shuffle_rank is a random key stored by the data pipeline, so the "random" order is an index scan instead of a filesort over RAND()
+        orderConditions.push("PR.shuffle_rank");
+        baseQuery += ` ORDER BY ${orderConditions.join(", ")}`;
         
         if (req.body['limit']) {
             values.push(req.body['limit']);
-            baseQuery += `LIMIT ?`;
+            baseQuery += ` LIMIT ?`;
         }
 
         const rows = await conn.query(baseQuery, values);
@@ -124,7 +152,7 @@ app.post('/Get/Products', express.json(), async (req, res) => {
                "retailer_id": product.rID,
                "rating": product.Rating,
                "initial_price": product.initial_price,
-               "discount": Math.floor((product.Discount * 100 )),
+               "discount": Math.floor(product.Discount),
                "watchlist": product.watchlist
             })
         });
@@ -1213,6 +1241,7 @@ app.post('/Add/Product', express.json(), async (req, res) => {
             return;
         }
         const pid = inserted.insertId;
+        await indexProduct(conn, pid);
 
         var values = [];
         placeholder = "";
@@ -1224,12 +1253,13 @@ app.post('/Add/Product', express.json(), async (req, res) => {
                 return;
             }
 
-            placeholder += "(?,?,?,?,?), ";
+            placeholder += "(?,?,?,?,?,?,FLOOR(RAND() * 2147483647)), ";
             values.push(pid);
             values.push(retailer_id);
             values.push("Dummy Link");
             values.push(initial_price);
             values.push(final_price);
+            values.push(discountPct(initial_price, final_price));
         }
         if(values.length == 0){
             res.status(200).send({status: "error", message: "product successfully added, but no retailers specified"});
@@ -1237,7 +1267,7 @@ app.post('/Add/Product', express.json(), async (req, res) => {
         }
         placeholder = placeholder.slice(0, -2);
 
-        const baseQuery = `INSERT INTO Product_Retailer VALUES ${placeholder}`
+        const baseQuery = `INSERT INTO Product_Retailer (product_id, retailer_id, product_url, initial_price, final_price, discount_pct, shuffle_rank) VALUES ${placeholder}`
         await conn.query(baseQuery, values);
         await conn.commit(); 
 
@@ -1465,6 +1495,7 @@ app.post('/Update/Product', express.json(), async (req, res) => {
             res.status(409).send({status: "error", message:"An unexpected amount of rows was updated into the database investigate immeaditely"});
             return;
         }
+        await indexProduct(conn, product_id);
 
         for (const detail of retail_details) {
             var values = [];
@@ -1479,11 +1510,12 @@ app.post('/Update/Product', express.json(), async (req, res) => {
             if(exists.length != 0){
                 values.push(initial_price);
                 values.push(final_price);
+                values.push(discountPct(initial_price, final_price));
                 values.push("Dummy Link");
                 values.push(product_id);
                 values.push(retailer_id);
                 
-                await conn.query("UPDATE Product_Retailer SET initial_price = ?, final_price = ?, product_url = ? WHERE product_id = ? AND retailer_id = ?", values);
+                await conn.query("UPDATE Product_Retailer SET initial_price = ?, final_price = ?, discount_pct = ?, product_url = ? WHERE product_id = ? AND retailer_id = ?", values);
             }
             else{
                 values.push(product_id);
@@ -1491,8 +1523,9 @@ app.post('/Update/Product', express.json(), async (req, res) => {
                 values.push("Dummy Link");
                 values.push(initial_price);
                 values.push(final_price);
+                values.push(discountPct(initial_price, final_price));
 
-                await conn.query("INSERT INTO Product_Retailer VALUES(?,?,?,?,?)", values);
+                await conn.query("INSERT INTO Product_Retailer (product_id, retailer_id, product_url, initial_price, final_price, discount_pct, shuffle_rank) VALUES(?,?,?,?,?,?,FLOOR(RAND() * 2147483647))", values);
             }
         }
         await conn.commit();
@@ -1581,6 +1614,7 @@ app.post('/Remove/Product', express.json(), async (req, res) => {
         await conn.query("DELETE FROM Watchlist_Item WHERE product_id = ?", [product_id]);
         await conn.query("DELETE FROM Product_Retailer WHERE product_id = ?", [product_id]);
         await conn.query("DELETE FROM Review WHERE product_id = ?", [product_id]);
+        await conn.query("DELETE FROM Search_Term WHERE product_id = ?", [product_id]);
         const updated = await conn.query('DELETE FROM Product WHERE id = ?', [product_id]);
         await conn.commit();
 
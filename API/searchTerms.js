@@ -0,0 +1,21 @@
+//search index terms, normalised by the same rule as data-manipulation/scripts/search_index.py and checked against the
+//same vectors (data-manipulation/tests/search_terms_vectors.json, see test/searchTerms.test.js):
+//NFKD, every mark (\p{M}) removed, lowercased; words are runs of letters and numbers (\p{L}\p{N});
+//words shorter than 2 code points and stopwords are dropped, the rest are cut to 64 code points (never UTF-16 units)
+const MIN_TERM_LENGTH = 2;
+const MAX_TERM_LENGTH = 64;
+const STOPWORDS = new Set(['and', 'the', 'for', 'with', 'of', 'to', 'in', 'on', 'by', 'or', 'at', 'from']);
+
+function searchTerms(text) {
+    const words = String(text).normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+    const terms = new Set();
+    for (const word of words) {
+        const codePoints = Array.from(word);
+        if (codePoints.length >= MIN_TERM_LENGTH && !STOPWORDS.has(word)) {
+            terms.add(codePoints.slice(0, MAX_TERM_LENGTH).join(''));
+        }
+    }
+    return [...terms];
+}
+
+module.exports = { searchTerms, MIN_TERM_LENGTH, MAX_TERM_LENGTH, STOPWORDS };
@@ -0,0 +1,22 @@
+//checks searchTerms against the vectors the Python indexer is tested with, run with: npm test
+const test = require('node:test');
+const assert = require('node:assert');
+const fs = require('fs');
+const path = require('path');
+const { searchTerms } = require('../searchTerms');
+
+const VECTORS = path.join(__dirname, '..', '..', 'data-manipulation', 'tests', 'search_terms_vectors.json');
+
+for (const vector of JSON.parse(fs.readFileSync(VECTORS, 'utf8'))) {
+    test(vector.name, () => {
+        //sorted by code point, as Python sorts them
+        const byCodePoint = (a, b) => {
+            const x = Array.from(a).map(c => c.codePointAt(0)), y = Array.from(b).map(c => c.codePointAt(0));
+            for (let i = 0; i < Math.min(x.length, y.length); i++) {
+                if (x[i] !== y[i]) return x[i] - y[i];
+            }
+            return x.length - y.length;
+        };
+        assert.deepStrictEqual(searchTerms(vector.text).sort(byCodePoint), vector.terms);
+    });
+}
@@ -0,0 +1,71 @@
+"""
+Throughput benchmark for the price conversion in scripts/6currency.py.
+
+Repeats the rows of original-data/prices.sql to the requested count and converts them with the
+vectorised fixed-point path and with the old per-row float loop, reporting rows/s for each and
+how many cents the two disagree on.
+
+Usage: python benchmarks/bench_currency.py [--rows 10000000]
+"""
+from pathlib import Path
+import argparse
+import importlib.util
+import sys
+import time
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / 'scripts'))
+
+import numpy as np
+
+from sqlcodec import decode
+from sqltokenizer import iter_tuples
+
+spec = importlib.util.spec_from_file_location('currency', BASE_DIR / 'scripts' / '6currency.py')
+currency = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(currency)
+
+def float_loop(initial, final, currencies, rates):
+    """The original conversion: Python floats, one row at a time, rounded to 2 places"""
+    return [
+        (round(float(i) * rates.get(c, 1.0), 2), round(float(f) * rates.get(c, 1.0), 2))
+        for i, f, c in zip(initial, final, currencies)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure price conversion throughput")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="number of price rows to convert")
+    parser.add_argument('--loop-rows', type=int, default=1_000_000, help="rows to convert with the float loop")
+    args = parser.parse_args()
+
+    template = list(iter_tuples(BASE_DIR / 'original-data' / 'prices.sql'))
+    rows = [template[i % len(template)] for i in range(args.rows)]
+    initial = [row[0] for row in rows]
+    final = [row[1] for row in rows]
+    currencies = [decode(row[2]) for row in rows]
+    rates = currency.load_rates()
+
+    start = time.perf_counter()
+    for offset in range(0, args.rows, currency.BLOCK_ROWS):
+        end = offset + currency.BLOCK_ROWS
+        initial_cents, final_cents = currency.convert_block(initial[offset:end], final[offset:end], currencies[offset:end], rates, {})
+    vector_time = time.perf_counter() - start
+
+    loop_rows = min(args.loop_rows, args.rows)
+    float_rates = {name: rate / currency.RATE_SCALE for name, rate in rates.items()}
+    start = time.perf_counter()
+    expected = float_loop(initial[:loop_rows], final[:loop_rows], currencies[:loop_rows], float_rates)
+    loop_time = time.perf_counter() - start
+
+    check_rows = min(loop_rows, currency.BLOCK_ROWS)
+    initial_cents, final_cents = currency.convert_block(initial[:check_rows], final[:check_rows], currencies[:check_rows], rates, {})
+    expected_cents = np.rint(np.array(expected[:check_rows]) * 100).astype(np.int64)
+    differences = int(np.count_nonzero(expected_cents[:, 0] != initial_cents) + np.count_nonzero(expected_cents[:, 1] != final_cents))
+
+    print(f"✅ {args.rows:,} rows")
+    print(f"📊 fixed-point: {args.rows / vector_time:,.0f} rows/s ({vector_time:.2f}s)")
+    print(f"📊 float loop:  {loop_rows / loop_time:,.0f} rows/s (on {loop_rows:,} rows)")
+    print(f"📊 {differences} of {2 * check_rows:,} prices differ by float rounding drift")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark for the Product_Retailer generator in scripts/product_retailers.py.
+
+Generates relationships for the requested number of products with the vectorised NumPy generator
+(written to a temporary table) and with the original per-product random loop, reporting
+products/s and rows/s for each.
+
+Usage: python benchmarks/bench_product_retailers.py [--products 1000000] [--loop-products 100000]
+"""
+from pathlib import Path
+import argparse
+import importlib.util
+import random
+import sys
+import tempfile
+import time
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / 'scripts'))
+
+import numpy as np
+
+from columnstore import TableWriter
+
+spec = importlib.util.spec_from_file_location('product_retailers', BASE_DIR / 'scripts' / 'product_retailers.py')
+product_retailers = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(product_retailers)
+
+def load_retailers():
+    """(id, name, url) for every line of original-data/retailers.txt"""
+    with open(BASE_DIR / 'original-data' / 'retailers.txt', 'r', encoding='utf-8') as f:
+        pairs = [line.split('=', 1) for line in f if '=' in line]
+    return [(i, name.strip(), url.strip()) for i, (name, url) in enumerate(pairs, start=1)]
+
+def random_loop(product_count, retailers, price_data):
+    """The original generator: one random call per product and retailer, rows kept as a list of tuples"""
+    random.seed(product_retailers.SEED)
+    rows = []
+    for product_id in range(1, product_count + 1):
+        base_init = price_data[(product_id - 1) % len(price_data)]
+        for retailer_id, retailer_name, retailer_url in random.sample(retailers, random.randint(1, len(retailers))):
+            initial_price = round(base_init * random.uniform(0.85, 1.15), 2)
+            discount = random.triangular(0, 99, 0)
+            final_price = round(initial_price * (1 - discount / 100), 2)
+            rows.append((product_id, retailer_id, f"{retailer_url}", initial_price, final_price))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Product_Retailer generation throughput")
+    parser.add_argument('--products', type=int, default=1_000_000, help="products for the NumPy generator")
+    parser.add_argument('--loop-products', type=int, default=100_000, help="products for the original loop")
+    args = parser.parse_args()
+
+    retailers = load_retailers()
+    base_prices = np.random.default_rng(0).integers(100, 1_000_000, size=2000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        with TableWriter(Path(tmp) / 'product_retailers', product_retailers.PRODUCT_RETAILER_SCHEMA) as writer:
+            rows = product_retailers.generate_product_retailers(writer, args.products, retailers, base_prices)
+        vector_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loop_rows = len(random_loop(args.loop_products, retailers, (base_prices / 100).tolist()))
+    loop_time = time.perf_counter() - start
+
+    print(f"📊 NumPy: {args.products / vector_time:,.0f} products/s, {rows / vector_time:,.0f} rows/s ({vector_time:.2f}s)")
+    print(f"📊 loop:  {args.loop_products / loop_time:,.0f} products/s, {loop_rows / loop_time:,.0f} rows/s ({loop_time:.2f}s)")
+
+if __name__ == '__main__':
+    main()
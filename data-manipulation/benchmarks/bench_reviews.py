@@ -0,0 +1,46 @@
+"""
+Benchmark for the review generator in scripts/reviews.py.
+
+Generates reviews for the requested numbers of products and users into a temporary table,
+using the templates in original-data/reviews.json, and reports reviews/s.
+
+Usage: python benchmarks/bench_reviews.py [--products 1000000] [--users 100000]
+"""
+from pathlib import Path
+import argparse
+import importlib.util
+import json
+import sys
+import tempfile
+import time
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / 'scripts'))
+
+from columnstore import TableWriter
+
+spec = importlib.util.spec_from_file_location('reviews', BASE_DIR / 'scripts' / 'reviews.py')
+reviews = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(reviews)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure review generation throughput")
+    parser.add_argument('--products', type=int, default=1_000_000, help="number of products")
+    parser.add_argument('--users', type=int, default=100_000, help="number of reviewing users")
+    args = parser.parse_args()
+
+    with open(BASE_DIR / 'original-data' / 'reviews.json', 'r') as f:
+        templates = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        with TableWriter(Path(tmp) / 'reviews', reviews.REVIEW_SCHEMA) as writer:
+            count, users, products = reviews.generate_reviews(
+                writer, range(1, args.products + 1), range(2, args.users + 2), templates)
+        elapsed = time.perf_counter() - start
+
+    print(f"✅ {count:,} reviews by {users:,} users on {products:,} products")
+    print(f"📊 {count / elapsed:,.0f} reviews/s ({elapsed:.2f}s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Throughput benchmark for scripts/sqlcodec.py.
+
+Decodes every field of original-data/bulk.sql (repeated to the requested number of rows)
+and encodes the decoded values again, reporting MB/s for each direction.
+
+Usage: python benchmarks/bench_sqlcodec.py [--rows 100000]
+"""
+from pathlib import Path
+import argparse
+import sys
+import time
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / 'scripts'))
+
+from sqlcodec import decode, encode
+from sqltokenizer import iter_tuples
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure sqlcodec decode/encode throughput")
+    parser.add_argument('--rows', type=int, default=100000, help="number of rows to process")
+    args = parser.parse_args()
+
+    template = list(iter_tuples(BASE_DIR / 'original-data' / 'bulk.sql'))
+    literals = [field for i in range(args.rows) for field in template[i % len(template)]]
+    size = sum(len(literal.encode('utf-8')) for literal in literals)
+
+    start = time.perf_counter()
+    values = [decode(literal) for literal in literals]
+    decode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encoded = [encode(value) for value in values]
+    encode_time = time.perf_counter() - start
+
+    if [decode(literal) for literal in encoded] != values:
+        print("🔴 Error: encode/decode round trip changed the data")
+        sys.exit(1)
+
+    print(f"✅ {args.rows} rows, {len(literals)} fields, {size / 1e6:.1f} MB")
+    print(f"📊 decode: {size / 1e6 / decode_time:.1f} MB/s ({len(literals) / decode_time:,.0f} fields/s)")
+    print(f"📊 encode: {size / 1e6 / encode_time:.1f} MB/s ({len(literals) / encode_time:,.0f} fields/s)")
+
+if __name__ == '__main__':
+    main()
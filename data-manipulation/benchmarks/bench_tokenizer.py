@@ -0,0 +1,83 @@
+"""
+Throughput benchmark for scripts/sqltokenizer.py.
+
+Builds a synthetic INSERT dump of the requested size by repeating the rows of
+original-data/bulk.sql, then times a full pass over it with iter_raw_tuples (memory-mapped
+bytes), with tokenize over a text stream read in chunks, and sharded across --workers processes
+into shard tables the way 4merge reads bulk.sql.
+
+Usage: python benchmarks/bench_tokenizer.py [--size-mb 200] [--chunk-size 1048576] [--workers N]
+"""
+from pathlib import Path
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / 'scripts'))
+
+from sqltokenizer import iter_raw_tuples, iter_tuples, tokenize, CHUNK_SIZE
+from shards import tokenize_shards
+
+BULK_FIELDS = ['title', 'description', 'created_at', 'updated_at', 'image_url', 'features', 'images']
+
+def build_dump(path, size_bytes):
+    """Writes a dump of at least size_bytes made of repeated bulk.sql rows"""
+    template = [', '.join(fields) for fields in iter_tuples(BASE_DIR / 'original-data' / 'bulk.sql')]
+    written = 0
+    rows = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        header = "INSERT INTO `Products` (`title`, `description`, `created_at`, `updated_at`, `image_url`, `features`, `images`) VALUES\n"
+        f.write(header)
+        written += len(header.encode('utf-8'))
+        while written < size_bytes:
+            for values in template:
+                line = f"({values}),\n"
+                f.write(line)
+                written += len(line.encode('utf-8'))
+                rows += 1
+                if written >= size_bytes:
+                    break
+        f.write(f"({template[0]});\nCOMMIT;\n")
+    return rows + 1
+
+def time_pass(tuples):
+    """(rows, seconds) of a full pass over an iterator of tuples"""
+    start = time.perf_counter()
+    rows = 0
+    for _ in tuples:
+        rows += 1
+    return rows, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure sqltokenizer throughput")
+    parser.add_argument('--size-mb', type=int, default=200, help="size of the synthetic dump in MB")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="tokenizer read size in characters")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="processes for the sharded pass")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = Path(tmp) / 'bulk.sql'
+        print(f"⏳ Building {args.size_mb} MB synthetic dump")
+        expected_rows = build_dump(dump, args.size_mb * 1024 * 1024)
+        size = dump.stat().st_size
+
+        results = [('mmap', time_pass(iter_raw_tuples(dump)))]
+        with open(dump, 'r', encoding='utf-8') as f:
+            results.append(('stream', time_pass(tokenize(f, args.chunk_size))))
+
+        start = time.perf_counter()
+        shards = tokenize_shards(dump, BULK_FIELDS, Path(tmp) / 'shards', args.workers, min_shard_bytes=1)
+        results.append((f"sharded x{len(shards)}", (sum(rows for _, rows, _ in shards), time.perf_counter() - start)))
+
+    for label, (rows, elapsed) in results:
+        if rows != expected_rows:
+            print(f"🔴 Error: {label} tokenized {rows} rows, expected {expected_rows}")
+            sys.exit(1)
+        print(f"✅ {label}: {rows} rows, {size / 1e6:.1f} MB in {elapsed:.2f}s")
+        print(f"📊 {label}: {size / 1e6 / elapsed:.1f} MB/s, {rows / elapsed:,.0f} rows/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Benchmark suite for the pipeline stages and the final assembly.
+
+For every size, builds a synthetic dataset with that many products (synthesize.py, kept in
+synthetic-data/<size> and reused), then runs every stage of run.py's STAGES in dependency order
+followed by createSQL, each in a fresh process. Records wall time, CPU time, throughput (products/s),
+peak RSS and bytes read/written per step (see run.measured) in benchmarks/results.json and compares
+them with benchmarks/baseline.json: any step that is slower or larger than the baseline by more than
+the tolerance fails the run (exit code 1).
+
+Timings depend on the machine, so no baseline is committed. Create one on the machine that runs the
+benchmarks, from a known-good commit, with --save-baseline; until then nothing is compared.
+
+Usage: python benchmarks/run_benchmarks.py [--sizes 1000 100000 1000000] [--tolerance 0.25]
+                                           [--save-baseline]
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / 'scripts'))
+
+RESULTS_FILE = Path(__file__).parent / 'results.json'
+BASELINE_FILE = Path(__file__).parent / 'baseline.json'
+SIZES = [1000, 100000, 1000000]
+FINAL_STEP = 'createSQL'
+
+# Wall times below this are too noisy to compare against the baseline
+MIN_COMPARED_SECONDS = 0.5
+
+def run_step(step):
+    """Child mode: runs one stage (or the final assembly) in this process and prints its measurements"""
+    import run
+    if step == FINAL_STEP:
+        metrics = {}
+        with run.measured(metrics):
+            succeeded = run.createSQL()
+    else:
+        succeeded, output, metrics = run.run_stage_measured(step)
+        print(output, end='')
+    print(json.dumps({'ok': succeeded, **metrics}))
+
+def measure(step, data_dir):
+    """Runs one step in a fresh process against data_dir and returns its measurements"""
+    env = dict(os.environ, DROP_TABLE_DATA=str(data_dir))
+    result = subprocess.run([sys.executable, __file__, '--child', step], env=env,
+                            capture_output=True, text=True)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(f"{step} crashed: {result.stderr.strip()[-500:]}")
+    measurement = json.loads(lines[-1])
+    if not measurement.pop('ok'):
+        raise RuntimeError(f"{step} failed:\n" + '\n'.join(lines[-20:-1]))
+    return measurement
+
+def prepare_dataset(size):
+    """The synthetic dataset for size products, generated once and reused (its stage outputs are not)"""
+    import synthesize
+    data_dir = synthesize.SYNTHETIC_DATA / str(size)
+    try:
+        with open(data_dir / 'synthetic.json', 'r') as f:
+            existing = json.load(f)
+    except FileNotFoundError:
+        existing = None
+    if existing != {'products': size, 'seed': synthesize.SEED}:
+        print(f"⏳ Synthesizing {size} products")
+        synthesize.synthesize(data_dir, size)
+    return data_dir
+
+def stage_order(stage_names):
+    """The stages in the order run.py's dependency graph allows: every stage after the stages it reads from"""
+    import run
+    graph, _ = run.build_stage_graph(stage_names)
+    order = []
+    def visit(name):
+        if name in order:
+            return
+        for dependency in sorted(graph[name], key=stage_names.index):
+            visit(dependency)
+        order.append(name)
+    for name in stage_names:
+        visit(name)
+    return order
+
+def run_suite(sizes):
+    """Runs every step for every size; returns {size: {step: measurement}}"""
+    import run
+    steps = stage_order(run.STAGES) + [FINAL_STEP]
+    results = {}
+    for size in sizes:
+        data_dir = prepare_dataset(size)
+        shutil.rmtree(data_dir / 'manipulated-data', ignore_errors=True)
+        results[str(size)] = {}
+        for step in steps:
+            measurement = measure(step, data_dir)
+            measurement['products_per_second'] = size / max(measurement['wall_seconds'], 0.001)
+            results[str(size)][step] = measurement
+            print(f"📊 {size:>9} {step:<18} {measurement['wall_seconds']:8.2f}s "
+                  f"{measurement['products_per_second']:>12,.0f}/s {measurement['peak_rss_bytes'] / 2**20:8.1f} MiB")
+    return results
+
+def compare(results, baseline, tolerance):
+    """Lists every step that regressed against the baseline by more than tolerance"""
+    regressions = []
+    for size, steps in results.items():
+        for step, current in steps.items():
+            previous = baseline.get(size, {}).get(step)
+            if previous is None:
+                continue
+            if (current['wall_seconds'] >= MIN_COMPARED_SECONDS
+                    and current['wall_seconds'] > previous['wall_seconds'] * (1 + tolerance)):
+                regressions.append(f"{size} {step}: wall time {previous['wall_seconds']:.2f}s -> {current['wall_seconds']:.2f}s")
+            if current['peak_rss_bytes'] > previous['peak_rss_bytes'] * (1 + tolerance):
+                regressions.append(f"{size} {step}: peak RSS {previous['peak_rss_bytes'] / 2**20:.1f} -> "
+                                   f"{current['peak_rss_bytes'] / 2**20:.1f} MiB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage at several data sizes")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="numbers of products to benchmark")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown/growth over the baseline")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_step(args.child)
+        return
+
+    try:
+        results = run_suite(args.sizes)
+    except RuntimeError as e:
+        print(f"🔴 Error: {str(e)}")
+        sys.exit(1)
+
+    report = {'python': platform.python_version(), 'machine': platform.machine(), 'results': results}
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {RESULTS_FILE}")
+
+    if args.save_baseline:
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline saved to {BASELINE_FILE}")
+        return
+
+    try:
+        with open(BASELINE_FILE, 'r') as f:
+            baseline = json.load(f)['results']
+    except FileNotFoundError:
+        print(f"⚠️ No baseline at {BASELINE_FILE}, nothing was compared. Record one on this machine, from a "
+              f"known-good commit, with: python benchmarks/run_benchmarks.py --save-baseline")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"🔴 Regression: {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"🎉 No regressions beyond {args.tolerance:.0%} of the baseline")
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,6 @@
--- phpMyAdmin SQL Dump
--- version 5.0.4deb2~bpo10+1
--- https://www.phpmyadmin.net/
---
--- Host: localhost:3306
--- Generation Time: May 24, 2025 at 12:36 PM
--- Server version: 10.3.39-MariaDB-0+deb10u2
--- PHP Version: 7.3.31-1~deb10u7
+-- DROP TABLE database schema
+-- Generated from data-manipulation/scripts/schema.py, edit the model there and
+-- regenerate with: python scripts/schema.py
 
 SET SQL_MODE = "NO_AUTO_VALUE_ON_ZERO";
 START TRANSACTION;
@@ -45,6 +40,19 @@ CREATE TABLE `Category` (
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `Facet_Count`
+--
+
+CREATE TABLE `Facet_Count` (
+  `facet` varchar(32) NOT NULL,
+  `value` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+  `value2` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL DEFAULT '',
+  `products` int(11) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `Product`
 --
@@ -74,7 +82,31 @@ CREATE TABLE `Product_Retailer` (
   `retailer_id` int(11) NOT NULL,
   `product_url` varchar(255) NOT NULL,
   `initial_price` decimal(10,2) NOT NULL,
-  `final_price` decimal(10,2) NOT NULL
+  `final_price` decimal(10,2) NOT NULL,
+  `discount_pct` decimal(5,2) NOT NULL DEFAULT 0,
+  `shuffle_rank` int(11) NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `Product_Summary`
+--
+
+CREATE TABLE `Product_Summary` (
+  `product_id` int(11) NOT NULL,
+  `retailer_id` int(11) NOT NULL,
+  `title` varchar(500) NOT NULL,
+  `image_url` varchar(255) NOT NULL,
+  `brand_name` varchar(255) NOT NULL,
+  `category_name` varchar(255) NOT NULL,
+  `retailer_name` varchar(255) NOT NULL,
+  `initial_price` decimal(10,2) NOT NULL,
+  `final_price` decimal(10,2) NOT NULL,
+  `discount_pct` decimal(5,2) NOT NULL DEFAULT 0,
+  `shuffle_rank` int(11) NOT NULL DEFAULT 0,
+  `rating` float DEFAULT NULL,
+  `review_count` int(11) NOT NULL DEFAULT 0
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- --------------------------------------------------------
@@ -104,6 +136,17 @@ CREATE TABLE `Review` (
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `Search_Term`
+--
+
+CREATE TABLE `Search_Term` (
+  `term` varchar(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+  `product_id` int(11) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `User`
 --
@@ -147,6 +190,12 @@ ALTER TABLE `Brand`
 ALTER TABLE `Category`
   ADD PRIMARY KEY (`id`);
 
+--
+-- Indexes for table `Facet_Count`
+--
+ALTER TABLE `Facet_Count`
+  ADD PRIMARY KEY (`facet`,`value`,`value2`);
+
 --
 -- Indexes for table `Product`
 --
@@ -159,8 +208,28 @@ ALTER TABLE `Product`
 -- Indexes for table `Product_Retailer`
 --
 ALTER TABLE `Product_Retailer`
-  ADD KEY `product_retailerRetailer` (`retailer_id`),
-  ADD KEY `product_retailerProduct` (`product_id`);
+  ADD PRIMARY KEY (`product_id`,`retailer_id`),
+  ADD KEY `product_retailerRetailerPrice` (`retailer_id`,`final_price`),
+  ADD KEY `product_retailerRetailerShuffle` (`retailer_id`,`shuffle_rank`),
+  ADD KEY `product_retailerRetailerDiscount` (`retailer_id`,`discount_pct`),
+  ADD KEY `product_retailerShuffle` (`shuffle_rank`),
+  ADD KEY `product_retailerDiscount` (`discount_pct`,`shuffle_rank`);
+
+--
+-- Indexes for table `Product_Summary`
+--
+ALTER TABLE `Product_Summary`
+  ADD PRIMARY KEY (`product_id`,`retailer_id`),
+  ADD KEY `summaryRetailer` (`retailer_id`),
+  ADD KEY `summaryBrandPrice` (`brand_name`,`final_price`),
+  ADD KEY `summaryCategoryPrice` (`category_name`,`final_price`),
+  ADD KEY `summaryRetailerPrice` (`retailer_name`,`final_price`),
+  ADD KEY `summaryPrice` (`final_price`),
+  ADD KEY `summaryRating` (`rating`),
+  ADD KEY `summaryShuffle` (`shuffle_rank`),
+  ADD KEY `summaryDiscount` (`discount_pct`,`shuffle_rank`),
+  ADD KEY `summaryBrandShuffle` (`brand_name`,`shuffle_rank`),
+  ADD KEY `summaryCategoryShuffle` (`category_name`,`shuffle_rank`);
 
 --
 -- Indexes for table `Retailer`
@@ -172,8 +241,15 @@ ALTER TABLE `Retailer`
 -- Indexes for table `Review`
 --
 ALTER TABLE `Review`
-  ADD KEY `user` (`user_id`),
-  ADD KEY `product` (`product_id`);
+  ADD PRIMARY KEY (`product_id`,`user_id`),
+  ADD KEY `user` (`user_id`);
+
+--
+-- Indexes for table `Search_Term`
+--
+ALTER TABLE `Search_Term`
+  ADD PRIMARY KEY (`term`,`product_id`),
+  ADD KEY `searchProduct` (`product_id`);
 
 --
 -- Indexes for table `User`
@@ -185,7 +261,7 @@ ALTER TABLE `User`
 -- Indexes for table `Watchlist_Item`
 --
 ALTER TABLE `Watchlist_Item`
-  ADD KEY `userWatch` (`user_id`),
+  ADD PRIMARY KEY (`user_id`,`product_id`),
   ADD KEY `productWatch` (`product_id`);
 
 --
@@ -240,6 +316,13 @@ ALTER TABLE `Product_Retailer`
   ADD CONSTRAINT `product_retailerProduct` FOREIGN KEY (`product_id`) REFERENCES `Product` (`id`) ON DELETE NO ACTION ON UPDATE CASCADE,
   ADD CONSTRAINT `product_retailerRetailer` FOREIGN KEY (`retailer_id`) REFERENCES `Retailer` (`id`) ON DELETE NO ACTION ON UPDATE CASCADE;
 
+--
+-- Constraints for table `Product_Summary`
+--
+ALTER TABLE `Product_Summary`
+  ADD CONSTRAINT `summaryProduct` FOREIGN KEY (`product_id`) REFERENCES `Product` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  ADD CONSTRAINT `summaryRetailer` FOREIGN KEY (`retailer_id`) REFERENCES `Retailer` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
 --
 -- Constraints for table `Review`
 --
@@ -247,6 +330,12 @@ ALTER TABLE `Review`
   ADD CONSTRAINT `product` FOREIGN KEY (`product_id`) REFERENCES `Product` (`id`) ON DELETE NO ACTION ON UPDATE CASCADE,
   ADD CONSTRAINT `user` FOREIGN KEY (`user_id`) REFERENCES `User` (`user_id`) ON DELETE NO ACTION ON UPDATE CASCADE;
 
+--
+-- Constraints for table `Search_Term`
+--
+ALTER TABLE `Search_Term`
+  ADD CONSTRAINT `searchProduct` FOREIGN KEY (`product_id`) REFERENCES `Product` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
 --
 -- Constraints for table `Watchlist_Item`
 --
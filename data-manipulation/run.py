@@ -1,176 +1,591 @@
+import io
 import os
-import subprocess
+import gc
+import ctypes
 import sys
+import json
+import time
 import shutil
+import hashlib
+import argparse
+import cProfile
+import resource
+import contextlib
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date, datetime, timezone
 from pathlib import Path
 
 # Define the subfolder where your scripts are located
 SCRIPTS_FOLDER = "scripts"
+SCRIPTS_DIR = Path(__file__).parent / SCRIPTS_FOLDER
 
-def run_python_script(script_path):
-    print(f"\n🔵 Executing: {script_path}")
+# Stages and the final writers share the helper modules in SCRIPTS_FOLDER
+sys.path.insert(0, str(SCRIPTS_DIR))
+from columnstore import read_table
+from export import write_inserts, write_tsv, load_data_statement, split_schema, DISABLE_CHECKS
+from schema import render_schema
+from delta import save_snapshot, write_delta, DELTA_FILE, SNAPSHOT_DIR
+from sqlcodec import iter_rows, read_insert_header
+from paths import DATA_DIR, ORIGINAL_DATA, MANIPULATED_DATA, SQL_EXPORT, TSV_EXPORT
+
+# Pipeline stages, each a script in SCRIPTS_FOLDER exposing main(), INPUTS and OUTPUTS.
+# The execution order is derived from the declared inputs and outputs, not from this list.
+STAGES = [
+    'product_attributes',
+    '4merge',
+    '5retailers',
+    '6currency',
+    'product_retailers',
+    'reviews',
+    'watchlists',
+    'product_summary',
+    'search_index',
+    'facets',
+    'catalog_snapshot'
+]
+
+# Stage outputs are kept between runs and reused when a stage's cache key has not changed
+CACHE_MANIFEST = MANIPULATED_DATA / 'stage-cache.json'
+
+# Data sections of DROP-TABLE-COMPLETE.sql as (label, source, table name).
+# Order matters: tables with foreign keys should come after their referenced tables.
+# Original SQL files (table name None) are copied as-is, stage tables are rendered as INSERTs.
+FINAL_DATA = [
+    ('brands', MANIPULATED_DATA / 'brands', 'Brand'),                            # No foreign keys
+    ('categories', MANIPULATED_DATA / 'categories', 'Category'),                 # No foreign keys
+    ('users.sql', ORIGINAL_DATA / 'users.sql', None),                            # No foreign keys
+    ('retailers', MANIPULATED_DATA / 'retailers', 'Retailer'),                   # No foreign keys
+    ('products', MANIPULATED_DATA / 'products', 'Product'),                      # References brands and categories
+    ('product_retailers', MANIPULATED_DATA / 'product_retailers', 'Product_Retailer'),  # References products and retailers
+    ('reviews', MANIPULATED_DATA / 'reviews', 'Review'),                         # References users and products
+    ('watchlists', MANIPULATED_DATA / 'watchlists', 'Watchlist_Item'),           # References users and products
+    ('product_summary', MANIPULATED_DATA / 'product_summary', 'Product_Summary'),  # References products and retailers
+    ('search_terms', MANIPULATED_DATA / 'search_terms', 'Search_Term'),           # References products
+    ('facet_counts', MANIPULATED_DATA / 'facet_counts', 'Facet_Count')            # No foreign keys
+]
+COPY_CHUNK_SIZE = 1 << 20
+
+# Instrumentation: a JSON report of every run next to the import files, and cProfile dumps for --profile
+RUN_REPORT = DATA_DIR / 'run-report.json'
+PROFILE_DIR = DATA_DIR / 'profiles'
+FINAL_STEP = 'final'
+
+def load_stage(name):
+    """Import a stage script as a module (stage names are not valid identifiers)"""
+    spec = importlib.util.spec_from_file_location(f"stage_{name}", SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def run_stage(name):
+    """Run a single stage in the current process. Returns True on success."""
     try:
-        result = subprocess.run(
-            [sys.executable, script_path],
-            check=True,
-            text=True
-        )
-        print(f"🟢 Success: {script_path}")
-    except subprocess.CalledProcessError as e:
-        print(f"🔴 Error: {script_path} (FAILED)")
-        print(f"Error Code: {e.returncode}")
-        print("STDOUT:")
-        print(e.stdout)
-        print("STDERR:")
-        print(e.stderr)
-    except FileNotFoundError:
-        print(f"🔴 Error: Python interpreter not found at {sys.executable}. Make sure Python is correctly installed.")
+        module = load_stage(name)
+        module.main()
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            return False
     except Exception as e:
-        print(f"🔴 Error: An unexpected error occurred while trying to run {script_path}: {e}")
+        print(f"🔴 Error: An unexpected error occurred while running {name}: {e}")
+        return False
+
+    missing = [path.name for path in module.OUTPUTS if not path.exists()]
+    if missing:
+        print(f"🔴 Error: {name} did not produce {', '.join(missing)}")
+        return False
+    return True
+
+def io_counters():
+    """(bytes read, bytes written) by this process so far, from /proc/self/io; None where unavailable"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            fields = dict(line.split(': ', 1) for line in f.read().splitlines())
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+def release_memory():
+    """Collects garbage and returns freed heap pages to the OS (glibc only), so a reused worker starts small"""
+    gc.collect()
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
 
-def run_all_scripts_in_folder(folder_path):
+def reset_peak_rss():
+    """Resets this process's peak RSS (VmHWM) to its current RSS; False where Linux does not allow it"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss():
+    """Peak RSS of this process in bytes: VmHWM, or ru_maxrss where /proc is unavailable"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # ru_maxrss is in KiB on Linux
+
+@contextlib.contextmanager
+def measured(metrics, profile_name=None):
     """
-    Discovers all Python files (.py) in the specified folder and runs them.
-    Excludes files starting with '__' (like __init__.py).
+    Records wall time, CPU time, peak RSS and bytes read/written of the enclosed block into metrics.
+    With profile_name the block also runs under cProfile, dumped to PROFILE_DIR/<profile_name>.prof.
+    The memory left by earlier work is released and the peak RSS high-water mark is reset first,
+    so a pool worker that ran a bigger stage before still reports the peak of this block; where it
+    cannot be reset, peak_rss_shared is set and the value is the worker's peak so far.
     """
-    if not os.path.isdir(folder_path):
-        print(f"🔴 Error: Folder '{folder_path}' not found.")
-        return
+    release_memory()
+    if not reset_peak_rss():
+        metrics['peak_rss_shared'] = True
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    io_before = io_counters()
+    profiler = cProfile.Profile() if profile_name else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler:
+            profiler.disable()
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(PROFILE_DIR / f"{profile_name}.prof")
+            metrics['profile'] = str(PROFILE_DIR / f"{profile_name}.prof")
+        end = resource.getrusage(resource.RUSAGE_SELF)
+        io_after = io_counters()
+        metrics['wall_seconds'] = round(time.perf_counter() - start, 3)
+        metrics['cpu_seconds'] = round(end.ru_utime - usage.ru_utime + end.ru_stime - usage.ru_stime, 3)
+        metrics['peak_rss_bytes'] = peak_rss()
+        if io_before and io_after:
+            metrics['read_bytes'] = io_after[0] - io_before[0]
+            metrics['written_bytes'] = io_after[1] - io_before[1]
 
-    print("\n")
-    print(f"Scanning for Python scripts in: {folder_path}")
-    scripts_found = []
+def count_messages(output):
+    """Number of warning and error lines in a stage's output"""
+    lines = output.splitlines()
+    return {
+        'warnings': sum('⚠️' in line or 'warning' in line.lower() for line in lines),
+        'errors': sum('🔴' in line for line in lines)
+    }
 
-    for item_name in os.listdir(folder_path):
-        item_path = os.path.join(folder_path, item_name)
-        if os.path.isfile(item_path) and item_name.endswith(".py") and not item_name.startswith('__'):
-            scripts_found.append(item_path)
+def run_stage_measured(name, profile=False):
+    """
+    Runs a stage like run_stage, capturing its output and measuring it (see measured).
+    Returns (succeeded, captured output, metrics); the output is printed by the caller so
+    stages running side by side do not interleave.
+    """
+    output = io.StringIO()
+    metrics = {}
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        with measured(metrics, name if profile else None):
+            succeeded = run_stage(name)
+    metrics.update(count_messages(output.getvalue()))
+    return succeeded, output.getvalue(), metrics
 
-    if not scripts_found:
-        print(f"🔴 Error: No Python scripts found in '{folder_path}'.")
-        return
+def count_rows(paths):
+    """Total rows of the column tables among paths; other files are not counted"""
+    return sum(read_table(path).rows for path in paths if (path / 'table.json').exists())
 
-    # Sort scripts to ensure consistent execution order (optional, but good practice)
-    scripts_found.sort()
+def file_digest(path):
+    """SHA-256 of a file's contents (or of every file below a directory), read in chunks"""
+    digest = hashlib.sha256()
+    files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+    for file in files:
+        digest.update(file.relative_to(path).as_posix().encode() if path.is_dir() else b'')
+        with open(file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
 
-    print(f"Found {len(scripts_found)} scripts to run.")
-    for script in scripts_found:
-        run_python_script(script)
-    print("\n--- All scripts execution complete ---")
+def stage_cache_key(name, module, stage_names):
+    """
+    Hash of everything that determines a stage's outputs: its own code, the shared helper
+    modules in SCRIPTS_FOLDER, its PARAMS (seed, exchange rates, ...) and the contents of its INPUTS.
+    """
+    key = hashlib.sha256()
+    key.update(file_digest(SCRIPTS_DIR / f"{name}.py").encode())
+    for helper in sorted(SCRIPTS_DIR.glob('*.py')):
+        if helper.stem not in stage_names:
+            key.update(helper.name.encode())
+            key.update(file_digest(helper).encode())
+    key.update(json.dumps(getattr(module, 'PARAMS', {}), sort_keys=True, default=str).encode())
+    for path in module.INPUTS:
+        key.update(path.name.encode())
+        key.update(file_digest(path).encode() if path.exists() else b'missing')
+    return key.hexdigest()
 
-def copyfiles():
-    # Create Final Statements directory
-    final_dir = Path(__file__).parent / 'Final Statements'
-    final_dir.mkdir(exist_ok=True)
-    
-    # Copy required files
-    files_to_copy = [
-        ('original-data', 'brands.sql'),
-        ('original-data', 'categories.sql'),
-        ('original-data', 'users.sql'),
-        ('manipulated-data', 'retailers.sql'),
-        ('manipulated-data', 'product_retailers.sql'),
-        ('manipulated-data', 'merged_products.sql', 'products.sql'),
-        ('manipulated-data','reviews.sql')
-    ]
-    
-    for entry in files_to_copy:
-        if len(entry) == 3:
-            folder, src_name, dest_name = entry
-        else:
-            folder, src_name = entry
-            dest_name = src_name
-        
-        src = Path(__file__).parent / folder / src_name
-        dest = final_dir / dest_name
-        try:
-            shutil.copy2(src, dest)
-            print(f"✅ Copied {src_name} to Final Statements")
-        except Exception as e:
-            print(f"🔴 Failed to copy {dest_name}: {str(e)}")
-    
-    # After all copies are done
+def load_cache_manifest():
     try:
-        manipulated_dir = Path(__file__).parent / 'manipulated-data'
-        shutil.rmtree(manipulated_dir)
-        print(f"✅ Cleaned up {manipulated_dir}")
-    except Exception as e:
-        print(f"🔴 Failed to clean up {manipulated_dir}: {str(e)}")
-    
-    print("\n🎉 All operations completed successfully!")
+        with open(CACHE_MANIFEST, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_cache_manifest(manifest):
+    MANIPULATED_DATA.mkdir(exist_ok=True)
+    temp_path = CACHE_MANIFEST.with_suffix('.tmp')
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    temp_path.replace(CACHE_MANIFEST)
+
+def discard_outputs(module):
+    """
+    Removes a stage's outputs, so tables left by an earlier run cannot be mistaken for the
+    outputs of a stage that failed or was skipped in this one
+    """
+    for path in module.OUTPUTS:
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.exists():
+            path.unlink()
+
+def build_stage_graph(stage_names):
+    """
+    Maps every stage to the set of stages it depends on.
+    A stage depends on another stage when one of its INPUTS is among the other's OUTPUTS.
+    """
+    modules = {name: load_stage(name) for name in stage_names}
+    producers = {}
+    for name, module in modules.items():
+        for output in module.OUTPUTS:
+            if output in producers:
+                raise ValueError(f"{output.name} is produced by both {producers[output]} and {name}")
+            producers[output] = name
+
+    graph = {}
+    for name, module in modules.items():
+        graph[name] = {producers[path] for path in module.INPUTS if path in producers}
+
+    # Reject cycles up front instead of deadlocking the scheduler
+    visited = set()
+    def visit(name, path):
+        if name in path:
+            raise ValueError(f"Dependency cycle between stages: {' -> '.join(path + [name])}")
+        if name in visited:
+            return
+        for dependency in graph[name]:
+            visit(dependency, path + [name])
+        visited.add(name)
+    for name in graph:
+        visit(name, [])
+
+    return graph, modules
+
+def run_all_stages(stage_names=STAGES, max_workers=None, use_cache=True, report=None, profile=()):
+    """
+    Runs the stages on a process pool. A stage is submitted as soon as every stage
+    it depends on has succeeded, so independent stages run side by side.
+    Stages whose cache key matches the previous successful run reuse their existing outputs.
+    Each stage's status and metrics are added to report (if given); stages named in profile run under cProfile.
+    A stage that fails, or is skipped because a dependency failed, loses its outputs and its cache entry.
+    Returns True if every stage succeeded.
+    """
+    report = {} if report is None else report
+    graph, modules = build_stage_graph(stage_names)
+    print(f"\nFound {len(graph)} stages to run.")
+
+    manifest = load_cache_manifest() if use_cache else {}
+    keys = {}
+    pending = dict(graph)
+    done = set()
+    failed = set()
+    running = {}
+
+    # Workers are reused across stages (measured resets the peak RSS for each one), so the
+    # interpreter and NumPy are only started once per worker
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # Skip stages whose dependencies failed
+            for name, dependencies in list(pending.items()):
+                if dependencies & failed:
+                    print(f"🔴 Skipped: {name} (depends on {', '.join(sorted(dependencies & failed))})")
+                    report[name] = {'status': 'skipped'}
+                    failed.add(name)
+                    del pending[name]
+                    discard_outputs(modules[name])
+                    manifest.pop(name, None)
+                    save_cache_manifest(manifest)
+
+            ready = [name for name, dependencies in pending.items() if dependencies <= done]
+            for name in ready:
+                del pending[name]
+                keys[name] = stage_cache_key(name, modules[name], stage_names)
+                outputs_exist = all(path.exists() for path in modules[name].OUTPUTS)
+                if use_cache and manifest.get(name) == keys[name] and outputs_exist:
+                    print(f"⚪ Cached: {name} (inputs unchanged)")
+                    report[name] = {'status': 'cached', 'rows_out': count_rows(modules[name].OUTPUTS)}
+                    done.add(name)
+                    continue
+                print(f"\n🔵 Executing: {name}")
+                running[pool.submit(run_stage_measured, name, name in profile)] = name
+
+            if not running:
+                if pending and any(dependencies <= done for dependencies in pending.values()):
+                    continue
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    succeeded, output, metrics = future.result()
+                    print(output, end='')
+                except Exception as e:
+                    print(f"🔴 Error: {name} crashed: {e}")
+                    succeeded, metrics = False, {}
+                module = modules[name]
+                report[name] = {
+                    'status': 'executed' if succeeded else 'failed',
+                    **metrics,
+                    'rows_in': count_rows(module.INPUTS),
+                    'rows_out': count_rows(module.OUTPUTS) if succeeded else 0
+                }
+                if succeeded:
+                    print(f"🟢 Success: {name} ({metrics['wall_seconds']:.2f}s, {metrics['peak_rss_bytes'] / 2**20:.0f} MiB)")
+                    done.add(name)
+                    manifest[name] = keys[name]
+                else:
+                    print(f"🔴 Error: {name} (FAILED)")
+                    failed.add(name)
+                    manifest.pop(name, None)
+                    discard_outputs(module)
+                save_cache_manifest(manifest)
+
+    print("\n--- All scripts execution complete ---")
+    return not failed
 
 def createSQL():
+    """
+    Streams the schema, the original SQL files and the rendered stage tables into
+    DROP-TABLE-COMPLETE.sql. Files are copied in fixed-size chunks and tables are written
+    row by row, so memory use does not grow with the dataset. The output is written to a
+    temporary file and renamed into place, so a failed build never leaves a partial file.
+    
+    The schema is split around the data: tables, primary keys and AUTO_INCREMENT come first,
+    the data is loaded with foreign-key and unique checks off in batched transactions, and
+    secondary indexes and foreign keys are added at the end.
+    """
     print("\n🔵 Creating final SQL file...")
     
     # Define paths
-    current_dir = Path(__file__).parent
-    schema_file = current_dir / 'db-schema' / 'DROP-TABLE.sql'
-    final_statements_dir = current_dir / 'Final Statements'
-    output_file = current_dir / 'DROP-TABLE-COMPLETE.sql'
-    
-    # Define the order of data files to maintain referential integrity
-    # Order matters: tables with foreign keys should come after their referenced tables
-    data_files_order = [
-        'brands.sql',        # No foreign keys
-        'categories.sql',    # No foreign keys
-        'users.sql',         # No foreign keys
-        'retailers.sql',     # No foreign keys
-        'products.sql',      # References brands and categories
-        'product_retailers.sql', # References products and retailers
-        'reviews.sql'        # References users and products
-    ]
+    output_file = SQL_EXPORT
+    temp_file = output_file.with_name(output_file.name + '.tmp')
     
     try:
-        # Start with the schema
-        with open(schema_file, 'r') as f:
-            schema_content = f.read()
+        schema_before, schema_after = split_schema(render_schema())
         
-        # Create the output file with schema
-        with open(output_file, 'w') as out_f:
-            out_f.write(schema_content)
+        with open(temp_file, 'w', encoding='utf-8') as out_f:
+            # Start with the tables and primary keys
+            out_f.write(schema_before)
             
             # Add a separator and comment
             out_f.write("\n\n-- --------------------------------------------------------\n")
             out_f.write("-- Data Import\n")
             out_f.write("-- --------------------------------------------------------\n\n")
+            out_f.write(DISABLE_CHECKS + "\n")
             
-            # Append each data file in the specified order
-            for data_file in data_files_order:
-                data_file_path = final_statements_dir / data_file
+            # Append each data section in foreign-key order
+            for label, source, table_name in FINAL_DATA:
+                if not source.exists():
+                    raise FileNotFoundError(f"{source} not found, did its stage fail?")
                 
-                if data_file_path.exists():
-                    print(f"✅ Adding data from {data_file}")
-                    with open(data_file_path, 'r') as f:
-                        data_content = f.read()
-                    
-                    # Add a comment indicating which data file is being added
-                    out_f.write(f"-- Data from {data_file}\n")
-                    out_f.write(data_content)
-                    out_f.write("\n\n")
+                # Add a comment indicating which data is being added
+                out_f.write(f"-- Data from {label}\n")
+                if table_name is None:
+                    with open(source, 'r', encoding='utf-8') as f:
+                        shutil.copyfileobj(f, out_f, COPY_CHUNK_SIZE)
+                    print(f"✅ Added data from {label}")
                 else:
-                    print(f"🔴 Warning: {data_file} not found in Final Statements directory")
+                    rows = write_inserts(out_f, table_name, read_table(source))
+                    print(f"✅ Added {rows} {table_name} rows")
+                out_f.write("\n\n")
+            
+            # Finish with the secondary indexes and constraints
+            out_f.write(schema_after)
         
+        temp_file.replace(output_file)
         print(f"✅ Complete SQL file created at {output_file}")
         print("\n🎉 Database creation file is ready for import!")
-        
-        # Delete the Final Statements directory after successful SQL file creation
-        try:
-            if final_statements_dir.exists():
-                shutil.rmtree(final_statements_dir)
-                print(f"✅ Cleaned up {final_statements_dir}")
-        except Exception as e:
-            print(f"🔴 Failed to delete Final Statements directory: {str(e)}")
+        return True
         
     except Exception as e:
+        temp_file.unlink(missing_ok=True)
         print(f"🔴 Error creating SQL file: {str(e)}")
+        return False
+
+def createTSV():
+    """
+    Writes one TSV file per table plus a load.sql driver (schema followed by LOAD DATA LOCAL INFILE
+    statements in foreign-key order) into DROP-TABLE-TSV/. LOAD DATA skips SQL parsing and is not
+    limited by max_allowed_packet, which makes large imports much faster than DROP-TABLE-COMPLETE.sql.
+    Import with: cd DROP-TABLE-TSV && mysql --local-infile=1 DROP_TABLE < load.sql
+    """
+    print("\n🔵 Creating TSV export for LOAD DATA...")
+    
+    output_dir = TSV_EXPORT
+    temp_dir = output_dir.with_name(output_dir.name + '.tmp')
+    
+    try:
+        if temp_dir.exists():
+            shutil.rmtree(temp_dir)
+        temp_dir.mkdir()
+        
+        load_statements = []
+        for label, source, table_name in FINAL_DATA:
+            if not source.exists():
+                raise FileNotFoundError(f"{source} not found, did its stage fail?")
+            
+            if table_name is None:
+                # Original SQL files are decoded back into rows
+                table_name, columns = read_insert_header(source)
+                rows = iter_rows(source)
+            else:
+                table = read_table(source)
+                columns = table.names
+                rows = table.iter_rows()
+            
+            file_name = f"{table_name}.tsv"
+            with open(temp_dir / file_name, 'w', encoding='utf-8', newline='\n') as out_f:
+                count = write_tsv(out_f, rows)
+            load_statements.append(load_data_statement(file_name, table_name, columns))
+            print(f"✅ Wrote {count} {table_name} rows to {file_name}")
+        
+        schema_before, schema_after = split_schema(render_schema())
+        
+        with open(temp_dir / 'load.sql', 'w', encoding='utf-8') as out_f:
+            out_f.write(schema_before)
+            out_f.write("\n\n-- --------------------------------------------------------\n")
+            out_f.write("-- Data Import (run from this directory with --local-infile=1)\n")
+            out_f.write("-- --------------------------------------------------------\n\n")
+            out_f.write(DISABLE_CHECKS + "\n")
+            out_f.write("\n".join(load_statements))
+            out_f.write("\n")
+            out_f.write(schema_after)
+        
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        temp_dir.rename(output_dir)
+        print(f"✅ TSV export created at {output_dir}")
+        print("\n🎉 Load with: mysql --local-infile=1 DROP_TABLE < load.sql (from that directory)")
+        return True
+        
+    except Exception as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        print(f"🔴 Error creating TSV export: {str(e)}")
+        return False
+
+def createDelta():
+    """
+    Writes DROP-TABLE-DELTA.sql: only the rows that were added, changed or removed since the previous
+    build (see scripts/delta.py), as INSERT ... ON DUPLICATE KEY UPDATE and DELETE statements.
+    Apply it to a database holding the previous build: mysql DROP_TABLE < DROP-TABLE-DELTA.sql
+    """
+    print("\n🔵 Creating delta SQL file...")
+    
+    try:
+        counts = write_delta(FINAL_DATA)
+        for table_name, count in counts.items():
+            if count['upserted'] or count['deleted']:
+                print(f"✅ {table_name}: {count['upserted']} inserted or changed, {count['deleted']} deleted")
+        if not any(count['upserted'] or count['deleted'] for count in counts.values()):
+            print("ℹ️ No changes since the previous build")
+        print(f"✅ Delta SQL file created at {DELTA_FILE}")
+        print("\n🎉 Apply it to the database holding the previous build!")
+        return True
+        
+    except Exception as e:
+        print(f"🔴 Error creating delta SQL file: {str(e)}")
+        return False
+
+def saveSnapshot():
+    """Records the keys and row hashes of this build, so the next --format delta can diff against it"""
+    try:
+        save_snapshot(FINAL_DATA)
+        print(f"✅ Delta snapshot saved to {SNAPSHOT_DIR}")
+        return True
+    except Exception as e:
+        print(f"🔴 Error saving delta snapshot: {str(e)}")
+        return False
+
+def iso_date(value):
+    """argparse type for YYYY-MM-DD dates"""
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a YYYY-MM-DD date: {value!r}")
+
+def write_run_report(report):
+    """Writes the run report to RUN_REPORT (atomically, like the cache manifest)"""
+    temp_path = RUN_REPORT.with_suffix('.tmp')
+    with open(temp_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    temp_path.replace(RUN_REPORT)
+    print(f"📊 Run report written to {RUN_REPORT}")
 
 if __name__ == "__main__":
-    # Get the absolute path to the scripts folder
-    # This makes the script runnable from any directory if main_runner.py is accessed
-    # and the relative path to 'scripts' is correct.
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    full_scripts_folder_path = os.path.join(current_dir, SCRIPTS_FOLDER)
-
-    run_all_scripts_in_folder(full_scripts_folder_path)
-    copyfiles()
-    createSQL()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build DROP-TABLE-COMPLETE.sql from the original data")
+    parser.add_argument('--no-cache', action='store_true', help="rebuild every stage even if its inputs are unchanged")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument('--format', choices=['sql', 'tsv', 'delta'], default='sql',
+                        help="sql: DROP-TABLE-COMPLETE.sql with INSERT statements, tsv: DROP-TABLE-TSV/ for LOAD DATA, "
+                             "delta: DROP-TABLE-DELTA.sql with the changes since the previous build")
+    parser.add_argument('--profile', action='append', default=[], choices=STAGES + [FINAL_STEP], metavar='STAGE',
+                        help=f"run a stage (or '{FINAL_STEP}' for the final writer) under cProfile; repeatable")
+    parser.add_argument('--rate-date', type=iso_date, default=None,
+                        help="convert prices at the exchange rates in force on this date (YYYY-MM-DD); default: the latest rates")
+    parser.add_argument('--shuffle-nonce', default=None,
+                        help="reshuffle the default product listing order: any new value gives a new, reproducible order")
+    parser.add_argument('--data', type=Path, default=None,
+                        help="dataset root holding original-data/ (e.g. from synthesize.py); outputs are written there")
+    args = parser.parse_args()
+
+    # Stage parameters are read from the environment when the stages are imported, so they reach
+    # the worker processes and the stage cache keys (PARAMS)
+    if args.rate_date is not None:
+        os.environ['DROP_TABLE_RATE_DATE'] = args.rate_date
+    if args.shuffle_nonce is not None:
+        os.environ['DROP_TABLE_SHUFFLE_NONCE'] = args.shuffle_nonce
+
+    # The data directories are resolved when the modules are imported (paths.py),
+    # so switching datasets restarts the runner with DROP_TABLE_DATA set
+    if args.data is not None and args.data.resolve() != DATA_DIR:
+        os.environ['DROP_TABLE_DATA'] = str(args.data.resolve())
+        os.execv(sys.executable, [sys.executable, *sys.argv])
+
+    report = {
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'data_dir': str(DATA_DIR),
+        'format': args.format,
+        'stages': {}
+    }
+    start = time.perf_counter()
+    stages_succeeded = run_all_stages(max_workers=args.workers, use_cache=not args.no_cache, report=report['stages'], profile=set(args.profile))
+
+    final = {}
+    if not stages_succeeded:
+        # An import built from the tables of the stages that did run would mix this run's data with
+        # the previous one's, so nothing is exported and the delta snapshot is left as it is
+        print("\n🔴 Error: Some stages failed or were skipped, no import files were written")
+        succeeded = False
+        final['status'] = 'failed'
+    else:
+        with measured(final, FINAL_STEP if FINAL_STEP in args.profile else None):
+            if args.format == 'delta':
+                succeeded = createDelta()
+            else:
+                succeeded = (createTSV() if args.format == 'tsv' else createSQL()) and saveSnapshot()
+        final['status'] = 'executed' if succeeded else 'failed'
+        final['rows_out'] = count_rows(source for _, source, table_name in FINAL_DATA if table_name is not None)
+    report['final'] = final
+    report['wall_seconds'] = round(time.perf_counter() - start, 3)
+    write_run_report(report)
+    if not succeeded:
+        sys.exit(1)
\ No newline at end of file
@@ -1,252 +1,151 @@
-from pathlib import Path
-import re
-import json
+import shutil
 import sys
 
-# Define paths
-BASE_DIR = Path(__file__).parent.parent
-ORIGINAL_DATA = BASE_DIR / 'original-data'
-MANIPULATED_DATA = BASE_DIR / 'manipulated-data'
+import numpy as np
 
-def load_brand_ids():
-    print("⏳ Loading brand IDs from products_with_brand_ids.sql")
-    brand_ids = []
+from columnstore import read_table, TableWriter
+from shards import tokenize_shards
+from schema import column_schema
+from paths import ORIGINAL_DATA, MANIPULATED_DATA
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [
+    MANIPULATED_DATA / 'brand_ids',
+    MANIPULATED_DATA / 'category_ids',
+    MANIPULATED_DATA / 'specifications',
+    ORIGINAL_DATA / 'bulk.sql'
+]
+OUTPUTS = [MANIPULATED_DATA / 'products']
+
+# Columns of the Product table, in the order of the INSERT statement
+PRODUCT_SCHEMA = column_schema('Product')
+
+# Fields of a bulk.sql tuple, in order
+BULK_FIELDS = ['title', 'description', 'created_at', 'updated_at', 'image_url', 'features', 'images']
+
+# Processes tokenizing bulk.sql (None: one per CPU); the output is the same for any number
+WORKERS = None
+
+def load_column(directory, label, script):
+    """Opens a single-column table written by an earlier stage (zero-copy)"""
+    print(f"⏳ Loading {label} from {directory}")
     try:
-        with open(MANIPULATED_DATA / 'products_with_brand_ids.sql', 'r') as f:
-            lines = [line.strip() for line in f if line.strip().startswith("(")]
+        table = read_table(MANIPULATED_DATA / directory)
         
-        if not lines:
-            print("🔴 Error: No brand ID entries found in products_with_brand_ids.sql")
+        if len(table) == 0:
+            print(f"🔴 Error: No {label} entries found in {directory}")
             sys.exit(1)
-            
-        for line in lines:
-            # Extract ID from format like (123),
-            brand_id = line.strip('(),').strip()
-            brand_ids.append(brand_id)
         
-        print(f"✅ Found {len(brand_ids)} brand IDs")
-        return brand_ids
+        print(f"✅ Found {len(table)} {label}")
+        return table[table.names[0]]
     except FileNotFoundError:
-        print(f"🔴 Error: File not found: {MANIPULATED_DATA / 'products_with_brand_ids.sql'}")
-        print("Make sure to run brands.py first")
+        print(f"🔴 Error: File not found: {MANIPULATED_DATA / directory}")
+        print(f"Make sure to run {script} first")
         sys.exit(1)
     except Exception as e:
-        print(f"🔴 Error: Failed to load brand IDs: {str(e)}")
+        print(f"🔴 Error: Failed to load {label}: {str(e)}")
         sys.exit(1)
 
+def load_brand_ids():
+    return load_column('brand_ids', 'brand IDs', 'product_attributes.py')
+
 def load_category_ids():
-    print("⏳ Loading category IDs from products_with_category_ids.sql")
-    category_ids = []
-    try:
-        with open(MANIPULATED_DATA / 'products_with_category_ids.sql', 'r') as f:
-            lines = [line.strip() for line in f if line.strip().startswith("(")]
-        
-        if not lines:
-            print("🔴 Error: No category ID entries found in products_with_category_ids.sql")
-            sys.exit(1)
-            
-        for line in lines:
-            # Extract ID from format like (123),
-            category_id = line.strip('(),').strip()
-            category_ids.append(category_id)
-        
-        print(f"✅ Found {len(category_ids)} category IDs")
-        return category_ids
-    except FileNotFoundError:
-        print(f"🔴 Error: File not found: {MANIPULATED_DATA / 'products_with_category_ids.sql'}")
-        print("Make sure to run categories.py first")
-        sys.exit(1)
-    except Exception as e:
-        print(f"🔴 Error: Failed to load category IDs: {str(e)}")
-        sys.exit(1)
+    return load_column('category_ids', 'category IDs', 'product_attributes.py')
 
 def load_specifications():
-    print("⏳ Loading specifications from products_with_specifications.sql")
-    specifications = []
-    try:
-        with open(MANIPULATED_DATA / 'products_with_specifications.sql', 'r') as f:
-            lines = [line.strip() for line in f if line.strip().startswith("('")]
-        
-        if not lines:
-            print("🔴 Error: No specification entries found in products_with_specifications.sql")
-            sys.exit(1)
-            
-        for line in lines:
-            # Extract JSON string between quotes
-            match = re.search(r"\('(.+)'\)", line)
-            if match:
-                spec_json = match.group(1)
-                specifications.append(spec_json)
-            else:
-                print(f"🔴 Error: Invalid format in line: {line}")
-                specifications.append("NULL")
-        
-        print(f"✅ Found {len(specifications)} specification entries")
-        return specifications
-    except FileNotFoundError:
-        print(f"🔴 Error: File not found: {MANIPULATED_DATA / 'products_with_specifications.sql'}")
-        print("Make sure to run specifications.py first")
-        sys.exit(1)
-    except Exception as e:
-        print(f"🔴 Error: Failed to load specifications: {str(e)}")
-        sys.exit(1)
+    return load_column('specifications', 'specification entries', 'product_attributes.py')
 
-def load_bulk_data():
+def load_bulk_data(shards_dir):
+    """
+    Tokenizes the products of bulk.sql into shard tables of unescaped (never decoded) fields, on a
+    process pool when the file is large; returns [(shard path, products, messages)] in file order.
+    """
     print("⏳ Loading original product data from bulk.sql")
-    products = []
-    
     try:
-        with open(ORIGINAL_DATA / 'bulk.sql', 'r') as f:
-            # Skip the first line (INSERT INTO statement)
-            try:
-                next(f)
-            except StopIteration:
-                print("🔴 Error: bulk.sql file is empty")
-                sys.exit(1)
-            
-            # Read all product lines
-            content = f.read()
-            # Split by product entries (each starting with a parenthesis)
-            product_entries = re.findall(r"\('.*?'\),", content, re.DOTALL)
-            
-            if not product_entries:
-                print("🔴 Error: No product entries found in bulk.sql")
-                sys.exit(1)
-            
-        for entry in product_entries:
-            # Extract the values between parentheses
-            match = re.search(r"\((.+)\),", entry, re.DOTALL)
-            if match:
-                values = match.group(1)
-                # Split by commas, but respect nested structures
-                parts = []
-                current = ""
-                in_quotes = False
-                in_array = 0
-                
-                for char in values:
-                    if char == "'" and (len(current) == 0 or current[-1] != "\\"):
-                        in_quotes = not in_quotes
-                    elif char == "[" and not in_quotes:
-                        in_array += 1
-                    elif char == "]" and not in_quotes:
-                        in_array -= 1
-                    
-                    if char == "," and not in_quotes and in_array == 0:
-                        parts.append(current.strip())
-                        current = ""
-                    else:
-                        current += char
-                
-                if current:
-                    parts.append(current.strip())
-                    
-                # Extract the needed fields (title, description, created_at, updated_at, image_url, features, images)
-                if len(parts) >= 7:
-                    products.append({
-                        'title': parts[0],
-                        'description': parts[1],
-                        'created_at': parts[2],
-                        'updated_at': parts[3],
-                        'image_url': parts[4],
-                        'features': parts[5],
-                        'images': parts[6]
-                    })
-                else:
-                    print(f"🔴 Error: Insufficient fields in entry: {entry[:50]}...")
-            else:
-                print(f"🔴 Error: Invalid format in entry: {entry[:50]}...")
-        
-        if not products:
-            print("🔴 Error: Failed to extract any valid products from bulk.sql")
-            sys.exit(1)
-            
-        print(f"✅ Found {len(products)} products in bulk data")
-        return products
+        shards = tokenize_shards(ORIGINAL_DATA / 'bulk.sql', BULK_FIELDS, shards_dir, WORKERS)
     except FileNotFoundError:
         print(f"🔴 Error: File not found: {ORIGINAL_DATA / 'bulk.sql'}")
         sys.exit(1)
-    except Exception as e:
-        print(f"🔴 Error: Failed to load bulk data: {str(e)}")
+    except ValueError as e:
+        print(f"🔴 Error: Invalid format in bulk.sql: {str(e)}")
+        sys.exit(1)
+
+    count = sum(products for _, products, _ in shards)
+    if count == 0:
+        print("🔴 Error: Failed to extract any valid products from bulk.sql")
         sys.exit(1)
 
-def merge_data():
+    print(f"✅ Found {count} products in bulk data ({len(shards)} shards)")
+    return shards
+
+def merge_data(writer, shards_dir):
+    """Writes one merged Product row per product to writer, a shard at a time; returns the number of rows"""
     print("🔄 Merging data from all sources")
     try:
-        brand_ids = load_brand_ids()
-        category_ids = load_category_ids()
+        brand_ids = np.asarray(load_brand_ids())
+        category_ids = np.asarray(load_category_ids())
         specifications = load_specifications()
-        bulk_data = load_bulk_data()
-        
-        # Determine the number of products (use the minimum to avoid index errors)
-        product_count = min(len(brand_ids), len(category_ids), len(specifications), len(bulk_data))
-        if product_count == 0:
-            print("🔴 Error: No products found in one or more datasets")
-            sys.exit(1)
-            
-        print(f"ℹ️ Processing {product_count} products for merging")
         
-        # Create merged SQL insert statement
-        output_lines = ["INSERT INTO `Product` (`id`, `category_id`, `brand_id`, `title`, `description`, `created_at`, `updated_at`, `image_url`, `images`, `specifications`, `features`) VALUES"]
+        # The sources are positionally aligned; stop at the shortest one
+        product_count = min(len(brand_ids), len(category_ids), len(specifications))
+        print(f"ℹ️ Merging up to {product_count} products")
         
-        for i in range(product_count):
-            try:
-                product = bulk_data[i]
-                brand_id = brand_ids[i]
-                category_id = category_ids[i]
-                spec = specifications[i]
-                
-                # Format the values for SQL insert
-                values = [
-                    str(i + 1),  # id (1-indexed)
-                    category_id,
-                    brand_id,
-                    product['title'],
-                    product['description'],
-                    product['created_at'],
-                    product['updated_at'],
-                    product['image_url'],
-                    product['images'],
-                    f"'{spec}'",  # specifications JSON
-                    product['features']
-                ]
-                
-                # Add to output
-                if i < product_count - 1:
-                    output_lines.append(f"({', '.join(values)}),")
-                else:
-                    output_lines.append(f"({', '.join(values)});")
-            except Exception as e:
-                print(f"🔴 Error processing product {i+1}: {str(e)}")
-                # Skip this product and continue with the next one
-                continue
+        first = 0  # index of the shard's first product in bulk.sql
+        for shard_path, products, messages in load_bulk_data(shards_dir):
+            # Products that could not be tokenized are skipped, keeping their ids unused
+            for row, message in messages:
+                if row is None:
+                    print(f"🔴 Error: {message}")
+                elif first + row < product_count:
+                    print(f"🔴 Error processing product {first + row + 1}: {message}")
+
+            shard = read_table(shard_path)
+            indexes = np.asarray(shard['row']) + first
+            kept = int(np.searchsorted(indexes, product_count))
+            indexes = indexes[:kept]
+            fields = {name: shard[name].head(kept) for name in BULK_FIELDS}
+            writer.append_columns([
+                (indexes + 1).astype(np.int32),  # id (1-indexed)
+                category_ids[indexes],
+                brand_ids[indexes],
+                fields['title'],
+                fields['description'],
+                fields['created_at'],
+                fields['updated_at'],
+                fields['image_url'],
+                fields['images'],
+                [specifications.raw(i) for i in indexes.tolist()],  # specifications JSON
+                fields['features']
+            ])
+            first += products
+        merged = writer.rows
         
-        if len(output_lines) <= 1:
+        if merged == 0:
             print("🔴 Error: No products were successfully processed")
             sys.exit(1)
             
-        return "\n".join(output_lines)
+        return merged
     except Exception as e:
         print(f"🔴 Error: Failed to merge data: {str(e)}")
         sys.exit(1)
 
-if __name__ == '__main__':
+def main():
     print("🚀 Starting data merge process")
     
     try:
-        merged_sql = merge_data()
-        
-        # Ensure output directory exists
-        MANIPULATED_DATA.mkdir(exist_ok=True)
-        
-        # Write to new file in manipulated-data directory instead of overwriting original
-        output_path = MANIPULATED_DATA / 'merged_products.sql'
-        with open(output_path, 'w') as f:
-            f.write(merged_sql)
+        output_path = MANIPULATED_DATA / 'products'
+        shards_dir = MANIPULATED_DATA / 'products.shards'
+        try:
+            with TableWriter(output_path, PRODUCT_SCHEMA) as writer:
+                merged = merge_data(writer, shards_dir)
+        finally:
+            shutil.rmtree(shards_dir, ignore_errors=True)
         
-        print(f"\n🎉 Successfully generated merged SQL file at {output_path}\n")
-        print(f"This file can be used to populate the Product table in DROP-TABLE.sql")
+        print(f"\n🎉 Successfully merged {merged} products into {output_path}\n")
         
     except Exception as e:
         print(f"🔴 Error during merge process: {str(e)}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
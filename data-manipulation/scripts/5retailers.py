@@ -1,10 +1,15 @@
-from pathlib import Path
 import sys
 
-# Define paths
-BASE_DIR = Path(__file__).parent.parent
-ORIGINAL_DATA = BASE_DIR / 'original-data'
-MANIPULATED_DATA = BASE_DIR / 'manipulated-data'
+from columnstore import write_table
+from schema import column_schema
+from paths import ORIGINAL_DATA, MANIPULATED_DATA
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [ORIGINAL_DATA / 'retailers.txt']
+OUTPUTS = [MANIPULATED_DATA / 'retailers']
+
+# Columns of the Retailer table
+RETAILER_SCHEMA = column_schema('Retailer')
 
 def parse_retailers():
     print("⏳ Loading retailers from retailers.txt")
@@ -41,39 +46,26 @@ def parse_retailers():
         print(f"🔴 Error: Failed to parse retailers: {str(e)}")
         sys.exit(1)
 
-def create_retailer_sql(retailers):
-    print("🔧 Creating SQL for retailers")
+def write_retailers(retailers, output_path):
+    print("🔧 Writing retailer table")
     try:
-        # Create SQL insert statement
-        output_lines = ["INSERT INTO `Retailer` (`id`, `name`, `web_page_url`) VALUES"]
-        
-        for idx, name, url in retailers:
-            # Format the values for SQL insert
-            output_lines.append(f"({idx}, '{name}', '{url}'),")
-        
-        # Replace the last comma with a semicolon
-        output_lines[-1] = output_lines[-1].replace("),", ");")
-        
-        return "\n".join(output_lines)
+        write_table(output_path, RETAILER_SCHEMA, retailers)
     except Exception as e:
-        print(f"🔴 Error: Failed to create SQL: {str(e)}")
+        print(f"🔴 Error: Failed to write retailers: {str(e)}")
         sys.exit(1)
 
-if __name__ == '__main__':
+def main():
     print("🚀 Starting retailer processing")
     try:
         retailers = parse_retailers()
-        sql_output = create_retailer_sql(retailers)
-        
-        # Ensure output directory exists
-        MANIPULATED_DATA.mkdir(exist_ok=True)
         
-        # Write to new file
-        output_path = MANIPULATED_DATA / 'retailers.sql'
-        with open(output_path, 'w') as f:
-            f.write(sql_output)
+        output_path = MANIPULATED_DATA / 'retailers'
+        write_retailers(retailers, output_path)
         
         print(f"\n🎉 Successfully generated {output_path} with {len(retailers)} retailers\n")
     except Exception as e:
         print(f"🔴 Error: Retailer processing failed: {str(e)}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -1,95 +1,159 @@
-import re
-from pathlib import Path
+from datetime import date
+from decimal import Decimal, InvalidOperation
+import csv
+import os
 import sys
 
-def convert_to_zar(amount, currency):
-    """Convert amount from given currency to ZAR"""
-    # Current exchange rates
-    rates = {
-        'USD': 17.83,  # 1 USD = 17.83 ZAR
-        'ZAR': 1.0,    # 1 ZAR = 1 ZAR (no conversion needed)
-        'CNY': 2.48,   # 1 CNY = 2.48 ZAR
-        'INR': 0.21    # 1 INR = 0.21 ZAR (or 1 ZAR = 4.77 INR)
-    }
-    
-    if currency not in rates:
-        print(f"Warning: Unknown currency {currency}. Keeping original value.")
-        return amount
-    
-    return amount * rates[currency]
+import numpy as np
+
+from columnstore import TableWriter, INT64
+from sqlcodec import decode_bytes
+from sqltokenizer import iter_raw_tuples
+from paths import ORIGINAL_DATA, MANIPULATED_DATA
+
+RATES_FILE = ORIGINAL_DATA / 'exchange_rates.csv'
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [ORIGINAL_DATA / 'prices.sql', RATES_FILE]
+OUTPUTS = [MANIPULATED_DATA / 'prices_zar']
+
+# Use the latest rate effective on or before this date (YYYY-MM-DD); None uses the latest rate in the file.
+# Set with run.py --rate-date (the DROP_TABLE_RATE_DATE environment variable)
+RATE_DATE = os.environ.get('DROP_TABLE_RATE_DATE') or None
+
+# Parameters that affect the output (part of the stage cache key in run.py)
+PARAMS = {'rate_date': RATE_DATE}
+
+# Prices are converted as integer cents and rates as fixed-point integers (rate * RATE_SCALE),
+# so every result is exact and rounded half away from zero exactly once
+RATE_SCALE = 10 ** 6
+BLOCK_ROWS = 1 << 20
+
+# Columns of the prices_zar table, in ZAR cents
+PRICES_ZAR_SCHEMA = [('initial_cents', INT64), ('final_cents', INT64)]
+
+def load_rates(path=RATES_FILE, rate_date=RATE_DATE):
+    """
+    Load {currency: fixed-point rate to ZAR} from the rate table. A currency the table lists
+    but with no rate effective on or before rate_date maps to None.
+    """
+    print(f"⏳ Loading exchange rates from {path.name}")
+    if rate_date is not None:
+        try:
+            rate_date = date.fromisoformat(rate_date).isoformat()
+        except ValueError:
+            print(f"🔴 Error: Rate date must be YYYY-MM-DD, got {rate_date!r}")
+            sys.exit(1)
+    rates = {}
+    listed = set()
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for line, record in enumerate(csv.DictReader(f), start=2):
+                currency = record['currency'].strip().upper()
+                effective = (record.get('effective_date') or '').strip()
+                listed.add(currency)
+                if rate_date is not None and effective > rate_date:
+                    continue
+                scaled = Decimal(record['rate'].strip()) * RATE_SCALE
+                if scaled != scaled.to_integral_value() or scaled <= 0:
+                    print(f"🔴 Error: Rate for {currency} on line {line} must be positive with at most 6 decimals")
+                    sys.exit(1)
+                # Keep the most recent rate per currency
+                if currency not in rates or effective >= rates[currency][0]:
+                    rates[currency] = (effective, int(scaled))
+    except FileNotFoundError:
+        print(f"🔴 Error: File not found: {path}")
+        sys.exit(1)
+    except (KeyError, InvalidOperation) as e:
+        print(f"🔴 Error: Malformed rate table {path.name}: {str(e)}")
+        sys.exit(1)
+
+    if not rates:
+        effective = f" effective on or before {rate_date}" if rate_date is not None else ''
+        print(f"🔴 Error: No exchange rates{effective} found in {path.name}")
+        sys.exit(1)
+    print(f"✅ Found rates for {', '.join(sorted(rates))}")
+    missing = sorted(listed - rates.keys())
+    if missing:
+        print(f"⚠️ Warning: No rate effective on or before {rate_date} for {', '.join(missing)}")
+    return {currency: rates[currency][1] if currency in rates else None for currency in listed}
+
+def to_cents(literals):
+    """Parse price literals with at most two decimals into an int64 array of cents"""
+    scaled = np.array(literals, dtype=np.float64) * 100
+    cents = np.rint(scaled)
+    if np.any(np.abs(scaled - cents) > 1e-3):
+        raise ValueError("Prices must have at most two decimal places")
+    return cents.astype(np.int64)
+
+def convert_cents(cents, rates):
+    """Multiply cents by fixed-point rates and round half away from zero back to cents"""
+    if cents.size and np.abs(cents).max() > np.iinfo(np.int64).max // rates.max():
+        raise OverflowError("Price too large for fixed-point conversion")
+    product = cents * rates
+    return np.sign(product) * ((np.abs(product) + RATE_SCALE // 2) // RATE_SCALE)
+
+def convert_block(initial, final, currencies, rates, counts):
+    """Convert one block of raw price literals to ZAR cents; adds the rows per currency to counts"""
+    # Number the currencies in order of appearance (a dict lookup beats sorting strings with np.unique)
+    index = {}
+    codes = np.fromiter((index.setdefault(currency, len(index)) for currency in currencies), dtype=np.int64, count=len(currencies))
+    block_counts = np.bincount(codes, minlength=len(index))
+    block_rates = np.empty(len(index), dtype=np.int64)
+    for i, (currency, count) in enumerate(zip(index, block_counts.tolist())):
+        if currency not in rates:
+            if currency not in counts:
+                print(f"⚠️ Warning: Unknown currency {currency}. Keeping original value.")
+            block_rates[i] = RATE_SCALE
+        elif rates[currency] is None:
+            # Passing these through would store them as if they were already in ZAR
+            raise ValueError(f"No {currency} rate in {RATES_FILE.name} is effective on or before {RATE_DATE}")
+        else:
+            block_rates[i] = rates[currency]
+        counts[currency] = counts.get(currency, 0) + count
+
+    row_rates = block_rates[codes]
+    return convert_cents(to_cents(initial), row_rates), convert_cents(to_cents(final), row_rates)
 
 def process_prices_file():
     # Define file paths
-    base_dir = Path(__file__).parent.parent
-    input_file = base_dir / 'original-data' / 'prices.sql'
-    output_file = base_dir / 'manipulated-data' / 'prices_in_zar.sql'
-    
-    # Ensure output directory exists
-    output_file.parent.mkdir(exist_ok=True)
-    
-    # Regular expression to match price entries
-    pattern = r'\((\d+(?:\.\d+)?),\s*(\d+(?:\.\d+)?),\s*\'(\w+)\'\)'
-    
+    input_file = ORIGINAL_DATA / 'prices.sql'
+    output_file = MANIPULATED_DATA / 'prices_zar'
+
     print(f"Processing prices from {input_file}")
-    
-    # Read input file
-    with open(input_file, 'r') as f:
-        content = f.read()
-    
-    # Extract the INSERT statement header
-    header_match = re.search(r'^(INSERT INTO .+? VALUES)\s*', content)
-    if not header_match:
-        print("🔴 Error: Could not find INSERT statement header")
+    rates = load_rates()
+    counts = {}
+
+    try:
+        with TableWriter(output_file, PRICES_ZAR_SCHEMA) as writer:
+            initial, final, currencies = [], [], []
+            # Prices stay raw bytes literals, which to_cents parses in bulk
+            for initial_price, final_price, currency in iter_raw_tuples(input_file):
+                initial.append(initial_price)
+                final.append(final_price)
+                currencies.append(decode_bytes(currency))
+                if len(initial) == BLOCK_ROWS:
+                    writer.append_columns(convert_block(initial, final, currencies, rates, counts))
+                    initial, final, currencies = [], [], []
+            if initial:
+                writer.append_columns(convert_block(initial, final, currencies, rates, counts))
+    except (ValueError, OverflowError) as e:
+        print(f"🔴 Error: Failed to convert prices: {str(e)}")
+        sys.exit(1)
+
+    if writer.rows == 0:
+        print("🔴 Error: No price entries found in prices.sql")
         sys.exit(1)  # Exit with error code to trigger the red circle in run.py
-    
-    header = header_match.group(1)
-    
-    # Find all price entries
-    entries = re.findall(pattern, content)
-    
-    # Convert prices to ZAR
-    converted_entries = []
-    currencies_found = set()
-    conversion_counts = {}
-    skipped_count = 0
-    
-    for initial_price, final_price, currency in entries:
-        currencies_found.add(currency)
-        
-        # Skip conversion if already in ZAR
-        if currency == 'ZAR':
-            skipped_count += 1
-            # Format as SQL entry without currency field
-            converted_entry = f"({initial_price}, {final_price})"
-            converted_entries.append(converted_entry)
-            continue
-            
-        conversion_counts[currency] = conversion_counts.get(currency, 0) + 1
-        
-        # Convert string values to float
-        initial_price_float = float(initial_price)
-        final_price_float = float(final_price)
-        
-        # Convert to ZAR
-        initial_price_zar = convert_to_zar(initial_price_float, currency)
-        final_price_zar = convert_to_zar(final_price_float, currency)
-        
-        # Format as SQL entry without currency field
-        converted_entry = f"({initial_price_zar:.2f}, {final_price_zar:.2f})"
-        converted_entries.append(converted_entry)
-    
-    # Create output SQL content
-    output_content = header + '\n' + ',\n'.join(converted_entries) + ';'
-    
-    # Write to output file
-    with open(output_file, 'w') as f:
-        f.write(output_content)
-    
+
     print(f"Conversion complete. Output written to {output_file}")
-    print(f"Currencies found: {', '.join(currencies_found)}")
-    print(f"Skipped {skipped_count} prices already in ZAR")
-    for currency, count in conversion_counts.items():
-        print(f"Converted {count} prices from {currency} to ZAR")
+    print(f"Currencies found: {', '.join(counts)}")
+    print(f"Skipped {counts.get('ZAR', 0)} prices already in ZAR")
+    for currency, count in counts.items():
+        if currency != 'ZAR':
+            print(f"Converted {count} prices from {currency} to ZAR")
+
+def main():
+    process_prices_file()
 
 if __name__ == "__main__":
-    process_prices_file()
\ No newline at end of file
+    main()
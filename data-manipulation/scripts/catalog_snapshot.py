@@ -0,0 +1,144 @@
+"""
+Pre-renders the anonymous product listing as static files: gzip-compressed JSON pages in the
+exact response shape of /Get/Products (status, data, total), for the whole catalog and for every
+category and brand, plus a manifest.json describing every listing. They can be served from any
+static file server or CDN (with Content-Encoding: gzip) without a database round trip.
+
+Listings are in shuffle_rank order, the API's default order, so a page of the snapshot matches
+what an unfiltered request returned at build time. Values have the types the API sends: the
+mariadb driver returns DECIMAL columns (the prices) as strings with their scale, AVG(score) as a
+number or null, and the watchlist flag (CASE ... TRUE ELSE FALSE) as an integer, which is 0 for
+anonymous users.
+
+    DROP-TABLE-CATALOG/manifest.json
+    DROP-TABLE-CATALOG/all/page-00001.json.gz
+    DROP-TABLE-CATALOG/category/<slug>/page-00001.json.gz
+    DROP-TABLE-CATALOG/brand/<slug>/page-00001.json.gz
+
+The snapshot is a deliverable like the import files, so it is written next to them in the dataset
+root (paths.CATALOG_EXPORT) rather than among the intermediate tables.
+"""
+import gzip
+import json
+import math
+import re
+import shutil
+import sys
+
+import numpy as np
+
+from columnstore import read_table
+from paths import MANIPULATED_DATA, CATALOG_EXPORT
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [MANIPULATED_DATA / 'product_summary']
+OUTPUTS = [CATALOG_EXPORT]
+
+# Decimal places of the price columns (decimal(10,2)), as the driver returns them
+PRICE_PLACES = 2
+
+# Items per page, and the gzip level of the pages
+PAGE_SIZE = 48
+COMPRESS_LEVEL = 9
+
+# Parameters that affect the output (part of the stage cache key in run.py)
+PARAMS = {'page_size': PAGE_SIZE, 'compress_level': COMPRESS_LEVEL}
+
+def slugify(name, taken):
+    """A lowercase, URL-safe directory name for name that is not in taken (which it is added to)"""
+    base = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'unnamed'
+    slug = base
+    suffix = 2
+    while slug in taken:
+        slug = f"{base}-{suffix}"
+        suffix += 1
+    taken.add(slug)
+    return slug
+
+def render_items(summary):
+    """The JSON text of every listing as a /Get/Products item, in table order and with the API's value types"""
+    columns = [summary[name] for name in ('product_id', 'image_url', 'title', 'final_price', 'retailer_name',
+                                          'retailer_id', 'rating', 'initial_price', 'discount_pct')]
+    items = []
+    for product_id, image_url, title, final_price, retailer_name, retailer_id, rating, initial_price, discount_pct in zip(*columns):
+        items.append(json.dumps({
+            'id': product_id,
+            'image_url': image_url,
+            'title': title,
+            'final_price': f"{final_price:.{PRICE_PLACES}f}",
+            'retailer_name': retailer_name,
+            'retailer_id': retailer_id,
+            'rating': None if math.isnan(rating) else rating,
+            'initial_price': f"{initial_price:.{PRICE_PLACES}f}",
+            'discount': math.floor(discount_pct),
+            'watchlist': 0
+        }, ensure_ascii=False))
+    return items
+
+def write_pages(directory, items, order):
+    """Writes the items at the indexes in order as numbered pages below directory; returns the page count"""
+    directory.mkdir(parents=True)
+    pages = math.ceil(len(order) / PAGE_SIZE)
+    for page in range(pages):
+        chunk = order[page * PAGE_SIZE:(page + 1) * PAGE_SIZE].tolist()
+        body = '{"status": "success", "data": [' + ', '.join(items[i] for i in chunk) + f'], "total": {len(chunk)}}}'
+        with open(directory / f"page-{page + 1:05d}.json.gz", 'wb') as f:
+            f.write(gzip.compress(body.encode('utf-8'), COMPRESS_LEVEL, mtime=0))
+    return pages
+
+def write_grouped(root, kind, items, order, names):
+    """Writes one listing per distinct value of names (in listing order) below root/kind; returns their manifest entries"""
+    grouped = {}
+    for index in order.tolist():
+        grouped.setdefault(names[index], []).append(index)
+
+    entries = {}
+    taken = set()
+    for name in sorted(grouped):
+        slug = slugify(name, taken)
+        indexes = np.asarray(grouped[name])
+        pages = write_pages(root / kind / slug, items, indexes)
+        entries[name] = {'path': f"{kind}/{slug}", 'items': len(indexes), 'pages': pages}
+    return entries
+
+def build_snapshot(summary, output_path):
+    """Writes the snapshot to a temporary directory and moves it to output_path once complete; returns the manifest"""
+    temp_path = output_path.with_name(output_path.name + '.tmp')
+    shutil.rmtree(temp_path, ignore_errors=True)
+    temp_path.mkdir(parents=True)
+
+    items = render_items(summary)
+    order = np.argsort(np.asarray(summary['shuffle_rank']), kind='stable')
+    manifest = {
+        'page_size': PAGE_SIZE,
+        'page_name': 'page-{page:05d}.json.gz',
+        'all': {'path': 'all', 'items': len(items), 'pages': write_pages(temp_path / 'all', items, order)},
+        'categories': write_grouped(temp_path, 'category', items, order, list(summary['category_name'])),
+        'brands': write_grouped(temp_path, 'brand', items, order, list(summary['brand_name']))
+    }
+    with open(temp_path / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    shutil.rmtree(output_path, ignore_errors=True)
+    temp_path.rename(output_path)
+    return manifest
+
+def main():
+    print("🚀 Starting catalog snapshot export")
+    output_path = CATALOG_EXPORT
+
+    try:
+        summary = read_table(MANIPULATED_DATA / 'product_summary')
+        print(f"✅ Found {len(summary)} product listings")
+
+        manifest = build_snapshot(summary, output_path)
+
+        pages = manifest['all']['pages'] + sum(entry['pages'] for kind in ('categories', 'brands') for entry in manifest[kind].values())
+        print(f"✅ {len(manifest['categories'])} category and {len(manifest['brands'])} brand listings")
+        print(f"\n🎉 Successfully wrote {pages} pages to {output_path}\n")
+    except Exception as e:
+        print(f"🔴 Error: Catalog snapshot export failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
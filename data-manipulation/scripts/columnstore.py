@@ -0,0 +1,280 @@
+"""
+Typed, column-oriented tables used to pass data between stages.
+
+A table is a directory holding a `table.json` description plus one file per column:
+- int32 / int64 / float64 columns are raw native-endian arrays (`<name>.i4`, `<name>.i8`, `<name>.f8`)
+- text columns are an int64 offsets array (`<name>.off`, rows + 1 entries) and the UTF-8 bytes (`<name>.txt`)
+
+Readers mmap the column files, so loading a table is zero-copy: numeric columns are memoryviews
+over the mapping and text values are only decoded when they are accessed.
+NULL is stored as NULL_INT in integer columns and NaN in float columns; text columns are not nullable.
+"""
+from array import array
+from itertools import accumulate
+from pathlib import Path
+import json
+import math
+import mmap
+import shutil
+
+INT32 = 'int32'
+INT64 = 'int64'
+FLOAT64 = 'float64'
+TEXT = 'text'
+
+NULL_INT = -2 ** 31
+
+# kind -> (array typecode, file suffix)
+_NUMERIC = {
+    INT32: ('i', '.i4'),
+    INT64: ('q', '.i8'),
+    FLOAT64: ('d', '.f8')
+}
+# Buffered rows are written out every _FLUSH_ROWS rows, or sooner once their text reaches _FLUSH_BYTES
+_FLUSH_ROWS = 65536
+_FLUSH_BYTES = 16 << 20
+
+# Text copied from another table (TextColumn) is written in chunks of this many bytes
+_COPY_BYTES = 16 << 20
+
+class TableWriter:
+    """
+    Writes a table row by row, flushing every column to disk in blocks of at most _FLUSH_ROWS rows
+    and about _FLUSH_BYTES of text, so the rows held in memory are bounded however long the values
+    are (blocks given to append_columns are written as they come). The table only appears at `path`
+    once close() succeeds; use it as a context manager.
+    """
+    def __init__(self, path, schema):
+        self.path = Path(path)
+        self.schema = list(schema)  # [(column name, kind), ...]
+        self.rows = 0
+        self._pending = 0   # rows and text bytes appended since the last flush
+        self._buffered = 0
+        self._temp = self.path.with_name(self.path.name + '.tmp')
+        if self._temp.exists():
+            shutil.rmtree(self._temp)
+        self._temp.mkdir(parents=True)
+
+        self._columns = []
+        for name, kind in self.schema:
+            if kind == TEXT:
+                offsets = open(self._temp / f"{name}.off", 'wb')
+                data = open(self._temp / f"{name}.txt", 'wb')
+                array('q', [0]).tofile(offsets)
+                self._columns.append([kind, offsets, data, array('q'), [], 0])
+            elif kind in _NUMERIC:
+                typecode, suffix = _NUMERIC[kind]
+                values = open(self._temp / f"{name}{suffix}", 'wb')
+                self._columns.append([kind, values, None, array(typecode), None, 0])
+            else:
+                raise ValueError(f"Unknown column kind {kind!r} for column {name}")
+
+    def append(self, row):
+        if len(row) != len(self._columns):
+            raise ValueError(f"Expected {len(self._columns)} values, got {len(row)}")
+        for column, value in zip(self._columns, row):
+            kind = column[0]
+            if kind == TEXT:
+                if value is None:
+                    raise ValueError("Text columns cannot hold NULL")
+                encoded = value if isinstance(value, bytes) else value.encode('utf-8')
+                column[5] += len(encoded)
+                column[3].append(column[5])
+                column[4].append(encoded)
+                self._buffered += len(encoded)
+            elif value is None:
+                column[3].append(math.nan if kind == FLOAT64 else NULL_INT)
+            else:
+                column[3].append(value)
+        self.rows += 1
+        self._pending += 1
+        if self._pending >= _FLUSH_ROWS or self._buffered >= _FLUSH_BYTES:
+            self._flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def append_columns(self, columns):
+        """
+        Appends a block of rows given column by column. Numeric columns can be any contiguous
+        buffer of the column's width (array.array, NumPy arrays), which is written to disk as is.
+        Text columns take a sequence of str, of already UTF-8 encoded bytes, or a TextColumn of
+        another table, whose bytes are copied in one piece without decoding.
+        """
+        if len(columns) != len(self._columns):
+            raise ValueError(f"Expected {len(self._columns)} columns, got {len(columns)}")
+        lengths = {len(values) for values in columns}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        self._flush()
+        for column, values in zip(self._columns, columns):
+            kind = column[0]
+            if kind == TEXT and isinstance(values, TextColumn):
+                first, last = values.offsets[0], values.offsets[-1]
+                offsets = array('q', (offset - first + column[5] for offset in values.offsets[1:]))
+                column[1].write(memoryview(offsets).cast('B'))
+                _copy_text(column[2], values.data, first, last)
+                column[5] += last - first
+            elif kind == TEXT:
+                if None in values:
+                    raise ValueError("Text columns cannot hold NULL")
+                if len(values) and isinstance(values[0], bytes):
+                    encoded = values
+                else:
+                    encoded = [value.encode('utf-8') for value in values]
+                offsets = array('q', accumulate(map(len, encoded), initial=column[5]))
+                column[1].write(memoryview(offsets)[1:].cast('B'))
+                column[2].writelines(encoded)
+                column[5] = offsets[-1]
+            else:
+                view = memoryview(values)
+                if view.itemsize != column[3].itemsize or (view.format.lstrip('@=<') == 'd') != (kind == FLOAT64):
+                    raise ValueError(f"Buffer of format {view.format!r} does not match a {kind} column")
+                column[1].write(view.cast('B'))
+        self.rows += lengths.pop() if lengths else 0
+        self._flush()
+
+    def _flush(self):
+        for column in self._columns:
+            kind, first, second, buffer, chunks = column[:5]
+            buffer.tofile(first)
+            del buffer[:]
+            if kind == TEXT:
+                second.writelines(chunks)
+                chunks.clear()
+        self._pending = 0
+        self._buffered = 0
+
+    def close(self):
+        self._flush()
+        for column in self._columns:
+            column[1].close()
+            if column[2] is not None:
+                column[2].close()
+        with open(self._temp / 'table.json', 'w') as f:
+            json.dump({
+                'rows': self.rows,
+                'columns': [{'name': name, 'kind': kind} for name, kind in self.schema]
+            }, f, indent=2)
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self._temp.rename(self.path)
+
+    def abort(self):
+        for column in self._columns:
+            column[1].close()
+            if column[2] is not None:
+                column[2].close()
+        shutil.rmtree(self._temp, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def write_table(path, schema, rows):
+    """Writes an iterable of row tuples as a table at path; returns the row count"""
+    with TableWriter(path, schema) as writer:
+        writer.extend(rows)
+    return writer.rows
+
+def _copy_text(out, data, first, last):
+    """
+    Writes data[first:last] to out through views of data, _COPY_BYTES at a time. The pages of a
+    mapping are dropped once written, so copying a whole column never holds more than one chunk.
+    """
+    with memoryview(data) as view:
+        for start in range(first, last, _COPY_BYTES):
+            stop = min(start + _COPY_BYTES, last)
+            with view[start:stop] as chunk:
+                out.write(chunk)
+            if hasattr(data, 'madvise'):
+                aligned = start - start % mmap.PAGESIZE
+                data.madvise(mmap.MADV_DONTNEED, aligned, stop - aligned)
+
+def _map(path):
+    with open(path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class TextColumn:
+    """Lazily decoded view over a text column"""
+    def __init__(self, offsets, data):
+        self.offsets = offsets  # memoryview of int64, rows + 1 entries
+        self.data = data        # mmap (or bytes) holding the UTF-8 values back to back
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def raw(self, index):
+        """The encoded bytes of one value, without decoding"""
+        return self.data[self.offsets[index]:self.offsets[index + 1]]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return self.raw(index).decode('utf-8')
+
+    def head(self, count):
+        """The first count values, as a TextColumn over the same data"""
+        return TextColumn(self.offsets[:count + 1], self.data)
+
+    def __iter__(self):
+        data = self.data
+        offsets = self.offsets
+        for i in range(len(offsets) - 1):
+            yield data[offsets[i]:offsets[i + 1]].decode('utf-8')
+
+class Table:
+    """A table opened with read_table; columns are accessed by name"""
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / 'table.json', 'r') as f:
+            meta = json.load(f)
+        self.rows = meta['rows']
+        self.schema = [(column['name'], column['kind']) for column in meta['columns']]
+        self._columns = {}
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def names(self):
+        return [name for name, _ in self.schema]
+
+    def kind(self, name):
+        return dict(self.schema)[name]
+
+    def __getitem__(self, name):
+        if name not in self._columns:
+            kind = self.kind(name)
+            if kind == TEXT:
+                offsets = _map(self.path / f"{name}.off")
+                self._columns[name] = TextColumn(memoryview(offsets).cast('q'), _map(self.path / f"{name}.txt"))
+            else:
+                typecode, suffix = _NUMERIC[kind]
+                self._columns[name] = memoryview(_map(self.path / f"{name}{suffix}")).cast(typecode)
+        return self._columns[name]
+
+    def iter_rows(self, names=None):
+        """Yields rows as tuples of Python values, with NULL_INT/NaN turned back into None"""
+        names = names or self.names
+        columns = []
+        for name in names:
+            kind = self.kind(name)
+            column = self[name]
+            if kind in (INT32, INT64):
+                column = (None if value == NULL_INT else value for value in column)
+            elif kind == FLOAT64:
+                column = (None if math.isnan(value) else value for value in column)
+            columns.append(column)
+        return zip(*columns)
+
+def read_table(path):
+    return Table(path)
@@ -0,0 +1,220 @@
+"""
+Incremental rebuilds (run.py --format delta).
+
+Every full build saves a keyed snapshot of the imported tables in delta-snapshot/: for each table,
+its primary key columns plus a 64-bit hash of the rest of the row. A delta build compares the new
+stage output with that snapshot and writes DROP-TABLE-DELTA.sql holding only the difference: new
+and changed rows as INSERT ... ON DUPLICATE KEY UPDATE, vanished rows as DELETE. The snapshot is
+then replaced, so each delta is relative to the build before it and must be applied in order.
+
+Left out of deltas:
+- User and Watchlist_Item, which belong to the live site: deltas never insert, overwrite or delete
+  users or watchlists (watchlist items of a deleted product still go, through its foreign key).
+- Existing reviews: the site writes reviews too, so Review is insert-only. Generated reviews of new
+  products are added, reviews already in the database are never overwritten or deleted (except
+  those of a deleted product, through its foreign key).
+- shuffle_rank, which changes for every listing when the shuffle nonce changes: existing rows keep
+  the rank they have, so a reshuffle (run.py --shuffle-nonce) needs a full build.
+
+Product ids are assigned by position in bulk.sql, and every generated row of a product is keyed by
+its id, so appending products or editing them in place only changes the rows of those products
+(plus the facet counts they fall under). Removing a product from the middle of bulk.sql would
+renumber every product after it and re-point their watchlist items and reviews, so the snapshot
+also records an identity hash (IDENTITY_COLUMNS) per product id, and a delta in which an id now
+carries the identity another id had is refused: that change needs a full build.
+"""
+from pathlib import Path
+import hashlib
+import shutil
+
+from columnstore import read_table, TableWriter, INT64
+from export import write_upserts, write_deletes
+from schema import TABLES, table
+from sqlcodec import iter_rows, read_insert_header
+from paths import DATA_DIR
+
+SNAPSHOT_DIR = DATA_DIR / 'delta-snapshot'
+DELTA_FILE = DATA_DIR / 'DROP-TABLE-DELTA.sql'
+
+EXCLUDED_TABLES = frozenset(['User', 'Watchlist_Item'])
+INSERT_ONLY_TABLES = frozenset(['Review'])
+IGNORED_COLUMNS = frozenset(['shuffle_rank'])
+
+# Columns that identify the row behind an id, for the tables whose ids others refer to by position
+IDENTITY_COLUMNS = {'Product': ['title', 'created_at']}
+
+class RenumberedError(ValueError):
+    """Raised when the ids of a table were shifted since the previous build"""
+
+def row_hash(values):
+    """A signed 64-bit hash of a tuple of column values"""
+    digest = hashlib.blake2b(repr(values).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+def source_rows(source, table_name):
+    """
+    (table name, column names, row iterator) of a FINAL_DATA entry: a stage table, or an original
+    INSERT dump (table_name None) whose rows get their AUTO_INCREMENT ids in file order.
+    """
+    if table_name is not None:
+        source_table = read_table(source)
+        return table_name, source_table.names, source_table.iter_rows()
+    table_name, columns = read_insert_header(source)
+    id_column = table(table_name).auto_increment
+    rows = ((i,) + row for i, row in enumerate(iter_rows(source), start=1))
+    return table_name, [id_column] + columns, rows
+
+def tracked_tables(final_data):
+    """(table name, column names, row iterator) of every FINAL_DATA table that deltas maintain, in FINAL_DATA order"""
+    for _, source, table_name in final_data:
+        if not Path(source).exists():
+            raise FileNotFoundError(f"{source} not found, did its stage fail?")
+        name = table_name or read_insert_header(source)[0]
+        if name not in EXCLUDED_TABLES:
+            yield source_rows(source, table_name)
+
+def snapshot_schema(model):
+    schema = [(name, model.column(name).kind) for name in model.primary_key] + [('row_hash', INT64)]
+    if model.name in IDENTITY_COLUMNS:
+        schema.append(('identity_hash', INT64))
+    return schema
+
+def keyed_rows(model, columns, rows, writer):
+    """
+    Yields (key, hash, identity, row) for every row and records them in the snapshot writer.
+    The hash covers every column except the key and IGNORED_COLUMNS, the identity hash the
+    IDENTITY_COLUMNS of the table (None for tables without).
+    """
+    if not model.primary_key:
+        raise ValueError(f"`{model.name}` has no primary key, it cannot be tracked by deltas")
+    key_indexes = [columns.index(name) for name in model.primary_key]
+    hashed_indexes = [i for i, name in enumerate(columns) if name not in model.primary_key and name not in IGNORED_COLUMNS]
+    identity_indexes = [columns.index(name) for name in IDENTITY_COLUMNS.get(model.name, [])]
+    for row in rows:
+        key = tuple(row[i] for i in key_indexes)
+        hashed = row_hash(tuple(row[i] for i in hashed_indexes))
+        if identity_indexes:
+            identity = row_hash(tuple(row[i] for i in identity_indexes))
+            writer.append(key + (hashed, identity))
+        else:
+            identity = None
+            writer.append(key + (hashed,))
+        yield key, hashed, identity, row
+
+def save_snapshot(final_data):
+    """Records the keys and row hashes of the tables just built as the base for the next delta"""
+    temp_dir = SNAPSHOT_DIR.with_name(SNAPSHOT_DIR.name + '.tmp')
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    temp_dir.mkdir(parents=True)
+    for name, columns, rows in tracked_tables(final_data):
+        model = table(name)
+        with TableWriter(temp_dir / name, snapshot_schema(model)) as writer:
+            for _ in keyed_rows(model, columns, rows, writer):
+                pass
+    shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
+    temp_dir.rename(SNAPSHOT_DIR)
+
+def load_snapshot(model):
+    """
+    ({key: row hash}, {key: identity hash}) of a table in the saved snapshot; both are empty if the
+    table is new, the identities are empty for tables without IDENTITY_COLUMNS.
+    """
+    path = SNAPSHOT_DIR / model.name
+    if not path.exists():
+        return {}, {}
+    snapshot = read_table(path)
+    keys = list(zip(*(snapshot[name] for name in model.primary_key)) if len(model.primary_key) > 1 else
+                ((value,) for value in snapshot[model.primary_key[0]]))
+    identities = {}
+    if model.name in IDENTITY_COLUMNS:
+        if 'identity_hash' not in snapshot.names:
+            raise RenumberedError(f"The snapshot of `{model.name}` has no identity hashes, run a full build first")
+        identities = dict(zip(keys, snapshot['identity_hash']))
+    return dict(zip(keys, snapshot['row_hash'])), identities
+
+def check_identities(model, keyed, identities):
+    """
+    Passes the keyed rows through, raising RenumberedError as soon as a key that existed in the
+    previous build carries the identity another key had then. Edited and appended rows pass.
+    """
+    owners = {}
+    for key, identity in identities.items():
+        owners.setdefault(identity, key)
+    for key, hashed, identity, row in keyed:
+        previous = identities.get(key)
+        if previous is not None and identity != previous and identity in owners:
+            raise RenumberedError(
+                f"`{model.name}` ids were renumbered ({key[0]} was {owners[identity][0]} in the previous build), "
+                f"a delta would re-point the rows that refer to them: run a full build instead")
+        yield key, hashed, identity, row
+
+def referencing(name):
+    """(table, column) of every foreign key that references table name"""
+    return [(model.name, column) for model in TABLES
+            for _, column, referenced, _, _ in model.foreign_keys if referenced == name]
+
+def write_delta(final_data, output_file=DELTA_FILE):
+    """
+    Writes the difference between the saved snapshot and the tables just built to output_file, then
+    saves the new snapshot. Returns {table: {'upserted': n, 'deleted': n}}.
+    """
+    if not SNAPSHOT_DIR.exists():
+        raise FileNotFoundError(f"No snapshot in {SNAPSHOT_DIR}, run a full build first")
+
+    temp_dir = SNAPSHOT_DIR.with_name(SNAPSHOT_DIR.name + '.tmp')
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    temp_dir.mkdir(parents=True)
+    upserts_file = output_file.with_name(output_file.name + '.upserts')
+    temp_file = output_file.with_name(output_file.name + '.tmp')
+
+    try:
+        counts = {}
+        deletes = []
+        with open(upserts_file, 'w', encoding='utf-8') as upserts:
+            for name, columns, rows in tracked_tables(final_data):
+                model = table(name)
+                previous, identities = load_snapshot(model)
+                with TableWriter(temp_dir / name, snapshot_schema(model)) as writer:
+                    keyed = check_identities(model, keyed_rows(model, columns, rows, writer), identities)
+                    if name in INSERT_ONLY_TABLES:
+                        # Only keys new since the previous build, and a row already there is left as it is
+                        update_columns = []
+                        changed = (row for key, _, _, row in keyed if previous.pop(key, None) is None)
+                    else:
+                        update_columns = [column for column in columns if column not in model.primary_key and column not in IGNORED_COLUMNS]
+                        changed = (row for key, hashed, _, row in keyed if previous.pop(key, None) != hashed)
+                    upserted = write_upserts(upserts, name, columns, changed, update_columns)
+                if name in INSERT_ONLY_TABLES:
+                    previous.clear()
+                deletes.append((model, list(previous)))
+                counts[name] = {'upserted': upserted, 'deleted': len(previous)}
+
+        with open(temp_file, 'w', encoding='utf-8') as out_f:
+            out_f.write("-- Incremental update, apply after the previous build or delta\n")
+            out_f.write("START TRANSACTION;\n\n")
+
+            # Deletes go first, children before parents, each parent after whatever still references it
+            out_f.write("-- Deleted rows\n")
+            for model, keys in reversed(deletes):
+                if not keys:
+                    continue
+                if len(model.primary_key) == 1:
+                    for child, column in referencing(model.name):
+                        if child != model.name:
+                            write_deletes(out_f, child, [column], keys)
+                write_deletes(out_f, model.name, list(model.primary_key), keys)
+
+            # Then inserts and updates, parents before children
+            out_f.write("\n-- New and changed rows\n")
+            with open(upserts_file, 'r', encoding='utf-8') as f:
+                shutil.copyfileobj(f, out_f, 1 << 20)
+            out_f.write("\nCOMMIT;\n")
+
+        temp_file.replace(output_file)
+        shutil.rmtree(SNAPSHOT_DIR)
+        temp_dir.rename(SNAPSHOT_DIR)
+        return counts
+    finally:
+        upserts_file.unlink(missing_ok=True)
+        temp_file.unlink(missing_ok=True)
+        shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,152 @@
+"""
+Final writers that turn the column tables in manipulated-data/ into import files.
+This is the only place where stage output is rendered as SQL text (or as TSV for LOAD DATA).
+"""
+import re
+
+from sqlcodec import encode, format_row
+
+# Rows per INSERT statement (keeps statements well below max_allowed_packet) and per transaction
+INSERT_BATCH_ROWS = 1000
+TRANSACTION_ROWS = 50000
+
+# Wrap the data in these so InnoDB skips per-row foreign-key and unique checks during the load
+DISABLE_CHECKS = "SET foreign_key_checks=0, unique_checks=0;\n"
+ENABLE_CHECKS = "SET foreign_key_checks=1, unique_checks=1;\n"
+
+_ALTER_TABLE = re.compile(r"^ALTER TABLE\s+(`\w+`)\s*(.*?);[ \t]*$", re.MULTILINE | re.DOTALL)
+_CLAUSE_SEPARATOR = re.compile(r",\s*\n\s*")
+_TRAILING_COMMENTS = re.compile(r"(?:^--[^\n]*\n|^[ \t]*\n)*\Z", re.MULTILINE)
+
+# Escapes for the default LOAD DATA format: FIELDS TERMINATED BY '\t' ESCAPED BY '\\' LINES TERMINATED BY '\n'.
+# The backslash must come first so later escapes are not doubled.
+_TSV_ESCAPES = (('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r'), ('\0', '\\0'))
+
+def write_inserts(out, table_name, table, batch_rows=INSERT_BATCH_ROWS, transaction_rows=TRANSACTION_ROWS):
+    """
+    Writes table as INSERT INTO `table_name` statements of up to batch_rows rows each to the text stream out,
+    one row at a time, committing every transaction_rows rows. Returns the number of rows written.
+    """
+    if len(table) == 0:
+        out.write(f"-- No rows for `{table_name}`\n")
+        return 0
+
+    columns = ', '.join(f"`{name}`" for name in table.names)
+    header = f"INSERT INTO `{table_name}` ({columns}) VALUES\n"
+    last = len(table) - 1
+    out.write("START TRANSACTION;\n")
+    for i, row in enumerate(table.iter_rows()):
+        if i % batch_rows == 0:
+            out.write(header)
+        out.write(format_row(row))
+        if i == last:
+            out.write(";\nCOMMIT;\n")
+        elif (i + 1) % batch_rows == 0:
+            out.write(";\n")
+            if (i + 1) % transaction_rows == 0:
+                out.write("COMMIT;\nSTART TRANSACTION;\n")
+        else:
+            out.write(",\n")
+    return len(table)
+
+def split_schema(schema):
+    """
+    Splits a schema dump into the part to run before the data and the part to run after it.
+    Before: everything up to the ALTER TABLE section, plus primary keys and AUTO_INCREMENT
+    (InnoDB clusters rows on the primary key, so it must exist while loading).
+    After: secondary keys and foreign-key constraints, one ALTER TABLE per table so each index
+    is built in a single sorted pass over the loaded rows, then ENABLE_CHECKS and the dump's trailer.
+    The data goes in between, preceded by DISABLE_CHECKS.
+    """
+    alters = list(_ALTER_TABLE.finditer(schema))
+    if not alters:
+        return schema, ''
+
+    # Drop the dump's "Indexes for ..." comment headings in front of the first ALTER TABLE
+    head = _TRAILING_COMMENTS.sub('', schema[:alters[0].start()])
+    before = [head, "\n--\n-- Primary keys and AUTO_INCREMENT\n--\n"]
+    deferred = {}
+    for match in alters:
+        table = match.group(1)
+        for clause in _CLAUSE_SEPARATOR.split(match.group(2).strip()):
+            if clause.upper().startswith(('ADD PRIMARY KEY', 'MODIFY')):
+                before.append(f"ALTER TABLE {table}\n  {clause};\n\n")
+            else:
+                deferred.setdefault(table, []).append(clause)
+
+    after = ["--\n-- Deferred secondary indexes and constraints\n--\n"]
+    for table, clauses in deferred.items():
+        after.append(f"ALTER TABLE {table}\n  " + ",\n  ".join(clauses) + ";\n\n")
+    after.append(ENABLE_CHECKS)
+    after.append(schema[alters[-1].end():])
+    return ''.join(before), ''.join(after)
+
+def write_upserts(out, table_name, columns, rows, update_columns, batch_rows=INSERT_BATCH_ROWS):
+    """
+    Writes rows (tuples in the order of columns) as INSERT ... ON DUPLICATE KEY UPDATE statements of up to
+    batch_rows rows each: new keys are inserted, existing ones get update_columns overwritten. Returns the row count.
+    """
+    header = f"INSERT INTO `{table_name}` ({', '.join(f'`{name}`' for name in columns)}) VALUES\n"
+    if update_columns:
+        footer = "\nON DUPLICATE KEY UPDATE " + ', '.join(f"`{name}` = VALUES(`{name}`)" for name in update_columns) + ";\n"
+    else:
+        # Every column is part of the key: an existing row is already up to date
+        footer = f"\nON DUPLICATE KEY UPDATE `{columns[0]}` = `{columns[0]}`;\n"
+    count = 0
+    for row in rows:
+        if count % batch_rows == 0:
+            if count:
+                out.write(footer)
+            out.write(header)
+        else:
+            out.write(",\n")
+        out.write(format_row(row))
+        count += 1
+    if count:
+        out.write(footer)
+    return count
+
+def write_deletes(out, table_name, key_columns, keys, batch_rows=INSERT_BATCH_ROWS):
+    """Writes DELETE statements for the rows whose key_columns equal one of keys (tuples), batch_rows keys each"""
+    if len(key_columns) == 1:
+        target = f"`{key_columns[0]}`"
+        literal = lambda key: encode(key[0])
+    else:
+        target = '(' + ', '.join(f"`{name}`" for name in key_columns) + ')'
+        literal = format_row
+    for start in range(0, len(keys), batch_rows):
+        values = ', '.join(literal(key) for key in keys[start:start + batch_rows])
+        out.write(f"DELETE FROM `{table_name}` WHERE {target} IN ({values});\n")
+    return len(keys)
+
+def tsv_field(value):
+    """Formats one value for LOAD DATA: NULL becomes \\N and special characters are backslash-escaped"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        for char, escaped in _TSV_ESCAPES:
+            if char in value:
+                value = value.replace(char, escaped)
+        return value
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    return repr(value)
+
+def write_tsv(out, rows):
+    """Writes rows as tab-separated lines to the text stream out; returns the number of rows"""
+    count = 0
+    for row in rows:
+        out.write('\t'.join(map(tsv_field, row)))
+        out.write('\n')
+        count += 1
+    return count
+
+def load_data_statement(file_name, table_name, columns):
+    """The LOAD DATA LOCAL INFILE statement matching the files written by write_tsv"""
+    column_list = ', '.join(f"`{column}`" for column in columns)
+    return (
+        f"LOAD DATA LOCAL INFILE '{file_name}' INTO TABLE `{table_name}` CHARACTER SET utf8mb4\n"
+        f"  FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'\n"
+        f"  LINES TERMINATED BY '\\n'\n"
+        f"  ({column_list});\n"
+    )
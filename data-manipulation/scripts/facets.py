@@ -0,0 +1,99 @@
+"""
+Counts products per value of every product listing filter (brand, category, retailer, price
+bucket, rating band) and for the common pairs of filters combined with a category, so the filter
+sidebar can show counts by reading Facet_Count instead of grouping over the listing join.
+A product counts once per value even if several of its listings share it.
+"""
+import sys
+
+import numpy as np
+
+from columnstore import read_table, write_table
+from schema import column_schema
+from paths import MANIPULATED_DATA
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [MANIPULATED_DATA / 'product_summary']
+OUTPUTS = [MANIPULATED_DATA / 'facet_counts']
+
+# Columns of the Facet_Count table; value2 is '' for single facets
+FACET_COUNT_SCHEMA = column_schema('Facet_Count')
+
+# Lower edges of the final_price buckets in ZAR; the last bucket is open-ended
+PRICE_BUCKETS = [0, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Facets counted on their own, and pairs counted together (named 'first+second')
+FACETS = ['brand', 'category', 'retailer', 'price', 'rating']
+FACET_PAIRS = [('category', 'brand'), ('category', 'retailer'), ('category', 'price'), ('category', 'rating')]
+
+# Parameters that affect the output (part of the stage cache key in run.py)
+PARAMS = {'price_buckets': PRICE_BUCKETS, 'facet_pairs': FACET_PAIRS}
+
+def text_codes(column):
+    """(code per row, label per code) for a text column, codes numbered in order of first appearance"""
+    labels = {}
+    codes = np.fromiter((labels.setdefault(column.raw(i), len(labels)) for i in range(len(column))),
+                        dtype=np.int64, count=len(column))
+    return codes, [label.decode('utf-8') for label in labels]
+
+def price_codes(prices):
+    """(bucket per row, bucket labels) for final prices, using PRICE_BUCKETS"""
+    edges = PRICE_BUCKETS
+    labels = [f"{low}-{high}" for low, high in zip(edges, edges[1:])] + [f"{edges[-1]}+"]
+    return np.searchsorted(edges, prices, side='right') - 1, labels
+
+def rating_codes(ratings):
+    """(band per row, band labels) for average ratings: whole stars '0-1' .. '4-5', or 'unrated'"""
+    labels = [f"{stars}-{stars + 1}" for stars in range(5)] + ['unrated']
+    bands = np.clip(np.floor(np.nan_to_num(ratings, nan=0.0)), 0, 4).astype(np.int64)
+    bands[np.isnan(ratings)] = len(labels) - 1
+    return bands, labels
+
+def count_products(product_ids, codes):
+    """Distinct products per code: (codes with any product, their product counts)"""
+    stride = int(product_ids.max(initial=0)) + 1
+    pairs = np.unique(codes * stride + product_ids)
+    return np.unique(pairs // stride, return_counts=True)
+
+def facet_rows(summary):
+    """Yields (facet, value, value2, products) rows for FACETS and FACET_PAIRS"""
+    product_ids = np.asarray(summary['product_id']).astype(np.int64)
+    dimensions = {
+        'brand': text_codes(summary['brand_name']),
+        'category': text_codes(summary['category_name']),
+        'retailer': text_codes(summary['retailer_name']),
+        'price': price_codes(np.asarray(summary['final_price'])),
+        'rating': rating_codes(np.asarray(summary['rating']))
+    }
+
+    for facet in FACETS:
+        codes, labels = dimensions[facet]
+        present, counts = count_products(product_ids, codes)
+        for code, count in zip(present.tolist(), counts.tolist()):
+            yield facet, labels[code], '', count
+
+    for first, second in FACET_PAIRS:
+        first_codes, first_labels = dimensions[first]
+        second_codes, second_labels = dimensions[second]
+        codes = first_codes * len(second_labels) + second_codes
+        present, counts = count_products(product_ids, codes)
+        for code, count in zip(present.tolist(), counts.tolist()):
+            yield f"{first}+{second}", first_labels[code // len(second_labels)], second_labels[code % len(second_labels)], count
+
+def main():
+    print("🚀 Starting facet counts")
+    output_path = MANIPULATED_DATA / 'facet_counts'
+
+    try:
+        summary = read_table(MANIPULATED_DATA / 'product_summary')
+        print(f"✅ Found {len(summary)} product listings")
+
+        rows = write_table(output_path, FACET_COUNT_SCHEMA, facet_rows(summary))
+
+        print(f"\n🎉 Successfully wrote {rows} facet counts to {output_path}\n")
+    except Exception as e:
+        print(f"🔴 Error: Facet counting failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
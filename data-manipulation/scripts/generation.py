@@ -0,0 +1,129 @@
+"""
+Knobs for the randomly generated tables (Product_Retailer, Review, Watchlist_Item).
+
+They are read from original-data/generation.json when it exists. The fixtures in original-data/
+have no such file, so the defaults below reproduce the plain uniform generators; synthesize.py
+writes one with skewed distributions for load-testing datasets.
+
+Per-item draws are keyed rather than taken from a shared stream: keyed_uniforms hashes the seed, a
+stream name and the item's keys (product id, retailer id, ...), so what one product gets does not
+depend on how many products come before it or which block it is generated in.
+"""
+import hashlib
+import json
+
+import numpy as np
+
+from sqlcodec import iter_rows
+from paths import ORIGINAL_DATA
+
+GENERATION_FILE = ORIGINAL_DATA / 'generation.json'
+
+DEFAULTS = {
+    # Zipf exponent of retailer popularity in Product_Retailer (0 = every retailer equally likely)
+    'retailer_skew': 0.0,
+    # Mean number of retailers per product (None = uniform between 1 and every retailer)
+    'retailers_per_product_mean': None,
+    # Mean number of reviews per product (None = uniform between 0 and the maximum)
+    'reviews_per_product_mean': None,
+    # Zipf exponent of user activity for reviews and watchlists (0 = every user equally likely)
+    'user_skew': 0.0,
+    # Mean number of watchlist items per user (0 = no watchlists)
+    'watchlist_items_per_user_mean': 0.0
+}
+
+# splitmix64 constants
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+def load_generation(path=GENERATION_FILE):
+    """The generation knobs, with DEFAULTS for anything not set in generation.json"""
+    settings = dict(DEFAULTS)
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f))
+    return settings
+
+def load_user_ids(path=ORIGINAL_DATA / 'users.sql'):
+    """IDs of the generated data's users: rows of users.sql with type 'user', numbered from 1 in file order"""
+    return [i for i, row in enumerate(iter_rows(path), start=1) if row[-1] == 'user']
+
+def zipf_weights(count, skew, rng):
+    """
+    Popularity weights for count items following a Zipf law with the given exponent, assigned
+    to the items in random order so the most popular item is not always the first one.
+    Returns None for skew 0 (uniform).
+    """
+    if not skew:
+        return None
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    return rng.permutation(weights / weights.sum())
+
+def _mix(x):
+    """The splitmix64 finalizer over a uint64 array"""
+    x = (x ^ (x >> np.uint64(30))) * _MIX1
+    x = (x ^ (x >> np.uint64(27))) * _MIX2
+    return x ^ (x >> np.uint64(31))
+
+def keyed_bits(seed, stream, *keys):
+    """
+    64 random bits (uint64) per element of the broadcast integer key arrays, a pure function of
+    seed, the stream name and the keys.
+    """
+    digest = hashlib.blake2b(f"{seed}\0{stream}".encode('utf-8'), digest_size=8).digest()
+    bits = np.uint64(int.from_bytes(digest, 'little'))
+    with np.errstate(over='ignore'):
+        for key in keys:
+            bits = _mix(bits ^ _mix(np.asarray(key).astype(np.uint64) + _GOLDEN))
+    return np.asarray(bits, dtype=np.uint64)
+
+def keyed_uniforms(seed, stream, *keys):
+    """Uniform floats in [0, 1), one per element of the broadcast key arrays (see keyed_bits)"""
+    return (keyed_bits(seed, stream, *keys) >> np.uint64(11)) * 2.0 ** -53
+
+def keyed_counts(uniforms, low, high, mean):
+    """
+    A count between low and high (inclusive) per keyed uniform: uniform when mean is None, otherwise
+    geometric with the given mean, i.e. most values small with a long tail, clipped to high.
+    """
+    if mean is None:
+        return low + np.floor(uniforms * (high - low + 1)).astype(np.int64)
+    if mean <= low:
+        return np.full(len(uniforms), low, dtype=np.int64)
+    p = 1.0 / (mean - low + 1)
+    # Inverse CDF of the geometric distribution on 1, 2, ...
+    draws = 1 + np.floor(np.log1p(-uniforms) / np.log1p(-p)).astype(np.int64)
+    return np.minimum(low + draws - 1, high)
+
+def keyed_ranking(uniforms, weights=None):
+    """
+    A random ranking of the count items of each row of a (rows, count) array of keyed uniforms, as
+    an index array; the first k columns of a row are a sample of k distinct items. With weights,
+    items are ranked by exponential keys divided by their weight (Efraimidis-Spirakis in log form),
+    so popular items tend to come first.
+    """
+    if weights is None:
+        return np.argsort(uniforms, axis=1)
+    return np.argsort(-np.log1p(-uniforms) / weights, axis=1)
+
+def keyed_choice(bits, count, weights=None):
+    """
+    An item index in [0, count) per element of keyed_bits, by weights if given. Without weights
+    this is a jump consistent hash, so adding an item at the end only moves the keys that land on it.
+    """
+    if weights is not None:
+        uniforms = (bits >> np.uint64(11)) * 2.0 ** -53
+        return np.minimum(np.searchsorted(np.cumsum(weights), uniforms, side='right'), count - 1)
+    keys = np.array(bits, dtype=np.uint64)
+    chosen = np.zeros(len(keys), dtype=np.int64)
+    jumps = np.zeros(len(keys), dtype=np.int64)
+    active = np.arange(len(keys))
+    with np.errstate(over='ignore'):
+        while len(active):
+            chosen[active] = jumps[active]
+            keys[active] = keys[active] * np.uint64(2862933555777941757) + np.uint64(1)
+            jumps[active] = ((chosen[active] + 1) * ((1 << 31) / ((keys[active] >> np.uint64(33)) + 1).astype(np.float64))).astype(np.int64)
+            active = active[jumps[active] < count]
+    return chosen
+
@@ -0,0 +1,20 @@
+"""
+Dataset directories shared by run.py and the stages.
+
+By default the pipeline reads original-data/ and writes manipulated-data/ next to run.py.
+Setting DROP_TABLE_DATA (run.py --data) points both at another dataset root instead,
+e.g. one written by synthesize.py; the final import files are written there too.
+"""
+from pathlib import Path
+import os
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = Path(os.environ.get('DROP_TABLE_DATA') or BASE_DIR).resolve()
+ORIGINAL_DATA = DATA_DIR / 'original-data'
+MANIPULATED_DATA = DATA_DIR / 'manipulated-data'
+
+# Artifacts that leave the pipeline, side by side in the dataset root: the import files written by
+# run.py (--format sql or tsv) and the static catalog written by the catalog_snapshot stage
+SQL_EXPORT = DATA_DIR / 'DROP-TABLE-COMPLETE.sql'
+TSV_EXPORT = DATA_DIR / 'DROP-TABLE-TSV'
+CATALOG_EXPORT = DATA_DIR / 'DROP-TABLE-CATALOG'
@@ -0,0 +1,141 @@
+"""
+Maps the per-product attribute dumps to Product columns: brand names to brand IDs, category names
+to category IDs, and brand, category and dimensions to the specifications JSON. Names are resolved
+through resolver.Resolver, which creates an ID for every name it cannot match, so the Brand and
+Category tables are written here too: the original brands.sql and categories.sql plus any names created.
+
+products_with_text_brand.sql, products_with_text_category.sql and dimensions.sql are positionally
+aligned (row n of each describes product n), so they are walked in lockstep, exactly once, and the
+three per-product tables are filled from that one row stream.
+"""
+from itertools import zip_longest
+import json
+import sys
+
+from columnstore import TableWriter, write_table, INT32, TEXT
+from sqlcodec import iter_rows, decode_bytes
+from sqltokenizer import iter_raw_tuples
+from resolver import Resolver, load_aliases, ALIASES_FILE
+from schema import column_schema
+from paths import ORIGINAL_DATA, MANIPULATED_DATA
+
+# The per-product attribute dumps, in the order iter_attributes yields their values
+ATTRIBUTE_FILES = ['products_with_text_brand.sql', 'products_with_text_category.sql', 'dimensions.sql']
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [ORIGINAL_DATA / 'brands.sql', ORIGINAL_DATA / 'categories.sql', ALIASES_FILE] + \
+    [ORIGINAL_DATA / name for name in ATTRIBUTE_FILES]
+OUTPUTS = [
+    MANIPULATED_DATA / 'brands',
+    MANIPULATED_DATA / 'categories',
+    MANIPULATED_DATA / 'brand_ids',
+    MANIPULATED_DATA / 'category_ids',
+    MANIPULATED_DATA / 'specifications'
+]
+
+# Columns of the Brand and Category tables
+BRAND_SCHEMA = column_schema('Brand')
+CATEGORY_SCHEMA = column_schema('Category')
+
+def load_resolver(kind, filename, aliases):
+    """A Resolver over the names in filename, the name table of kind, in ID order"""
+    print(f"⏳ Loading {kind} names from {filename}")
+    try:
+        names = [row[0] for row in iter_rows(ORIGINAL_DATA / filename)]
+
+        if not names:
+            print(f"🔴 Error: No {kind} entries found in {filename}")
+            sys.exit(1)
+
+        invalid = [idx for idx, name in enumerate(names, start=1) if not isinstance(name, str)]
+        if invalid:
+            print(f"🔴 Error: Invalid {kind} names in rows {', '.join(map(str, invalid[:10]))}")
+            sys.exit(1)
+
+        resolver = Resolver(kind, names, aliases.get(kind))
+        print(f"✅ Found {len(names)} {kind} names and {len(aliases.get(kind, {}))} aliases")
+        return resolver
+    except FileNotFoundError:
+        print(f"🔴 Error: File not found: {ORIGINAL_DATA / filename}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"🔴 Error: Failed to load {kind} names: {str(e)}")
+        sys.exit(1)
+
+def write_names(path, schema, resolver):
+    """Writes the name table of resolver, including the names it created, as (id, name) rows"""
+    write_table(path, schema, enumerate(resolver.names, start=1))
+
+def iter_attributes():
+    """
+    Yields the decoded (brand, category, dimensions) of every product, reading the attribute dumps
+    side by side. Stops at the end of the shortest file, with a warning if the lengths differ.
+    """
+    readers = [iter_raw_tuples(ORIGINAL_DATA / name) for name in ATTRIBUTE_FILES]
+    count = 0
+    for rows in zip_longest(*readers):
+        if None in rows:
+            ended = [name for name, row in zip(ATTRIBUTE_FILES, rows) if row is None]
+            print(f"⚠️  {', '.join(ended)} ended after {count} products, ignoring the remaining rows of the other files")
+            break
+        count += 1
+        yield tuple(decode_bytes(row[0]) for row in rows)
+
+def process_attributes(brands, categories, brand_writer, category_writer, spec_writer):
+    """Writes the brand ID, category ID and specifications JSON of every product; returns the number of products"""
+    print(f"🔧 Processing {', '.join(ATTRIBUTE_FILES)}")
+    products = 0
+    try:
+        for brand_name, category_name, dimensions in iter_attributes():
+            brand_writer.append((brands.resolve(brand_name),))
+            category_writer.append((categories.resolve(category_name),))
+
+            spec = {
+                "Brand": brand_name,
+                "Category": category_name,
+                "Dimensions": dimensions
+            }
+            try:
+                spec_writer.append((json.dumps(spec, ensure_ascii=False),))
+            except Exception as e:
+                print(f"🔴 Error: Failed to convert specification to JSON: {str(e)}")
+                spec_writer.append(("{}",))
+            products += 1
+    except FileNotFoundError as e:
+        print(f"🔴 Error: File not found: {e.filename}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"🔴 Error: Failed to process product attributes: {str(e)}")
+        sys.exit(1)
+
+    if products == 0:
+        print("🔴 Error: No products found in one or more attribute files")
+        sys.exit(1)
+    return products
+
+def main():
+    print("🚀 Starting product attribute conversion")
+    try:
+        aliases = load_aliases()
+        brands = load_resolver('brand', 'brands.sql', aliases)
+        categories = load_resolver('category', 'categories.sql', aliases)
+
+        # One row per product in each of the brand_id, category_id and specifications columns
+        with TableWriter(MANIPULATED_DATA / 'brand_ids', [('brand_id', INT32)]) as brand_writer, \
+                TableWriter(MANIPULATED_DATA / 'category_ids', [('category_id', INT32)]) as category_writer, \
+                TableWriter(MANIPULATED_DATA / 'specifications', [('specifications', TEXT)]) as spec_writer:
+            products = process_attributes(brands, categories, brand_writer, category_writer, spec_writer)
+
+        # Unresolved names are reported once, and become rows of the name tables
+        brands.report()
+        categories.report()
+        write_names(MANIPULATED_DATA / 'brands', BRAND_SCHEMA, brands)
+        write_names(MANIPULATED_DATA / 'categories', CATEGORY_SCHEMA, categories)
+
+        print(f"\n🎉 Successfully mapped brands, categories and specifications of {products} products\n")
+    except Exception as e:
+        print(f"🔴 Error: Product attribute conversion failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,157 +1,172 @@
-from pathlib import Path
+import os
 import sys
-import random
-import re
 
-# Define paths
-BASE_DIR = Path(__file__).parent.parent
-ORIGINAL_DATA = BASE_DIR / 'original-data'
-MANIPULATED_DATA = BASE_DIR / 'manipulated-data'
-random.seed("DROP TABLE")
+import numpy as np
+
+from columnstore import read_table, TableWriter
+from generation import GENERATION_FILE, load_generation, zipf_weights, keyed_bits, keyed_uniforms, keyed_counts, keyed_ranking
+from schema import column_schema
+from paths import MANIPULATED_DATA
+
+SEED = "DROP TABLE"
+
+# Together with SEED, picks the "random" listing order (shuffle_rank); run.py --shuffle-nonce sets it,
+# so a reshuffle is a deliberate, reproducible change of the stage's parameters
+SHUFFLE_NONCE = os.environ.get('DROP_TABLE_SHUFFLE_NONCE') or '0'
+
+# Products generated per block; keeps the per-block arrays around a few MB
+BLOCK_PRODUCTS = 1 << 16
+
+# Parameters that affect the output (part of the stage cache key in run.py)
+PARAMS = {'seed': SEED, 'shuffle_nonce': SHUFFLE_NONCE}
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [
+    MANIPULATED_DATA / 'retailers',
+    MANIPULATED_DATA / 'products',
+    MANIPULATED_DATA / 'prices_zar',
+    GENERATION_FILE
+]
+OUTPUTS = [MANIPULATED_DATA / 'product_retailers']
+
+# Columns of the Product_Retailer table
+PRODUCT_RETAILER_SCHEMA = column_schema('Product_Retailer')
+
+# shuffle_rank is a random key in [0, SHUFFLE_RANKS) that orders the "random" product listing
+SHUFFLE_RANKS = 2 ** 31 - 1
 
 def get_retailers():
-    """Load retailers from retailers.sql"""
-    print("⏳ Loading retailers from retailers.sql")
-    retailers = []
+    """Load retailers from the retailers table"""
+    print("⏳ Loading retailers from retailers")
     try:
-        with open(MANIPULATED_DATA / 'retailers.sql', 'r') as f:
-            content = f.read()
-            
-        # Extract retailer data using regex
-        pattern = r'\((\d+),\s*\'([^\']+)\',\s*\'([^\']+)\'\)'
-        matches = re.findall(pattern, content)
+        retailers = list(read_table(MANIPULATED_DATA / 'retailers').iter_rows())
         
-        if not matches:
-            print("🔴 Error: No retailer entries found in retailers.sql")
+        if not retailers:
+            print("🔴 Error: No retailer entries found in retailers")
             sys.exit(1)
-            
-        for match in matches:
-            retailer_id, name, url = match
-            retailers.append((int(retailer_id), name, url))
                 
         print(f"✅ Found {len(retailers)} retailers")
         return retailers
     except FileNotFoundError:
-        print(f"🔴 Error: File not found: {MANIPULATED_DATA / 'retailers.sql'}")
+        print(f"🔴 Error: File not found: {MANIPULATED_DATA / 'retailers'}")
         sys.exit(1)
     except Exception as e:
         print(f"🔴 Error: Failed to parse retailers: {str(e)}")
         sys.exit(1)
 
 def get_product_count():
-    """Determine the number of products from merged_products.sql"""
-    print("⏳ Counting products from merged_products.sql")
+    """Determine the number of products from the products table"""
+    print("⏳ Counting products from products")
     try:
-        with open(MANIPULATED_DATA / 'merged_products.sql', 'r') as f:
-            content = f.read()
-            
-        # Find the highest product ID
-        pattern = r'\((\d+),'
-        matches = re.findall(pattern, content)
+        # Find the highest product ID (only the id column is read)
+        product_ids = read_table(MANIPULATED_DATA / 'products')['id']
         
-        if not matches:
-            print("🔴 Error: No product entries found in merged_products.sql")
+        if not product_ids:
+            print("🔴 Error: No product entries found in products")
             sys.exit(1)
             
-        # Convert all matches to integers and find the maximum
-        product_ids = [int(match) for match in matches]
         max_product_id = max(product_ids)
         
         print(f"✅ Found {max_product_id} products")
         return max_product_id
     except FileNotFoundError:
-        print(f"🔴 Error: File not found: {MANIPULATED_DATA / 'merged_products.sql'}")
+        print(f"🔴 Error: File not found: {MANIPULATED_DATA / 'products'}")
         sys.exit(1)
     except Exception as e:
         print(f"🔴 Error: Failed to count products: {str(e)}")
         sys.exit(1)
 
 def get_price_data():
-    """Load price data from prices_in_zar.sql"""
-    print("⏳ Loading price data from prices_in_zar.sql")
+    """Load the initial prices from the prices_zar table as an int64 array of ZAR cents"""
+    print("⏳ Loading price data from prices_zar")
     try:
-        with open(MANIPULATED_DATA / 'prices_in_zar.sql', 'r') as f:
-            content = f.read()
+        prices = np.asarray(read_table(MANIPULATED_DATA / 'prices_zar')['initial_cents'])
         
-        # Extract price pairs using regex
-        pattern = r'\(([\d.]+),\s*([\d.]+)\)'
-        matches = re.findall(pattern, content)
-        
-        if not matches:
-            print("🔴 Error: No price entries found in prices_in_zar.sql")
+        if not len(prices):
+            print("🔴 Error: No price entries found in prices_zar")
             sys.exit(1)
             
-        return [(float(init), float(final)) for init, final in matches]
+        return prices
     except Exception as e:
         print(f"🔴 Error loading prices: {str(e)}")
         sys.exit(1)
 
-def generate_product_retailer_data(product_count, retailers):
-    """Generate random product-retailer relationships with prices"""
-    print("🔧 Generating product-retailer relationships")
-    price_data = get_price_data()
-    product_retailer_data = []
-    
-    for product_id in range(1, product_count + 1):
-        # Get price pair specific to this product
-        price_index = (product_id - 1) % len(price_data)
-        base_init, base_final = price_data[price_index]
-        
-        num_retailers = random.randint(1, len(retailers))
-        selected_retailers = random.sample(retailers, num_retailers)
-        
-        for retailer_id, retailer_name, retailer_url in selected_retailers:
-            # Apply retailer-specific scaling
-            scale_factor = random.uniform(0.85, 1.15)
-            initial_price = round(base_init * scale_factor, 2)
-            
-            # Generate weighted discount
-            discount = random.triangular(0, 99, 0)
-            final_price = round(initial_price * (1 - discount/100), 2)
-            
-            product_url = f"{retailer_url}"
-            
-            product_retailer_data.append((product_id, retailer_id, product_url, initial_price, final_price))
+def discount_pcts(initial_cents, final_cents):
+    """The discount as a percentage of the initial price, rounded to 2 decimals (0 without an initial price)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pcts = np.where(initial_cents > 0, (initial_cents - final_cents) * 100 / initial_cents, 0.0)
+    return np.round(pcts, 2)
 
-    print(f"✅ Generated {len(product_retailer_data)} product-retailer relationships")
-    return product_retailer_data
+def generate_block(seed, first_id, count, retailers, base_prices, retailers_per_product_mean=None, weights=None, shuffle_nonce=SHUFFLE_NONCE):
+    """
+    Generate the relationships of products first_id .. first_id + count - 1 as column arrays.
+    Each product gets a random non-empty subset of the retailers (favouring popular ones when
+    weights are given), a price scaled by 0.85-1.15 from its base price and a triangular
+    discount between 0 and 99% weighted towards 0. Every draw is keyed by the product id (and
+    retailer id), so a product's rows only depend on seed, the product and the retailers; the
+    shuffle ranks also depend on shuffle_nonce.
+    """
+    retailer_ids = np.array([retailer[0] for retailer in retailers], dtype=np.int32)
+    retailer_urls = [retailer[2].encode('utf-8') for retailer in retailers]
+    product_ids = np.arange(first_id, first_id + count, dtype=np.int32)
 
-def create_product_retailer_sql(product_retailer_data):
-    """Create SQL insert statements for product-retailer data"""
-    print("🔧 Creating SQL for product-retailer relationships")
-    try:
-        # Create SQL insert statement
-        output_lines = ["INSERT INTO `Product_Retailer` (`product_id`, `retailer_id`, `product_url`, `initial_price`, `final_price`) VALUES"]
-        
-        for product_id, retailer_id, product_url, initial_price, final_price in product_retailer_data:
-            # Format the values for SQL insert
-            output_lines.append(f"({product_id}, {retailer_id}, '{product_url}', {initial_price}, {final_price}),")
-        
-        # Replace the last comma with a semicolon
-        output_lines[-1] = output_lines[-1].replace("),", ");")
-        
-        return "\n".join(output_lines)
-    except Exception as e:
-        print(f"🔴 Error: Failed to create SQL: {str(e)}")
-        sys.exit(1)
+    # Sample without replacement for every product at once: rank keyed random values per row
+    # and keep the first num_retailers columns of the ranking
+    num_retailers = keyed_counts(keyed_uniforms(seed, 'retailer_count', product_ids), 1, len(retailers), retailers_per_product_mean)
+    ranking = keyed_ranking(keyed_uniforms(seed, 'retailer_rank', product_ids[:, None], retailer_ids[None, :]), weights)
+    selected = ranking[np.arange(len(retailers)) < num_retailers[:, None]]
+    product_ids = np.repeat(product_ids, num_retailers)
 
-if __name__ == '__main__':
+    # Get the price specific to each product, then apply retailer-specific scaling
+    base = base_prices[(product_ids - 1) % len(base_prices)]
+    scale = 0.85 + 0.3 * keyed_uniforms(seed, 'price_scale', product_ids, retailer_ids[selected])
+    initial_cents = np.rint(base * scale)
+    # Triangular between 0 and 99 with its mode at 0, by its inverse CDF
+    discount = 99 * (1 - np.sqrt(1 - keyed_uniforms(seed, 'discount', product_ids, retailer_ids[selected])))
+    final_cents = np.rint(initial_cents * (1 - discount / 100))
+
+    return [
+        product_ids,
+        retailer_ids[selected],
+        [retailer_urls[i] for i in selected.tolist()],
+        initial_cents / 100,
+        final_cents / 100,
+        discount_pcts(initial_cents, final_cents),
+        (keyed_bits(seed, f"shuffle_rank:{shuffle_nonce}", product_ids, retailer_ids[selected]) % np.uint64(SHUFFLE_RANKS)).astype(np.int32)
+    ]
+
+def generate_product_retailers(writer, product_count, retailers, base_prices, seed=SEED, settings=None, shuffle_nonce=SHUFFLE_NONCE):
+    """
+    Generate random product-retailer relationships with prices and append them to writer in blocks.
+    settings are the generation knobs (see generation.py); None uses the defaults.
+    Everything follows from seed, and shuffle_rank from seed and shuffle_nonce.
+    """
+    print("🔧 Generating product-retailer relationships")
+    settings = settings or load_generation()
+    rng = np.random.default_rng(list(seed.encode('utf-8')))
+    weights = zipf_weights(len(retailers), settings['retailer_skew'], rng)
+    for first_id in range(1, product_count + 1, BLOCK_PRODUCTS):
+        count = min(BLOCK_PRODUCTS, product_count + 1 - first_id)
+        writer.append_columns(generate_block(
+            seed, first_id, count, retailers, base_prices, settings['retailers_per_product_mean'], weights, shuffle_nonce))
+    print(f"✅ Generated {writer.rows} product-retailer relationships")
+    return writer.rows
+
+def main():
     print("🚀 Starting product-retailer processing")
     try:
         retailers = get_retailers()
         product_count = get_product_count()
-        product_retailer_data = generate_product_retailer_data(product_count, retailers)
-        sql_output = create_product_retailer_sql(product_retailer_data)
+        base_prices = get_price_data()
         
-        # Ensure output directory exists
-        MANIPULATED_DATA.mkdir(exist_ok=True)
+        output_path = MANIPULATED_DATA / 'product_retailers'
+        with TableWriter(output_path, PRODUCT_RETAILER_SCHEMA) as writer:
+            rows = generate_product_retailers(writer, product_count, retailers, base_prices)
         
-        # Write to new file
-        output_path = MANIPULATED_DATA / 'product_retailers.sql'
-        with open(output_path, 'w') as f:
-            f.write(sql_output)
-        
-        print(f"\n🎉 Successfully generated {output_path} with {len(product_retailer_data)} product-retailer relationships\n")
+        print(f"\n🎉 Successfully generated {output_path} with {rows} product-retailer relationships\n")
     except Exception as e:
         print(f"🔴 Error: Product-retailer processing failed: {str(e)}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
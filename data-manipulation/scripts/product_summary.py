@@ -0,0 +1,121 @@
+"""
+Builds the Product_Summary read model: one row per Product_Retailer listing with everything
+the product listing shows (titles, image, brand/category/retailer names, prices, discount,
+average rating and review count), so listings can be served from a single indexed table
+instead of joining Product, Product_Retailer, Retailer, Brand, Category and Review.
+Listings whose product has no brand or category are left out, like the inner joins they replace.
+"""
+import sys
+
+import numpy as np
+
+from columnstore import read_table, TableWriter, NULL_INT
+from schema import column_schema
+from paths import MANIPULATED_DATA
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [
+    MANIPULATED_DATA / 'brands',
+    MANIPULATED_DATA / 'categories',
+    MANIPULATED_DATA / 'products',
+    MANIPULATED_DATA / 'retailers',
+    MANIPULATED_DATA / 'product_retailers',
+    MANIPULATED_DATA / 'reviews'
+]
+OUTPUTS = [MANIPULATED_DATA / 'product_summary']
+
+# Columns of the Product_Summary table
+PRODUCT_SUMMARY_SCHEMA = column_schema('Product_Summary')
+
+# Listings are summarised this many at a time
+BLOCK_LISTINGS = 1 << 16
+
+def load_names(path):
+    """UTF-8 names from an (id, name) table with ids 1..n, indexed by id (index 0 unused)"""
+    names = read_table(path)
+    column = names[names.names[1]]
+    return [None] + [column.raw(i) for i in range(len(column))]
+
+def review_stats(reviews, size):
+    """(average score or NaN, review count) per product id, as arrays indexed by product id"""
+    product_ids = np.asarray(reviews['product_id'])
+    counts = np.bincount(product_ids, minlength=size)
+    sums = np.bincount(product_ids, weights=np.asarray(reviews['score']), minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratings = np.where(counts > 0, sums / counts, np.nan)
+    return ratings, counts.astype(np.int32)
+
+def summarise(writer, products, listings, retailer_names, brand_names, category_names, reviews):
+    """Appends a summary row for every listing whose product exists and has a brand and category; returns the row count"""
+    product_ids = np.asarray(products['id'])
+    size = int(product_ids.max(initial=0)) + 1
+    row_of = np.full(size, -1, dtype=np.int64)
+    row_of[product_ids] = np.arange(len(product_ids))
+    brand_ids = np.asarray(products['brand_id'])
+    category_ids = np.asarray(products['category_id'])
+    titles = products['title']
+    image_urls = products['image_url']
+    ratings, review_counts = review_stats(reviews, size)
+
+    listing_products = np.asarray(listings['product_id'])
+    listing_retailers = np.asarray(listings['retailer_id'])
+    initial_prices = np.asarray(listings['initial_price'])
+    final_prices = np.asarray(listings['final_price'])
+    discount_pcts = np.asarray(listings['discount_pct'])
+    shuffle_ranks = np.asarray(listings['shuffle_rank'])
+
+    for start in range(0, len(listings), BLOCK_LISTINGS):
+        block = slice(start, start + BLOCK_LISTINGS)
+        block_products = listing_products[block]
+        rows = np.where(block_products < size, row_of[np.minimum(block_products, size - 1)], -1)
+        keep = rows >= 0
+        keep[keep] = (brand_ids[rows[keep]] != NULL_INT) & (category_ids[rows[keep]] != NULL_INT)
+        rows = rows[keep]
+        block_products = block_products[keep]
+        block_retailers = listing_retailers[block][keep]
+        row_list = rows.tolist()
+
+        writer.append_columns([
+            block_products,
+            block_retailers,
+            [titles.raw(i) for i in row_list],
+            [image_urls.raw(i) for i in row_list],
+            [brand_names[i] for i in brand_ids[rows].tolist()],
+            [category_names[i] for i in category_ids[rows].tolist()],
+            [retailer_names[i] for i in block_retailers.tolist()],
+            initial_prices[block][keep],
+            final_prices[block][keep],
+            discount_pcts[block][keep],
+            shuffle_ranks[block][keep],
+            ratings[block_products],
+            review_counts[block_products]
+        ])
+    return writer.rows
+
+def main():
+    print("🚀 Starting product summary build")
+    output_path = MANIPULATED_DATA / 'product_summary'
+
+    try:
+        brand_names = load_names(MANIPULATED_DATA / 'brands')
+        category_names = load_names(MANIPULATED_DATA / 'categories')
+        retailers = read_table(MANIPULATED_DATA / 'retailers')
+        retailer_names = dict(zip(retailers['id'], (name.encode('utf-8') for name in retailers['name'])))
+        products = read_table(MANIPULATED_DATA / 'products')
+        listings = read_table(MANIPULATED_DATA / 'product_retailers')
+        reviews = read_table(MANIPULATED_DATA / 'reviews')
+        print(f"✅ Found {len(products)} products, {len(listings)} listings and {len(reviews)} reviews")
+
+        with TableWriter(output_path, PRODUCT_SUMMARY_SCHEMA) as writer:
+            rows = summarise(writer, products, listings, retailer_names, brand_names, category_names, reviews)
+
+        skipped = len(listings) - rows
+        if skipped:
+            print(f"⚠️  Skipped {skipped} listings of products without a brand or category")
+        print(f"\n🎉 Successfully wrote {rows} product summaries to {output_path}\n")
+    except Exception as e:
+        print(f"🔴 Error: Product summary build failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Resolution of free-text brand and category names to IDs.
+
+Names are compared by a folded key: accents stripped (NFKD without combining marks), case folded,
+and every run of whitespace, punctuation or underscores reduced to one space, so "Dr. Martens",
+"dr martens" and "DR-MARTENS" are the same brand. aliases.csv maps other spellings to a canonical
+name. A name that still does not resolve gets a new ID rather than NULL, as Product.brand_id and
+Product.category_id are NOT NULL; the names created are reported together once the build is done.
+"""
+from collections import Counter
+import csv
+import re
+import unicodedata
+
+from paths import ORIGINAL_DATA
+
+# Alias table: kind (brand or category), alias, and the canonical name the alias stands for
+ALIASES_FILE = ORIGINAL_DATA / 'aliases.csv'
+
+# Name given to a missing (NULL or blank) name, and the longest name the name columns hold
+UNKNOWN_NAME = 'Unknown'
+MAX_NAME_LENGTH = 255
+
+_SEPARATORS = re.compile(r'[\W_]+')
+
+def fold(name):
+    """The lookup key of a name: accents stripped, case folded, punctuation and whitespace runs as single spaces"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+    return _SEPARATORS.sub(' ', stripped).strip()
+
+def load_aliases(path=ALIASES_FILE):
+    """{kind: {alias: canonical name}} from the alias table; empty if there is none"""
+    aliases = {}
+    if not path.exists():
+        return aliases
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for line, record in enumerate(csv.DictReader(f), start=2):
+            try:
+                kind, alias, name = record['kind'].strip(), record['alias'], record['name']
+            except (KeyError, AttributeError):
+                raise ValueError(f"Malformed alias table {path.name} on line {line}")
+            aliases.setdefault(kind, {})[alias] = name
+    return aliases
+
+class Resolver:
+    """
+    Maps names to the IDs of a name table (names[i - 1] has ID i). Built once per build; every
+    lookup is a dict hit, on the raw name first and on its folded key when the raw name is new.
+    """
+    def __init__(self, kind, names, aliases=None):
+        self.kind = kind
+        self.names = list(names)
+        self.known = len(self.names)
+        self._ids = {}
+        for i, name in enumerate(self.names, start=1):
+            self._ids.setdefault(fold(name), i)
+        for alias, name in (aliases or {}).items():
+            target = self._ids.get(fold(name))
+            if target is None:
+                raise ValueError(f"Alias {alias!r} refers to unknown {kind} {name!r}")
+            self._ids.setdefault(fold(alias), target)
+        self._cache = {}
+        self._created_rows = Counter()
+
+    def resolve(self, name):
+        """The ID of name, creating one if it matches no known name or alias"""
+        resolved = self._cache.get(name)
+        if resolved is None:
+            resolved = self._lookup(name)
+            self._cache[name] = resolved
+        if resolved > self.known:
+            self._created_rows[resolved] += 1
+        return resolved
+
+    def _lookup(self, name):
+        key = fold(name) if isinstance(name, str) else ''
+        if not key:
+            name, key = UNKNOWN_NAME, fold(UNKNOWN_NAME)
+        resolved = self._ids.get(key)
+        if resolved is None:
+            self.names.append(' '.join(name.split())[:MAX_NAME_LENGTH])
+            resolved = len(self.names)
+            self._ids[key] = resolved
+        return resolved
+
+    def created(self):
+        """(ID, name, rows resolved to it) of every name created, most used first"""
+        return [(i, self.names[i - 1], rows) for i, rows in self._created_rows.most_common()]
+
+    def report(self, limit=20):
+        """Prints the names that had to be created, in one block"""
+        created = self.created()
+        if not created:
+            print(f"✅ Every {self.kind} name resolved")
+            return
+        rows = sum(count for _, _, count in created)
+        print(f"⚠️  {len(created)} unresolved {self.kind} names in {rows} rows were given new IDs:")
+        for i, name, count in created[:limit]:
+            print(f"   {i}: {name!r} ({count} rows)")
+        if len(created) > limit:
+            print(f"   ... and {len(created) - limit} more")
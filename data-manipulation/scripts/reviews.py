@@ -1,116 +1,142 @@
 import json
-import random
-import os
-from pathlib import Path
+import sys
 
-random.seed("DROP TABLE")
+import numpy as np
 
-def generate_reviews():
+from columnstore import read_table, TableWriter
+from generation import (GENERATION_FILE, load_generation, load_user_ids, zipf_weights,
+                        keyed_bits, keyed_uniforms, keyed_counts, keyed_ranking, keyed_choice)
+from schema import column_schema
+from paths import ORIGINAL_DATA, MANIPULATED_DATA
+
+SEED = "DROP TABLE"
+
+# Each product gets between 0 and MAX_REVIEWS_PER_PRODUCT reviews, each by a different user
+MAX_REVIEWS_PER_PRODUCT = 15
+
+# Parameters that affect the output (part of the stage cache key in run.py)
+PARAMS = {'seed': SEED, 'max_reviews_per_product': MAX_REVIEWS_PER_PRODUCT}
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [ORIGINAL_DATA / 'reviews.json', ORIGINAL_DATA / 'users.sql', MANIPULATED_DATA / 'products', GENERATION_FILE]
+OUTPUTS = [MANIPULATED_DATA / 'reviews']
+
+# Columns of the Review table
+REVIEW_SCHEMA = column_schema('Review')
+
+# Reviews are generated for this many products at a time
+BLOCK_PRODUCTS = 1 << 16
+
+def draw_reviewers(seed, product_ids, counts, user_ids, max_reviews, weights=None):
+    """
+    Draws counts[i] distinct user indexes (0 .. len(user_ids) - 1) for every product_ids[i] at once,
+    keyed by the product id, so a product's reviewers do not depend on the other products.
+    Returns them flattened in product order.
+    """
+    user_count = len(user_ids)
+    if user_count <= 4 * max_reviews:
+        # Few users: rank keyed values per (product, user) and keep the first counts[i] columns
+        ranking = keyed_ranking(keyed_uniforms(seed, 'reviewer_rank', product_ids[:, None], user_ids[None, :]), weights)
+        return ranking[np.arange(user_count) < counts[:, None]]
+
+    # Many users: one keyed draw per review slot, redrawing the (rare) repeats within a product
+    # with the next attempt number
+    owners = np.repeat(product_ids.astype(np.int64), counts)
+    slots = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+    attempts = np.zeros(len(owners), dtype=np.int64)
+    users = keyed_choice(keyed_bits(seed, 'reviewer', owners, slots, attempts), user_count, weights)
+    while True:
+        pairs = owners * user_count + users
+        order = np.argsort(pairs, kind='stable')
+        repeats = order[1:][pairs[order[1:]] == pairs[order[:-1]]]
+        if not len(repeats):
+            return users
+        attempts[repeats] += 1
+        users[repeats] = keyed_choice(keyed_bits(seed, 'reviewer', owners[repeats], slots[repeats], attempts[repeats]), user_count, weights)
+
+def generate_reviews(writer, product_ids, user_ids, templates, seed=SEED, max_reviews=MAX_REVIEWS_PER_PRODUCT, settings=None):
+    """
+    Appends random reviews for product_ids to writer in blocks of products. Each product gets
+    between 0 and max_reviews reviews (capped by the number of users; uniform, or geometric with
+    the configured mean), from distinct users, each using a random template. Every draw is keyed
+    by the product id (and user id), so adding a product leaves the other products' reviews as they are.
+    settings are the generation knobs (see generation.py); None uses the defaults.
+    Returns (reviews, users used, products reviewed).
+    """
+    settings = settings or load_generation()
+    rng = np.random.default_rng(list(seed.encode('utf-8')))
+    user_ids = np.asarray(user_ids, dtype=np.int32)
+    product_ids = np.asarray(product_ids, dtype=np.int32)
+    scores = np.array([template['rating'] for template in templates], dtype=np.int32)
+    comments = [template['comment'].encode('utf-8') for template in templates]
+    max_reviews = min(max_reviews, len(user_ids))
+    weights = zipf_weights(len(user_ids), settings['user_skew'], rng)
+
+    users_used = np.zeros(len(user_ids), dtype=bool)
+    products_reviewed = 0
+    for start in range(0, len(product_ids), BLOCK_PRODUCTS):
+        block = product_ids[start:start + BLOCK_PRODUCTS]
+        counts = keyed_counts(keyed_uniforms(seed, 'review_count', block), 0, max_reviews, settings['reviews_per_product_mean'])
+        reviewers = draw_reviewers(seed, block, counts, user_ids, max_reviews, weights)
+        owners = np.repeat(block, counts)
+        picks = np.floor(keyed_uniforms(seed, 'template', owners, user_ids[reviewers]) * len(templates)).astype(np.int64)
+
+        writer.append_columns([
+            user_ids[reviewers],
+            owners,
+            scores[picks],
+            [comments[i] for i in picks.tolist()]
+        ])
+        users_used[reviewers] = True
+        products_reviewed += int(np.count_nonzero(counts))
+
+    return writer.rows, int(np.count_nonzero(users_used)), products_reviewed
+
+def main():
     print("\n🔵 Generating product reviews...")
-    
-    base_dir = Path(__file__).parent.parent
-    reviews_json_path = base_dir / 'original-data' / 'reviews.json'
-    products_sql_path = base_dir / 'manipulated-data' / 'merged_products.sql'
-    output_path = base_dir / 'manipulated-data' / 'reviews.sql'
-    
+
+    reviews_json_path = ORIGINAL_DATA / 'reviews.json'
+    products_path = MANIPULATED_DATA / 'products'
+    output_path = MANIPULATED_DATA / 'reviews'
+
     try:
         with open(reviews_json_path, 'r') as f:
             review_templates = json.load(f)
         print(f"✅ Loaded {len(review_templates)} review templates")
     except Exception as e:
         print(f"🔴 Failed to load review templates: {str(e)}")
-        return
-    
-    product_ids = []
+        sys.exit(1)
+
     try:
-        with open(products_sql_path, 'r') as f:
-            content = f.read()
-            
-            lines = content.split('\n')
-            for line in lines:
-                if 'INSERT INTO `Product`' in line and 'VALUES' in line:
-                    continue
-                    
-                if line.strip().startswith('('):
-                    # Extract ID from the first value in the values line
-                    product_id = line.split(',')[0].strip('( ')
-                    if product_id.isdigit():
-                        product_ids.append(int(product_id))
-        
+        user_ids = load_user_ids()
+        print(f"✅ Found {len(user_ids)} reviewing users")
+    except Exception as e:
+        print(f"🔴 Failed to load users: {str(e)}")
+        sys.exit(1)
+
+    try:
+        # Only the id column of the products table is read
+        product_ids = np.asarray(read_table(products_path)['id'])
+
         print(f"✅ Found {len(product_ids)} products")
     except Exception as e:
         print(f"🔴 Failed to extract product IDs: {str(e)}")
-        return
-    
-    if not product_ids:
-        print("🔴 No product IDs found. Cannot generate reviews.")
-        return
-    
-    # Generate reviews
-    reviews = []
-    available_user_ids = list(range(2, 17))  # User IDs 2-16
-    user_product_pairs = set()
-    
-    # which products get reviews and how many
-    for product_id in product_ids:
-        # Random number of reviews (0-15) for each product
-        max_possible_reviews = min(15, len(available_user_ids) - len([p for u, p in user_product_pairs if p == product_id]))
-        num_reviews = random.randint(0, max_possible_reviews)
-        
-        if num_reviews > 0:
-            # Get users who haven't reviewed this product yet
-            eligible_users = [user_id for user_id in available_user_ids 
-                             if (user_id, product_id) not in user_product_pairs]
-            
-            # Select random users for this product
-            selected_users = random.sample(eligible_users, min(num_reviews, len(eligible_users)))
-            
-            # Generate reviews for selected users
-            for user_id in selected_users:
-                # Select a random review
-                review_template = random.choice(review_templates)
-                
-                # Add the review
-                reviews.append({
-                    'user_id': user_id,
-                    'product_id': product_id,
-                    'score': review_template['rating'],
-                    'comment': review_template['comment']
-                })
-                
-                # user has reviewed this product
-                user_product_pairs.add((user_id, product_id))
-    
-    print(f"✅ Generated {len(reviews)} reviews using {len(set(r['user_id'] for r in reviews))} users")
-    print(f"✅ Reviews cover {len(set(r['product_id'] for r in reviews))} different products")
-    
-    # Write SQL file with a INSERT statement
+        sys.exit(1)
+
+    if not len(product_ids) or not user_ids or not review_templates:
+        print("🔴 Need products, users and review templates to generate reviews.")
+        sys.exit(1)
+
     try:
-        with open(output_path, 'w') as f:
-
-            if reviews:
-                # Write the INSERT statement
-                f.write("INSERT INTO `Review` (`user_id`, `product_id`, `score`, `comment`) VALUES\n")
-                
-                # Write each review as a values clause
-                for i, review in enumerate(reviews):
-                    # Escape single quotes in comments
-                    escaped_comment = review['comment'].replace("'", "\\'") 
-                    
-                    # Write the values clause
-                    f.write(f"({review['user_id']}, {review['product_id']}, {review['score']}, '{escaped_comment}')")
-                    
-                    # Add comma if not the last review, else semicolon
-                    if i < len(reviews) - 1:
-                        f.write(",\n")
-                    else:
-                        f.write(";\n")
-            else:
-                f.write("-- No reviews were generated\n")
-        
+        with TableWriter(output_path, REVIEW_SCHEMA) as writer:
+            reviews, users, products = generate_reviews(writer, product_ids, user_ids, review_templates)
+
+        print(f"✅ Generated {reviews} reviews using {users} users")
+        print(f"✅ Reviews cover {products} different products")
         print(f"✅ Successfully wrote reviews to {output_path}")
     except Exception as e:
-        print(f"🔴 Failed to write reviews SQL: {str(e)}")
+        print(f"🔴 Failed to write reviews table: {str(e)}")
+        sys.exit(1)
 
 if __name__ == "__main__":
-    generate_reviews()
\ No newline at end of file
+    main()
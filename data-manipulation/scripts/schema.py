@@ -0,0 +1,287 @@
+"""
+The database schema as a Python table model.
+
+Every table lists its columns (SQL definitions), primary key, AUTO_INCREMENT column, secondary
+keys and foreign keys. render_schema() turns the model into the schema dump that run.py puts
+around the data (in the phpMyAdmin dump layout split_schema expects), and the stages take the
+column layout of their output tables from column_schema(), so the intermediate tables and the
+SQL tables cannot drift apart. db-schema/DROP-TABLE.sql is generated from this model:
+
+    python scripts/schema.py
+
+Keys follow the API's queries: tables looked up by pairs of ids are clustered on those ids, and
+composite keys put the filtered column first and the sorted column second.
+"""
+from pathlib import Path
+import sys
+
+from columnstore import INT32, FLOAT64, TEXT
+
+SCHEMA_FILE = Path(__file__).parent.parent / 'db-schema' / 'DROP-TABLE.sql'
+
+TABLE_OPTIONS = "ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci"
+BINARY_TEXT = "CHARACTER SET utf8mb4 COLLATE utf8mb4_bin"
+
+class Column:
+    """A column: its name, SQL definition and column-table kind (derived from the SQL type unless given)"""
+    def __init__(self, name, definition, kind=None):
+        self.name = name
+        self.definition = definition
+        self.kind = kind or column_kind(definition)
+
+class Table:
+    """
+    A table of the model. primary_key is a tuple of column names, keys and foreign_keys are
+    lists of (name, columns) and (name, column, referenced table, referenced column, ON DELETE action).
+    """
+    def __init__(self, name, columns, primary_key=(), auto_increment=None, keys=(), foreign_keys=()):
+        self.name = name
+        self.columns = list(columns)
+        self.primary_key = tuple(primary_key)
+        self.auto_increment = auto_increment
+        self.keys = list(keys)
+        self.foreign_keys = list(foreign_keys)
+
+    def column(self, name):
+        return next(column for column in self.columns if column.name == name)
+
+def column_kind(definition):
+    """The column-table kind that holds values of an SQL column definition"""
+    sql_type = definition.split('(')[0].split()[0].lower()
+    if sql_type in ('int', 'bigint', 'smallint', 'tinyint'):
+        return INT32
+    if sql_type in ('decimal', 'float', 'double'):
+        return FLOAT64
+    return TEXT
+
+TABLES = [
+    Table('Brand', [
+        Column('id', "int(11) NOT NULL"),
+        Column('name', "varchar(255) NOT NULL")
+    ], primary_key=['id'], auto_increment='id'),
+
+    Table('Category', [
+        Column('id', "int(11) NOT NULL"),
+        Column('cat_name', "varchar(255) NOT NULL")
+    ], primary_key=['id'], auto_increment='id'),
+
+    Table('Facet_Count', [
+        Column('facet', "varchar(32) NOT NULL"),
+        Column('value', f"varchar(255) {BINARY_TEXT} NOT NULL"),
+        Column('value2', f"varchar(255) {BINARY_TEXT} NOT NULL DEFAULT ''"),
+        Column('products', "int(11) NOT NULL")
+    ], primary_key=['facet', 'value', 'value2']),
+
+    Table('Product', [
+        Column('id', "int(11) NOT NULL"),
+        Column('category_id', "int(11) NOT NULL"),
+        Column('brand_id', "int(11) NOT NULL"),
+        Column('title', "varchar(500) NOT NULL"),
+        Column('description', "varchar(10000) NOT NULL"),
+        Column('created_at', "timestamp NOT NULL DEFAULT current_timestamp()"),
+        Column('updated_at', "timestamp NOT NULL DEFAULT current_timestamp()"),
+        Column('image_url', "varchar(255) NOT NULL"),
+        Column('images', "varchar(1500) NOT NULL"),
+        Column('specifications', f"longtext {BINARY_TEXT} NOT NULL"),
+        Column('features', f"longtext {BINARY_TEXT} NOT NULL")
+    ], primary_key=['id'], auto_increment='id', keys=[
+        ('productBrand', ['brand_id']),
+        ('productCategory', ['category_id'])
+    ], foreign_keys=[
+        ('productBrand', 'brand_id', 'Brand', 'id', 'NO ACTION'),
+        ('productCategory', 'category_id', 'Category', 'id', 'NO ACTION')
+    ]),
+
+    # Listings are looked up by (product_id, retailer_id) and joined by product_id: clustered on both.
+    # retailer_id leads the retailer filter keys, so those also serve the Retailer foreign key
+    Table('Product_Retailer', [
+        Column('product_id', "int(11) NOT NULL"),
+        Column('retailer_id', "int(11) NOT NULL"),
+        Column('product_url', "varchar(255) NOT NULL"),
+        Column('initial_price', "decimal(10,2) NOT NULL"),
+        Column('final_price', "decimal(10,2) NOT NULL"),
+        Column('discount_pct', "decimal(5,2) NOT NULL DEFAULT 0"),
+        Column('shuffle_rank', "int(11) NOT NULL DEFAULT 0")
+    ], primary_key=['product_id', 'retailer_id'], keys=[
+        ('product_retailerRetailerPrice', ['retailer_id', 'final_price']),
+        ('product_retailerRetailerShuffle', ['retailer_id', 'shuffle_rank']),
+        ('product_retailerRetailerDiscount', ['retailer_id', 'discount_pct']),
+        ('product_retailerShuffle', ['shuffle_rank']),
+        ('product_retailerDiscount', ['discount_pct', 'shuffle_rank'])
+    ], foreign_keys=[
+        ('product_retailerProduct', 'product_id', 'Product', 'id', 'NO ACTION'),
+        ('product_retailerRetailer', 'retailer_id', 'Retailer', 'id', 'NO ACTION')
+    ]),
+
+    Table('Product_Summary', [
+        Column('product_id', "int(11) NOT NULL"),
+        Column('retailer_id', "int(11) NOT NULL"),
+        Column('title', "varchar(500) NOT NULL"),
+        Column('image_url', "varchar(255) NOT NULL"),
+        Column('brand_name', "varchar(255) NOT NULL"),
+        Column('category_name', "varchar(255) NOT NULL"),
+        Column('retailer_name', "varchar(255) NOT NULL"),
+        Column('initial_price', "decimal(10,2) NOT NULL"),
+        Column('final_price', "decimal(10,2) NOT NULL"),
+        Column('discount_pct', "decimal(5,2) NOT NULL DEFAULT 0"),
+        Column('shuffle_rank', "int(11) NOT NULL DEFAULT 0"),
+        Column('rating', "float DEFAULT NULL"),
+        Column('review_count', "int(11) NOT NULL DEFAULT 0")
+    ], primary_key=['product_id', 'retailer_id'], keys=[
+        ('summaryRetailer', ['retailer_id']),
+        ('summaryBrandPrice', ['brand_name', 'final_price']),
+        ('summaryCategoryPrice', ['category_name', 'final_price']),
+        ('summaryRetailerPrice', ['retailer_name', 'final_price']),
+        ('summaryPrice', ['final_price']),
+        ('summaryRating', ['rating']),
+        ('summaryShuffle', ['shuffle_rank']),
+        ('summaryDiscount', ['discount_pct', 'shuffle_rank']),
+        ('summaryBrandShuffle', ['brand_name', 'shuffle_rank']),
+        ('summaryCategoryShuffle', ['category_name', 'shuffle_rank'])
+    ], foreign_keys=[
+        ('summaryProduct', 'product_id', 'Product', 'id', 'CASCADE'),
+        ('summaryRetailer', 'retailer_id', 'Retailer', 'id', 'CASCADE')
+    ]),
+
+    Table('Retailer', [
+        Column('id', "int(11) NOT NULL"),
+        Column('name', "varchar(255) NOT NULL"),
+        Column('web_page_url', "varchar(255) NOT NULL")
+    ], primary_key=['id'], auto_increment='id'),
+
+    # Ratings are averaged per product, so reviews are clustered by product; a user reviews a product once.
+    # Scores are whole stars in the column tables
+    Table('Review', [
+        Column('user_id', "int(11) NOT NULL"),
+        Column('product_id', "int(11) NOT NULL"),
+        Column('score', "float NOT NULL DEFAULT 0", INT32),
+        Column('comment', "varchar(4000) NOT NULL")
+    ], primary_key=['product_id', 'user_id'], keys=[
+        ('user', ['user_id'])
+    ], foreign_keys=[
+        ('product', 'product_id', 'Product', 'id', 'NO ACTION'),
+        ('user', 'user_id', 'User', 'user_id', 'NO ACTION')
+    ]),
+
+    Table('Search_Term', [
+        Column('term', f"varchar(64) {BINARY_TEXT} NOT NULL"),
+        Column('product_id', "int(11) NOT NULL")
+    ], primary_key=['term', 'product_id'], keys=[
+        ('searchProduct', ['product_id'])
+    ], foreign_keys=[
+        ('searchProduct', 'product_id', 'Product', 'id', 'CASCADE')
+    ]),
+
+    Table('User', [
+        Column('user_id', "int(11) NOT NULL"),
+        Column('first_name', "varchar(30) NOT NULL"),
+        Column('last_name', "varchar(30) NOT NULL"),
+        Column('password', "varchar(100) NOT NULL"),
+        Column('email', "varchar(255) NOT NULL"),
+        Column('type', "set('user','admin') NOT NULL DEFAULT 'user'")
+    ], primary_key=['user_id'], auto_increment='user_id'),
+
+    # The listing's "on the watchlist" EXISTS check is a primary key lookup on (user_id, product_id)
+    Table('Watchlist_Item', [
+        Column('user_id', "int(11) NOT NULL"),
+        Column('retailer_name', "varchar(100) NOT NULL"),
+        Column('product_id', "int(11) NOT NULL"),
+        Column('initial_price', "decimal(10,2) NOT NULL"),
+        Column('final_price', "decimal(10,2) NOT NULL")
+    ], primary_key=['user_id', 'product_id'], keys=[
+        ('productWatch', ['product_id'])
+    ], foreign_keys=[
+        ('productWatch', 'product_id', 'Product', 'id', 'CASCADE'),
+        ('userWatch', 'user_id', 'User', 'user_id', 'CASCADE')
+    ])
+]
+
+def table(name):
+    """The model of the table called name"""
+    for candidate in TABLES:
+        if candidate.name == name:
+            return candidate
+    raise KeyError(f"No table {name!r} in the schema model")
+
+def column_schema(name):
+    """The [(column name, kind), ...] layout of table name for columnstore.TableWriter"""
+    return [(column.name, column.kind) for column in table(name).columns]
+
+_HEADER = """-- DROP TABLE database schema
+-- Generated from data-manipulation/scripts/schema.py, edit the model there and
+-- regenerate with: python scripts/schema.py
+
+SET SQL_MODE = "NO_AUTO_VALUE_ON_ZERO";
+START TRANSACTION;
+SET time_zone = "+00:00";
+
+
+/*!40101 SET @OLD_CHARACTER_SET_CLIENT=@@CHARACTER_SET_CLIENT */;
+/*!40101 SET @OLD_CHARACTER_SET_RESULTS=@@CHARACTER_SET_RESULTS */;
+/*!40101 SET @OLD_COLLATION_CONNECTION=@@COLLATION_CONNECTION */;
+/*!40101 SET NAMES utf8mb4 */;
+
+--
+-- Database: `DROP_TABLE`
+--
+"""
+
+_TRAILER = """COMMIT;
+
+/*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
+/*!40101 SET CHARACTER_SET_RESULTS=@OLD_CHARACTER_SET_RESULTS */;
+/*!40101 SET COLLATION_CONNECTION=@OLD_COLLATION_CONNECTION */;
+"""
+
+def _names(columns):
+    return ','.join(f"`{name}`" for name in columns)
+
+def _alter_section(title, clauses_by_table):
+    """One commented ALTER TABLE per table that has clauses"""
+    parts = [f"--\n-- {title} for dumped tables\n--\n"]
+    for name, clauses in clauses_by_table:
+        if clauses:
+            parts.append(f"\n--\n-- {title} for table `{name}`\n--\nALTER TABLE `{name}`\n  " + ",\n  ".join(clauses) + ";\n")
+    return ''.join(parts)
+
+def render_schema(tables=TABLES):
+    """The schema dump for tables: CREATE TABLEs, then indexes, AUTO_INCREMENT and constraints as ALTER TABLEs"""
+    parts = [_HEADER]
+    for model in tables:
+        columns = ",\n".join(f"  `{column.name}` {column.definition}" for column in model.columns)
+        parts.append(f"\n-- --------------------------------------------------------\n\n"
+                     f"--\n-- Table structure for table `{model.name}`\n--\n\n"
+                     f"CREATE TABLE `{model.name}` (\n{columns}\n) {TABLE_OPTIONS};\n")
+
+    indexes = []
+    for model in tables:
+        clauses = [f"ADD PRIMARY KEY ({_names(model.primary_key)})"] if model.primary_key else []
+        clauses += [f"ADD KEY `{name}` ({_names(columns)})" for name, columns in model.keys]
+        indexes.append((model.name, clauses))
+    parts.append("\n" + _alter_section("Indexes", indexes))
+
+    increments = [(model.name, [f"MODIFY `{model.auto_increment}` {model.column(model.auto_increment).definition} AUTO_INCREMENT"]
+                   if model.auto_increment else []) for model in tables]
+    parts.append("\n" + _alter_section("AUTO_INCREMENT", increments))
+
+    constraints = [(model.name, [
+        f"ADD CONSTRAINT `{name}` FOREIGN KEY (`{column}`) REFERENCES `{referenced}` (`{referenced_column}`) "
+        f"ON DELETE {on_delete} ON UPDATE CASCADE"
+        for name, column, referenced, referenced_column, on_delete in model.foreign_keys
+    ]) for model in tables]
+    parts.append("\n" + _alter_section("Constraints", constraints))
+
+    parts.append(_TRAILER)
+    return ''.join(parts)
+
+def main():
+    try:
+        with open(SCHEMA_FILE, 'w', encoding='utf-8') as f:
+            f.write(render_schema())
+        print(f"✅ Schema for {len(TABLES)} tables written to {SCHEMA_FILE}")
+    except Exception as e:
+        print(f"🔴 Error: Failed to write schema: {str(e)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
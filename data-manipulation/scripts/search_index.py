@@ -0,0 +1,127 @@
+"""
+Builds the Search_Term inverted index: one (term, product_id) row for every distinct normalised
+word of a product's title, brand name and category name, sorted by (term, product_id) to match
+the table's clustered primary key. /Get/Products looks search words up in it as indexed prefix
+ranges instead of scanning every title with LIKE '%term%'.
+
+Terms are built from a block of products at a time, sorted and written out as runs, then the
+runs are merged, so memory stays bounded by the block size rather than the catalog size.
+"""
+from array import array
+import heapq
+import re
+import shutil
+import sys
+import unicodedata
+
+from columnstore import read_table, TableWriter, NULL_INT
+from schema import column_schema
+from paths import MANIPULATED_DATA
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [MANIPULATED_DATA / 'brands', MANIPULATED_DATA / 'categories', MANIPULATED_DATA / 'products']
+OUTPUTS = [MANIPULATED_DATA / 'search_terms']
+
+# Columns of the Search_Term table
+SEARCH_TERM_SCHEMA = column_schema('Search_Term')
+
+# Term normalisation, shared with API/searchTerms.js and checked against the same vectors
+# (tests/search_terms_vectors.json) on both sides:
+# 1. NFKD, then remove every mark (general category M), then lowercase (full Unicode case mapping)
+# 2. words are maximal runs of letters and numbers (general categories L and N)
+# 3. words shorter than MIN_TERM_LENGTH code points and STOPWORDS are dropped, the rest are cut
+#    to MAX_TERM_LENGTH code points (lengths never count UTF-16 units or bytes)
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+STOPWORDS = frozenset(['and', 'the', 'for', 'with', 'of', 'to', 'in', 'on', 'by', 'or', 'at', 'from'])
+_WORD = re.compile(r'[^\W_]+')  # \w minus "_" is exactly the letters (L) and numbers (N)
+
+# Products indexed per sorted run
+BLOCK_PRODUCTS = 1 << 16
+
+def normalise(text):
+    """text decomposed (NFKD) without any marks, lowercased"""
+    if text.isascii():
+        return text.lower()  # NFKD leaves ASCII as it is and it has no marks
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.category(char).startswith('M')).lower()
+
+def search_terms(text):
+    """The distinct index terms of text: its normalised words, minus stopwords and one-letter words"""
+    return {
+        word[:MAX_TERM_LENGTH] for word in _WORD.findall(normalise(text))
+        if len(word) >= MIN_TERM_LENGTH and word not in STOPWORDS
+    }
+
+def load_name_terms(path):
+    """Index terms of each name in an (id, name) table with ids 1..n, by id (index 0 unused)"""
+    names = read_table(path)
+    return [frozenset()] + [frozenset(search_terms(name)) for name in names[names.names[1]]]
+
+def write_runs(products, brand_terms, category_terms, runs_dir):
+    """Writes the sorted (term, product_id) pairs of every block of products as a run; returns the run paths"""
+    ids = products['id']
+    brand_ids = products['brand_id']
+    category_ids = products['category_id']
+    titles = products['title']
+
+    runs = []
+    for start in range(0, len(products), BLOCK_PRODUCTS):
+        pairs = []
+        for i in range(start, min(start + BLOCK_PRODUCTS, len(products))):
+            terms = search_terms(titles[i])
+            if brand_ids[i] != NULL_INT:
+                terms |= brand_terms[brand_ids[i]]
+            if category_ids[i] != NULL_INT:
+                terms |= category_terms[category_ids[i]]
+            product_id = ids[i]
+            pairs.extend((term, product_id) for term in terms)
+        pairs.sort()
+
+        run_path = runs_dir / f"run-{len(runs):05d}"
+        with TableWriter(run_path, SEARCH_TERM_SCHEMA) as writer:
+            writer.append_columns([[term for term, _ in pairs], array('i', (product_id for _, product_id in pairs))])
+        runs.append(run_path)
+    return runs
+
+def merge_runs(writer, runs):
+    """Merges the sorted runs into writer; returns the number of terms"""
+    tables = [read_table(path) for path in runs]
+    merged = heapq.merge(*(zip(table['term'], table['product_id']) for table in tables))
+    terms = 0
+    previous = None
+    for term, product_id in merged:
+        writer.append((term, product_id))
+        if term != previous:
+            terms += 1
+            previous = term
+    return terms
+
+def main():
+    print("🚀 Starting search index build")
+    output_path = MANIPULATED_DATA / 'search_terms'
+    runs_dir = MANIPULATED_DATA / 'search_terms.runs'
+
+    try:
+        brand_terms = load_name_terms(MANIPULATED_DATA / 'brands')
+        category_terms = load_name_terms(MANIPULATED_DATA / 'categories')
+        products = read_table(MANIPULATED_DATA / 'products')
+        print(f"✅ Found {len(products)} products, {len(brand_terms) - 1} brands and {len(category_terms) - 1} categories")
+
+        shutil.rmtree(runs_dir, ignore_errors=True)
+        runs_dir.mkdir(parents=True)
+        runs = write_runs(products, brand_terms, category_terms, runs_dir)
+        print(f"✅ Wrote {len(runs)} sorted runs")
+
+        with TableWriter(output_path, SEARCH_TERM_SCHEMA) as writer:
+            terms = merge_runs(writer, runs)
+
+        print(f"\n🎉 Successfully indexed {terms} terms in {writer.rows} entries to {output_path}\n")
+    except Exception as e:
+        print(f"🔴 Error: Search index build failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        shutil.rmtree(runs_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
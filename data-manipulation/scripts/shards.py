@@ -0,0 +1,74 @@
+"""
+Parallel tokenizing of large INSERT dumps of text fields.
+
+The dump is cut into byte ranges on tuple boundaries (sqltokenizer.shard_ranges) and each range is
+tokenized and unescaped by its own process into a shard table. Shards come back in file order, so
+reading them one after the other gives exactly the rows of a single sequential pass. When a
+boundary turns out not to be a tuple boundary, or no process pool can be started, the dump is
+tokenized sequentially as a single shard instead.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import os
+import shutil
+
+from columnstore import TableWriter, INT64, TEXT
+from sqlcodec import text_bytes
+from sqltokenizer import map_file, scan, shard_ranges
+
+# Dumps are only split into shards of at least this many bytes
+MIN_SHARD_BYTES = 8 << 20
+
+def shard_schema(names):
+    """Columns of a shard table: the tuple's row number within the shard, then one text column per field"""
+    return [('row', INT64)] + [(name, TEXT) for name in names]
+
+def tokenize_shard(path, start, stop, in_values, names, output_path):
+    """
+    Writes the tuples of the dump at path in the shard_ranges range (start, stop, in_values) to a
+    shard table at output_path, with the unescaped UTF-8 of their first len(names) fields.
+    Tuples with too few fields are not numbered; numbered tuples whose fields are not all strings
+    are left out. Returns (numbered tuples, [(row number or None, message)] for the tuples left out).
+    """
+    rows = 0
+    messages = []
+    with map_file(path) as buf, TableWriter(output_path, shard_schema(names)) as writer:
+        for fields in scan(buf, start, stop=stop, in_values=in_values):
+            if len(fields) < len(names):
+                messages.append((None, f"Insufficient fields in entry: {b', '.join(fields)[:50].decode('utf-8', 'replace')}..."))
+                continue
+            try:
+                values = [text_bytes(field) for field in fields[:len(names)]]
+                if None in values:
+                    raise ValueError("Text columns cannot hold NULL")
+                writer.append((rows,) + tuple(values))
+            except ValueError as e:
+                messages.append((rows, str(e)))
+            rows += 1
+    return rows, messages
+
+def tokenize_shards(path, names, output_dir, workers=None, min_shard_bytes=MIN_SHARD_BYTES):
+    """
+    Tokenizes the dump at path into shard tables in output_dir (see tokenize_shard) on up to workers
+    processes (default: one per CPU). Returns [(shard table path, numbered tuples, messages)] in file order.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = max(1, min(workers, os.path.getsize(path) // min_shard_bytes))
+    shutil.rmtree(output_dir, ignore_errors=True)
+    output_dir.mkdir(parents=True)
+
+    if shards > 1:
+        with map_file(path) as buf:
+            ranges = shard_ranges(buf, shards)
+        try:
+            with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+                futures = [
+                    pool.submit(tokenize_shard, path, start, stop, in_values, names, output_dir / f"shard-{i:05d}")
+                    for i, (start, stop, in_values) in enumerate(ranges)
+                ]
+                return [(output_dir / f"shard-{i:05d}",) + future.result() for i, future in enumerate(futures)]
+        except (ValueError, OSError, BrokenProcessPool) as e:
+            print(f"⚠️ Warning: Parallel tokenizing of {path.name} failed ({str(e)}), tokenizing it sequentially")
+
+    shard_path = output_dir / 'shard-00000'
+    return [(shard_path,) + tokenize_shard(path, 0, None, False, names, shard_path)]
@@ -0,0 +1,114 @@
+"""
+Decoder and encoder for MariaDB literals (strings, numbers and NULL).
+
+Every stage reads INSERT files through iter_rows and writes values through encode/format_row,
+so quoting and escaping rules live in one place. Stages that only need some fields of a large
+dump read sqltokenizer.iter_raw_tuples and decode just those fields with decode_bytes, or pass
+text through as UTF-8 with text_bytes.
+"""
+import re
+
+from sqltokenizer import iter_raw_tuples
+
+# Backslash escapes understood by MariaDB inside quoted strings. \% and \_ keep their backslash,
+# any other escaped character stands for itself.
+_UNESCAPES = {
+    '0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a',
+    '%': '\\%', '_': '\\_'
+}
+_ESCAPE_SEQUENCE = re.compile(r"\\(.)|''", re.DOTALL)
+_NUMBER = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_UNESCAPES_BYTES = {ord(char): value.encode('ascii') for char, value in _UNESCAPES.items()}
+_ESCAPE_SEQUENCE_BYTES = re.compile(rb"\\(.)|''", re.DOTALL)
+
+# Characters escaped by encode. The backslash must come first so later escapes are not doubled.
+_ESCAPES = (('\\', '\\\\'), ("'", "\\'"), ('\0', '\\0'), ('\n', '\\n'), ('\r', '\\r'), ('\x1a', '\\Z'))
+
+def _unescape(match):
+    char = match.group(1)
+    if char is None:
+        return "'"
+    return _UNESCAPES.get(char, char)
+
+def _unescape_bytes(match):
+    char = match.group(1)
+    if char is None:
+        return b"'"
+    return _UNESCAPES_BYTES.get(char[0], char)
+
+def decode(literal):
+    """
+    Converts one raw SQL literal into a Python value:
+    'text' -> str, NULL -> None, 12 -> int, 12.5 -> float.
+    Raises ValueError for anything else.
+    """
+    if literal[0] == "'":
+        body = literal[1:-1]
+        # Fast path: most values contain no escapes at all
+        if '\\' not in body and "''" not in body:
+            return body
+        return _ESCAPE_SEQUENCE.sub(_unescape, body)
+    if literal.upper() == 'NULL':
+        return None
+    if _NUMBER.fullmatch(literal):
+        if '.' in literal or 'e' in literal or 'E' in literal:
+            return float(literal)
+        return int(literal)
+    raise ValueError(f"Unsupported SQL literal: {literal[:50]}")
+
+def text_bytes(literal):
+    """
+    Unescapes one raw bytes string literal without decoding it: b"'it\\'s'" -> b"it's" (UTF-8),
+    b'NULL' -> None. Raises ValueError for anything that is not a string.
+    """
+    if literal[:1] == b"'":
+        body = literal[1:-1]
+        if b'\\' not in body and b"''" not in body:
+            return body
+        return _ESCAPE_SEQUENCE_BYTES.sub(_unescape_bytes, body)
+    if literal.upper() == b'NULL':
+        return None
+    raise ValueError(f"Expected a string literal, got {literal[:50]!r}")
+
+def decode_bytes(literal):
+    """decode for a raw bytes literal, as yielded by sqltokenizer.iter_raw_tuples"""
+    if literal[:1] == b"'":
+        return text_bytes(literal).decode('utf-8')
+    return decode(literal.decode('ascii'))
+
+def encode(value):
+    """Converts a Python value into a SQL literal: str is quoted and escaped, None becomes NULL"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, str):
+        # str.replace is much faster than str.translate and is a no-op scan when the character is absent
+        for char, escaped in _ESCAPES:
+            if char in value:
+                value = value.replace(char, escaped)
+        return "'" + value + "'"
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} as a SQL literal")
+
+def format_row(values):
+    """Formats a sequence of Python values as a VALUES tuple, e.g. (1, 'a', NULL)"""
+    return '(' + ', '.join(map(encode, values)) + ')'
+
+def iter_rows(path):
+    """Yields every VALUES tuple in the file at path as a tuple of decoded Python values"""
+    for fields in iter_raw_tuples(path):
+        yield tuple(map(decode_bytes, fields))
+
+_INSERT_HEADER = re.compile(r"INSERT\s+INTO\s+`?(\w+)`?\s*\(([^)]*)\)\s*VALUES", re.IGNORECASE)
+
+def read_insert_header(path):
+    """Returns (table name, [column names]) from the first INSERT statement in the file at path"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = _INSERT_HEADER.search(line)
+            if match:
+                columns = [column.strip().strip('`') for column in match.group(2).split(',')]
+                return match.group(1), columns
+    raise ValueError(f"No INSERT statement found in {path}")
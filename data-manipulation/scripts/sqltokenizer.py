@@ -0,0 +1,213 @@
+"""
+Tokenizer for MariaDB `INSERT ... VALUES` dumps.
+
+Every VALUES tuple is yielded as a tuple of raw field literals exactly as they appear in the
+file (e.g. "'Soundcore'", "NULL", "29.99"). Files are read through iter_raw_tuples, which
+memory-maps the file and scans the mapped bytes: the page cache is the only copy of the file,
+and each field is a bytes literal that is only decoded if a stage asks for it (see
+sqlcodec.text_bytes and sqlcodec.decode_bytes). tokenize does the same for a text stream,
+consuming it in fixed-size chunks. Either way the cost is linear in the file size no matter
+how long a single field is.
+"""
+from contextlib import contextmanager
+import mmap
+import os
+import re
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# One field followed by the separator that ends it. Quoted strings use the "unrolled loop"
+# form so long descriptions are matched in one pass, and support both \' and '' escapes.
+_FIELD = re.compile(r"""\s*('[^'\\]*(?:(?:\\.|'')[^'\\]*)*'|[^,()'\s]+)\s*([,)])""", re.DOTALL)
+_VALUES = re.compile(r"\bVALUES\b", re.IGNORECASE)
+_SPACE = re.compile(r"\s*")
+
+# The same patterns over bytes. UTF-8 continuation bytes never equal an ASCII quote, backslash
+# or separator, so the byte scan finds exactly the boundaries the text scan finds.
+_FIELD_BYTES = re.compile(_FIELD.pattern.encode('ascii'), re.DOTALL)
+_VALUES_BYTES = re.compile(_VALUES.pattern.encode('ascii'), re.IGNORECASE)
+_SPACE_BYTES = re.compile(_SPACE.pattern.encode('ascii'))
+
+# Where one tuple of a VALUES list ends and the next begins; a candidate shard boundary
+_TUPLE_BOUNDARY = re.compile(rb"\),\s*\(")
+
+# A scan of a memory map drops the pages it has passed every this many bytes
+_RELEASE_BYTES = 64 << 20
+
+@contextmanager
+def map_file(path):
+    """The file at path memory-mapped read-only for a sequential scan (b'' if it is empty)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''  # an empty file cannot be mapped
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if hasattr(buf, 'madvise'):
+                buf.madvise(mmap.MADV_SEQUENTIAL)
+            yield buf
+
+def iter_raw_tuples(path):
+    """Yields every VALUES tuple of every INSERT statement in the file at path as a tuple of bytes literals"""
+    with map_file(path) as buf:
+        yield from scan(buf)
+
+def iter_tuples(path):
+    """Yields every VALUES tuple of every INSERT statement in the file at path as a tuple of str literals"""
+    for fields in iter_raw_tuples(path):
+        yield tuple(field.decode('utf-8') for field in fields)
+
+def shard_ranges(buf, shards):
+    """
+    Splits buf into up to shards (start, stop, in_values) ranges of roughly equal size for scan,
+    every range after the first starting at a tuple in the middle of a VALUES list. Boundaries are
+    found with a byte search for "),(" and are only candidates: scan checks each one, as a "),("
+    inside a string literal is not a tuple boundary.
+    """
+    starts = [0]
+    for shard in range(1, shards):
+        match = _TUPLE_BOUNDARY.search(buf, max(shard * len(buf) // shards, starts[-1] + 1))
+        if match is None:
+            break
+        starts.append(match.end() - 1)
+    stops = starts[1:] + [None]
+    return [(start, stop, start > 0) for start, stop in zip(starts, stops)]
+
+def scan(buf, pos=0, end=None, stop=None, in_values=False):
+    """
+    Yields every VALUES tuple in buf[pos:end] (bytes, or a memory map) as a tuple of bytes literals.
+    Raises ValueError on malformed input.
+
+    For a shard from shard_ranges, in_values starts the scan inside a VALUES list and stop ends it
+    at the tuple that starts at offset stop, raising ValueError if no tuple starts exactly there.
+    """
+    end = len(buf) if end is None else end
+    # The fields are copies, so the pages already scanned are dropped from the mapping as the scan
+    # goes: a pass over a large dump does not keep all of it resident
+    released = pos - pos % mmap.PAGESIZE if hasattr(buf, 'madvise') else None
+
+    def unaligned():
+        return ValueError(f"Shard boundary at offset {stop} is not at the start of a tuple")
+
+    while True:
+        if not in_values:
+            match = _VALUES_BYTES.search(buf, pos, end)
+            if match is None:
+                if stop is not None:
+                    raise unaligned()
+                return
+            pos = match.end()
+            in_values = True
+
+        pos = _SPACE_BYTES.match(buf, pos, end).end()
+        if pos == end:
+            if stop is not None:
+                raise unaligned()
+            # Tolerate a missing ';' (or a trailing ',') after the last tuple
+            return
+
+        char = buf[pos]
+        if char == 0x2c:  # ,
+            pos += 1
+        elif char == 0x3b:  # ;
+            pos += 1
+            in_values = False
+        elif char == 0x28:  # (
+            if stop is not None and pos >= stop:
+                if pos != stop:
+                    raise unaligned()
+                return
+            fields = []
+            field_pos = pos + 1
+            while True:
+                match = _FIELD_BYTES.match(buf, field_pos, end)
+                if match is None:
+                    raise ValueError(f"Malformed or truncated tuple at offset {pos}")
+                fields.append(match.group(1))
+                field_pos = match.end()
+                if match.group(2) == b')':
+                    break
+            yield tuple(fields)
+            pos = field_pos
+            if released is not None and pos - released >= _RELEASE_BYTES:
+                scanned = pos - pos % mmap.PAGESIZE
+                buf.madvise(mmap.MADV_DONTNEED, released, scanned - released)
+                released = scanned
+        else:
+            raise ValueError(f"Unexpected character {chr(char)!r} at offset {pos}")
+
+def tokenize(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yields every VALUES tuple read from a text stream as a tuple of raw field literals.
+    Raises ValueError on malformed input.
+    """
+    buf = ''
+    pos = 0
+    eof = False
+    in_values = False
+    consumed = 0  # characters discarded from the front of buf, for error messages
+    read_size = chunk_size
+
+    def fill():
+        # Drop everything before pos and append the next chunk; returns False at end of file
+        nonlocal buf, pos, eof, consumed, read_size
+        if eof:
+            return False
+        data = stream.read(read_size)
+        if not data:
+            eof = True
+            return False
+        consumed += pos
+        buf = buf[pos:] + data
+        pos = 0
+        # A single field larger than a chunk needs repeated reads; double the read size so
+        # re-scanning the partial field stays amortised linear
+        read_size *= 2
+        return True
+
+    while True:
+        if not in_values:
+            match = _VALUES.search(buf, pos)
+            if match is None or match.end() == len(buf):
+                # Keep a short tail in case "VALUES" straddles two chunks
+                pos = max(pos, len(buf) - 6)
+                if not fill():
+                    return
+                continue
+            pos = match.end()
+            in_values = True
+            read_size = chunk_size
+
+        pos = _SPACE.match(buf, pos).end()
+        if pos == len(buf):
+            if not fill():
+                # Tolerate a missing ';' (or a trailing ',') after the last tuple
+                return
+            continue
+
+        char = buf[pos]
+        if char == ',':
+            pos += 1
+        elif char == ';':
+            pos += 1
+            in_values = False
+        elif char == '(':
+            fields = []
+            field_pos = pos + 1
+            while True:
+                match = _FIELD.match(buf, field_pos)
+                if match is None:
+                    # Either the row continues in the next chunk or the input is malformed
+                    offset = field_pos - pos
+                    if not fill():
+                        raise ValueError(f"Malformed or truncated tuple at offset {consumed + pos}")
+                    field_pos = pos + offset
+                    continue
+                fields.append(match.group(1))
+                field_pos = match.end()
+                if match.group(2) == ')':
+                    break
+            yield tuple(fields)
+            pos = field_pos
+            read_size = chunk_size
+        else:
+            raise ValueError(f"Unexpected character {char!r} at offset {consumed + pos}")
@@ -0,0 +1,98 @@
+import sys
+
+import numpy as np
+
+from columnstore import read_table, TableWriter
+from generation import GENERATION_FILE, load_generation, load_user_ids, zipf_weights
+from schema import column_schema
+from paths import ORIGINAL_DATA, MANIPULATED_DATA
+
+SEED = "DROP TABLE"
+
+# Parameters that affect the output (part of the stage cache key in run.py)
+PARAMS = {'seed': SEED}
+
+# Files read and written by this stage (used by run.py to order the stages)
+INPUTS = [
+    ORIGINAL_DATA / 'users.sql',
+    MANIPULATED_DATA / 'retailers',
+    MANIPULATED_DATA / 'product_retailers',
+    GENERATION_FILE
+]
+OUTPUTS = [MANIPULATED_DATA / 'watchlists']
+
+# Columns of the Watchlist_Item table
+WATCHLIST_SCHEMA = column_schema('Watchlist_Item')
+
+# Watchlists are generated for this many users at a time
+BLOCK_USERS = 1 << 16
+
+def generate_watchlists(writer, user_ids, listings, retailer_names, mean_items, user_skew=0.0, seed=SEED):
+    """
+    Appends random watchlists to writer. The number of items per user is geometric with mean
+    mean_items, scaled by the user's activity weight when user_skew is set. Each item is a random
+    Product_Retailer listing (product, retailer, prices); a user watches a product at most once.
+    Returns the number of items.
+    """
+    rng = np.random.default_rng(list(seed.encode('utf-8')))
+    user_ids = np.asarray(user_ids, dtype=np.int32)
+    product_ids, retailer_ids, initial_prices, final_prices = listings
+    weights = zipf_weights(len(user_ids), user_skew, rng)
+    means = np.full(len(user_ids), float(mean_items)) if weights is None else mean_items * len(user_ids) * weights
+
+    for start in range(0, len(user_ids), BLOCK_USERS):
+        block_means = means[start:start + BLOCK_USERS]
+        counts = rng.geometric(1.0 / (block_means + 1)) - 1
+        owners = np.repeat(user_ids[start:start + BLOCK_USERS], counts)
+        picks = rng.integers(0, len(product_ids), size=len(owners))
+
+        # Keep the first listing of every (user, product) pair, in user order
+        keys = owners.astype(np.int64) * (int(product_ids.max()) + 1) + product_ids[picks]
+        _, first = np.unique(keys, return_index=True)
+        picks = picks[first]
+        owners = owners[first]
+
+        writer.append_columns([
+            owners,
+            [retailer_names[i] for i in retailer_ids[picks].tolist()],
+            product_ids[picks],
+            initial_prices[picks],
+            final_prices[picks]
+        ])
+    return writer.rows
+
+def main():
+    print("🚀 Starting watchlist generation")
+    settings = load_generation()
+    output_path = MANIPULATED_DATA / 'watchlists'
+
+    try:
+        if not settings['watchlist_items_per_user_mean']:
+            # The fixtures have no watchlists; only generated datasets configure them
+            with TableWriter(output_path, WATCHLIST_SCHEMA):
+                pass
+            print("ℹ️ No watchlists configured in generation.json, writing an empty table")
+            return
+
+        user_ids = load_user_ids()
+        retailers = read_table(MANIPULATED_DATA / 'retailers')
+        retailer_names = dict(zip(retailers['id'], (name.encode('utf-8') for name in retailers['name'])))
+        product_retailers = read_table(MANIPULATED_DATA / 'product_retailers')
+        listings = [np.asarray(product_retailers[name]) for name in ('product_id', 'retailer_id', 'initial_price', 'final_price')]
+        print(f"✅ Found {len(user_ids)} users and {len(product_retailers)} product listings")
+
+        if not user_ids or not len(product_retailers):
+            print("🔴 Error: Need users and product listings to generate watchlists")
+            sys.exit(1)
+
+        with TableWriter(output_path, WATCHLIST_SCHEMA) as writer:
+            items = generate_watchlists(writer, user_ids, listings, retailer_names,
+                                        settings['watchlist_items_per_user_mean'], settings['user_skew'])
+
+        print(f"\n🎉 Successfully generated {output_path} with {items} watchlist items\n")
+    except Exception as e:
+        print(f"🔴 Error: Watchlist generation failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
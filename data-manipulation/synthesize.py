@@ -0,0 +1,172 @@
+"""
+Builds a synthetic dataset for load testing from the templates in original-data/.
+
+    python synthesize.py --products 1000000
+    python run.py --data synthetic-data/1000000
+
+The dataset gets its own original-data/ in the same formats as the fixtures, so it goes through
+the same stages, stage cache and import files (written into the dataset directory). Products are
+drawn from the bulk.sql rows together with their category, dimensions and price; brands, users
+and retailers are scaled up from brands.sql, users.sql and retailers.txt. Brand popularity follows
+a Zipf law, and a generation.json sets skewed retailer, review and watchlist distributions for the
+product_retailers, reviews and watchlists stages. The same seed always gives the same dataset.
+"""
+from pathlib import Path
+import argparse
+import json
+import shutil
+import sys
+
+BASE_DIR = Path(__file__).parent
+sys.path.insert(0, str(BASE_DIR / 'scripts'))
+
+import numpy as np
+
+from generation import zipf_weights
+from sqlcodec import decode, encode, iter_rows
+from sqltokenizer import iter_tuples
+
+ORIGINAL_DATA = BASE_DIR / 'original-data'
+SYNTHETIC_DATA = BASE_DIR / 'synthetic-data'
+SEED = "DROP TABLE"
+
+# Rows per INSERT statement in the generated SQL files
+INSERT_BATCH_ROWS = 1000
+
+# Entities per product, relative to the product count (the fixtures' ratios are kept as minimums)
+BRANDS_PER_PRODUCT = 1 / 20
+USERS_PER_PRODUCT = 1 / 10
+RETAILERS_PER_SQRT_PRODUCT = 0.15
+BRAND_SKEW = 1.1
+
+# Distributions for the generated tables (see scripts/generation.py)
+GENERATION = {
+    'retailer_skew': 1.0,
+    'retailers_per_product_mean': 3,
+    'reviews_per_product_mean': 4,
+    'user_skew': 1.0,
+    'watchlist_items_per_user_mean': 5
+}
+
+def write_inserts(path, header, rows):
+    """Writes rows (sequences of SQL literals) as INSERT statements of INSERT_BATCH_ROWS rows each"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            if count % INSERT_BATCH_ROWS == 0:
+                if count:
+                    f.write(";\n")
+                f.write(header + " VALUES\n")
+            else:
+                f.write(",\n")
+            f.write('(' + ', '.join(row) + ')')
+            count += 1
+        f.write(";\nCOMMIT;\n" if count else "")
+    return count
+
+def scaled_names(names, count):
+    """names extended to count entries with numbered variants ('Name 2', 'Name 3', ...)"""
+    return [names[i % len(names)] + (f" {i // len(names) + 1}" if i >= len(names) else '') for i in range(count)]
+
+def load_templates():
+    """The per-product fixture rows, aligned by product: bulk, category, dimensions and price"""
+    columns = {
+        'bulk': list(iter_tuples(ORIGINAL_DATA / 'bulk.sql')),
+        'category': [fields[0] for fields in iter_tuples(ORIGINAL_DATA / 'products_with_text_category.sql')],
+        'dimensions': [fields[0] for fields in iter_tuples(ORIGINAL_DATA / 'dimensions.sql')],
+        'price': list(iter_tuples(ORIGINAL_DATA / 'prices.sql'))
+    }
+    count = min(len(rows) for rows in columns.values())
+    return {name: rows[:count] for name, rows in columns.items()}
+
+def synthesize(output_dir, products, seed=SEED):
+    """Writes a synthetic original-data/ for the given number of products below output_dir"""
+    rng = np.random.default_rng(list(seed.encode('utf-8')))
+    target = output_dir / 'original-data'
+    target.mkdir(parents=True, exist_ok=True)
+
+    print(f"⏳ Loading templates from {ORIGINAL_DATA}")
+    templates = load_templates()
+    brands = [row[0] for row in iter_rows(ORIGINAL_DATA / 'brands.sql')]
+    users = list(iter_rows(ORIGINAL_DATA / 'users.sql'))
+    with open(ORIGINAL_DATA / 'retailers.txt', 'r') as f:
+        retailers = [[part.strip() for part in line.split('=', 1)] for line in f if '=' in line]
+    print(f"✅ {len(templates['bulk'])} product templates, {len(brands)} brands, {len(users)} users, {len(retailers)} retailers")
+
+    # Brands: the fixture brands plus numbered variants, with Zipf popularity
+    brand_names = scaled_names(brands, max(len(brands), int(products * BRANDS_PER_PRODUCT)))
+    write_inserts(target / 'brands.sql', "INSERT INTO `Brand` (`name`)", ([encode(name)] for name in brand_names))
+    brand_picks = rng.choice(len(brand_names), size=products, p=zipf_weights(len(brand_names), BRAND_SKEW, rng))
+    write_inserts(target / 'products_with_text_brand.sql', "INSERT INTO `Brand` (`name`)",
+                  ([encode(brand_names[i])] for i in brand_picks.tolist()))
+    print(f"✅ {len(brand_names)} brands")
+
+    # Products: every product copies a random template row; titles get a number to stay distinct
+    picks = rng.integers(0, len(templates['bulk']), size=products).tolist()
+    def bulk_rows():
+        for product, template in enumerate(picks, start=1):
+            fields = templates['bulk'][template]
+            yield (encode(f"{decode(fields[0])} #{product}"),) + tuple(fields[1:])
+    write_inserts(target / 'bulk.sql',
+                  "INSERT INTO `Products` (`title`, `description`, `created_at`, `updated_at`, `image_url`, `features`, `images`)",
+                  bulk_rows())
+    write_inserts(target / 'products_with_text_category.sql', "INSERT INTO `u24569039_products` (`category`)",
+                  ([templates['category'][i]] for i in picks))
+    write_inserts(target / 'dimensions.sql', "INSERT INTO `Products` (`features`)",
+                  ([templates['dimensions'][i]] for i in picks))
+    write_inserts(target / 'prices.sql', "INSERT INTO `blank` (`initial_price`, `final_price`)",
+                  (templates['price'][i] for i in picks))
+    print(f"✅ {products} products")
+
+    # Users: the fixture admin(s) plus numbered copies of the fixture users with unique emails
+    admins = [row for row in users if row[-1] != 'user']
+    regular = [row for row in users if row[-1] == 'user']
+    def user_rows():
+        for row in admins:
+            yield map(encode, row)
+        for i in range(max(len(regular), int(products * USERS_PER_PRODUCT))):
+            first, last, password, email, kind = regular[i % len(regular)]
+            if i >= len(regular):
+                local, domain = email.split('@', 1)
+                email = f"{local}.{i // len(regular) + 1}@{domain}"
+            yield map(encode, (first, last, password, email, kind))
+    user_count = write_inserts(target / 'users.sql', "INSERT INTO User (first_name, last_name, password, email, type)", user_rows())
+    print(f"✅ {user_count} users")
+
+    # Retailers: the fixture retailers plus numbered variants
+    retailer_count = max(len(retailers), int(RETAILERS_PER_SQRT_PRODUCT * products ** 0.5))
+    with open(target / 'retailers.txt', 'w') as f:
+        for i in range(retailer_count):
+            name, url = retailers[i % len(retailers)]
+            if i >= len(retailers):
+                variant = i // len(retailers) + 1
+                name, url = f"{name} {variant}", f"{url.rstrip('/')}/store-{variant}/"
+            f.write(f"{name} = {url}\n")
+    print(f"✅ {retailer_count} retailers")
+
+    # Unchanged fixtures and the distributions for the generated tables
+    for name in ('categories.sql', 'reviews.json', 'exchange_rates.csv'):
+        shutil.copyfile(ORIGINAL_DATA / name, target / name)
+    with open(target / 'generation.json', 'w') as f:
+        json.dump(GENERATION, f, indent=2)
+    with open(output_dir / 'synthetic.json', 'w') as f:
+        json.dump({'products': products, 'seed': seed}, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a synthetic dataset for load testing")
+    parser.add_argument('--products', type=int, required=True, help="number of products (e.g. 10000, 1000000)")
+    parser.add_argument('--seed', default=SEED, help="random seed; the same seed gives the same dataset")
+    parser.add_argument('--out', type=Path, default=None, help="dataset directory (default: synthetic-data/<products>)")
+    args = parser.parse_args()
+
+    output_dir = args.out or SYNTHETIC_DATA / str(args.products)
+    print(f"🚀 Synthesizing {args.products} products into {output_dir}")
+    try:
+        synthesize(output_dir, args.products, args.seed)
+    except Exception as e:
+        print(f"🔴 Error: Failed to synthesize dataset: {str(e)}")
+        sys.exit(1)
+    print(f"\n🎉 Dataset ready, build it with: python run.py --data {output_dir}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+"""
+Shared setup for the data-manipulation tests: the pipeline modules in scripts/ are importable, and
+pipeline runs work on a copy of original-data/ so the checked-in dumps are never touched.
+"""
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+def run_pipeline(data_dir, *args):
+    """Runs run.py on the dataset root data_dir; returns the completed process"""
+    return subprocess.run([sys.executable, str(ROOT / 'run.py'), '--data', str(data_dir), *args],
+                          cwd=ROOT, capture_output=True, text=True)
+
+@pytest.fixture
+def dataset(tmp_path):
+    """A dataset root holding a copy of original-data/"""
+    shutil.copytree(ROOT / 'original-data', tmp_path / 'original-data')
+    return tmp_path
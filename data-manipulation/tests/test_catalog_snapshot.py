@@ -0,0 +1,57 @@
+"""Catalog snapshot items have the shape and value types of the API's /Get/Products items"""
+import json
+import math
+import re
+
+from columnstore import TableWriter, read_table
+from schema import column_schema
+import conftest
+
+API_FILE = conftest.ROOT.parent / 'API' / 'API.js'
+
+# A Product_Summary row, and the row the mariadb driver returns for it to /Get/Products: DECIMAL columns
+# as strings with their scale, AVG(score) as a number (null without reviews), the CASE flag as an integer
+SUMMARY_ROW = {
+    'product_id': 7, 'retailer_id': 2, 'title': 'Café "Grinder" 3000', 'image_url': 'https://example.com/7.jpg',
+    'brand_name': 'Anker', 'category_name': 'Electronics', 'retailer_name': 'Amazon', 'initial_price': 500.0,
+    'final_price': 440.76, 'discount_pct': 11.85, 'shuffle_rank': 12345, 'rating': 3.5, 'review_count': 2
+}
+DRIVER_ROW = {
+    'id': 7, 'image_url': 'https://example.com/7.jpg', 'title': 'Café "Grinder" 3000', 'final_price': '440.76',
+    'initial_price': '500.00', 'name': 'Amazon', 'rID': 2, 'Discount': '11.85', 'Rating': 3.5,
+    'brand': 'Anker', 'cat_name': 'Electronics', 'watchlist': 0
+}
+
+def api_item(row):
+    """The /Get/Products item API.js builds from a driver row, following its productJSON.push mapping"""
+    source = API_FILE.read_text(encoding='utf-8')
+    mapping = re.search(r"productJSON\.push\(\{(.*?)\}\)", source, re.DOTALL).group(1)
+    item = {}
+    for key, expression in re.findall(r'"(\w+)":\s*([^,\n]+)', mapping):
+        expression = expression.strip()
+        floored = re.fullmatch(r"Math\.floor\(product\.(\w+)\)", expression)
+        if floored:
+            item[key] = math.floor(float(row[floored.group(1)]))
+        else:
+            item[key] = row[re.fullmatch(r"product\.(\w+)", expression).group(1)]
+    return item
+
+def render(tmp_path, rows):
+    import catalog_snapshot
+    schema = column_schema('Product_Summary')
+    with TableWriter(tmp_path / 'product_summary', schema) as writer:
+        for row in rows:
+            writer.append(tuple(row[name] for name, _ in schema))
+    return [json.loads(item) for item in catalog_snapshot.render_items(read_table(tmp_path / 'product_summary'))]
+
+def test_item_matches_api_row_shape(tmp_path):
+    [item] = render(tmp_path, [SUMMARY_ROW])
+    expected = api_item(DRIVER_ROW)
+    assert list(item) == list(expected)
+    assert item == expected
+    assert [type(value) for value in item.values()] == [type(value) for value in expected.values()]
+
+def test_unrated_item_has_null_rating(tmp_path):
+    [item] = render(tmp_path, [dict(SUMMARY_ROW, rating=None, final_price=10.0)])
+    assert item['rating'] is None
+    assert item['final_price'] == '10.00'
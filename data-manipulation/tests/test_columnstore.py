@@ -0,0 +1,54 @@
+"""Column tables: NULLs, copying text between tables and flushing"""
+import math
+
+import numpy as np
+
+import columnstore
+from columnstore import TableWriter, TextColumn, read_table, write_table, INT32, INT64, FLOAT64, TEXT, NULL_INT
+
+SCHEMA = [('small', INT32), ('big', INT64), ('ratio', FLOAT64), ('name', TEXT)]
+
+def test_nulls_round_trip(tmp_path):
+    rows = [(1, 2 ** 40, 0.5, 'a'), (None, None, None, ''), (-3, -4, -0.0, 'ü')]
+    write_table(tmp_path / 't', SCHEMA, rows)
+    table = read_table(tmp_path / 't')
+    assert list(table.iter_rows()) == rows
+    # Stored as NULL_INT in integer columns and NaN in float columns
+    assert table['small'][1] == NULL_INT and table['big'][1] == NULL_INT
+    assert math.isnan(table['ratio'][1])
+
+def test_append_columns_rebases_text_offsets(tmp_path):
+    write_table(tmp_path / 'source', [('name', TEXT)], [(name,) for name in ['zero', 'one', 'twö', 'three', 'four']])
+    source = read_table(tmp_path / 'source')['name']
+    # A view that does not start at the beginning of the source data: rows 1-3
+    middle = TextColumn(source.offsets[1:5], source.data)
+
+    with TableWriter(tmp_path / 'target', [('id', INT32), ('name', TEXT)]) as writer:
+        writer.append((0, 'before'))
+        writer.append_columns([np.array([1, 2, 3], dtype=np.int32), middle])
+        writer.append((4, 'after'))
+        writer.append_columns([np.array([5, 6], dtype=np.int32), source.head(2)])
+
+    target = read_table(tmp_path / 'target')
+    assert list(target.iter_rows()) == [(0, 'before'), (1, 'one'), (2, 'twö'), (3, 'three'), (4, 'after'), (5, 'zero'), (6, 'one')]
+    offsets = list(target['name'].offsets)
+    assert offsets[0] == 0 and offsets[-1] == len(target['name'].data)
+    assert all(offsets[i] <= offsets[i + 1] for i in range(len(offsets) - 1))
+
+def test_append_columns_checks_buffers(tmp_path):
+    with TableWriter(tmp_path / 't', [('id', INT32), ('ratio', FLOAT64)]) as writer:
+        for columns in ([np.zeros(2, dtype=np.int64), np.zeros(2)], [np.zeros(2, dtype=np.int32), np.zeros(3)]):
+            try:
+                writer.append_columns(columns)
+            except ValueError:
+                continue
+            raise AssertionError(f"accepted {columns}")
+
+def test_text_is_flushed_by_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnstore, '_FLUSH_BYTES', 1000)
+    with TableWriter(tmp_path / 't', [('name', TEXT)]) as writer:
+        for _ in range(30):
+            writer.append(('x' * 100,))
+        # Less than _FLUSH_ROWS rows, but more than _FLUSH_BYTES of text: most of it is on disk already
+        assert writer._buffered < 1000
+    assert read_table(tmp_path / 't').rows == 30
@@ -0,0 +1,25 @@
+"""The currency stage with --rate-date: currencies without a rate in force on that day are refused"""
+from conftest import run_pipeline
+
+RATES = """currency,rate,effective_date
+ZAR,1,2020-01-01
+USD,16.50,2020-01-01
+USD,17.83,2025-01-01
+INR,0.21,2020-01-01
+"""
+
+def test_rate_missing_on_the_rate_date_fails(dataset):
+    (dataset / 'original-data' / 'exchange_rates.csv').write_text(RATES + "CNY,2.48,2025-01-01\n", encoding='utf-8')
+    result = run_pipeline(dataset, '--rate-date', '2024-06-30')
+    assert result.returncode == 1
+    assert "No CNY rate in exchange_rates.csv is effective on or before 2024-06-30" in result.stdout
+    assert not (dataset / 'manipulated-data' / 'prices_zar').exists()
+
+    # With a date the CNY rate is in force on, the same table converts every price
+    assert run_pipeline(dataset, '--rate-date', '2025-01-01').returncode == 0
+
+def test_unlisted_currency_is_kept(dataset):
+    (dataset / 'original-data' / 'exchange_rates.csv').write_text(RATES, encoding='utf-8')
+    result = run_pipeline(dataset, '--rate-date', '2024-06-30')
+    assert result.returncode == 0
+    assert "Unknown currency CNY. Keeping original value." in result.stdout
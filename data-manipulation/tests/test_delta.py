@@ -0,0 +1,84 @@
+"""Incremental rebuilds: appending a product only touches its rows, renumbering products is refused"""
+import re
+
+from conftest import run_pipeline
+from sqlcodec import format_row, iter_rows, read_insert_header, decode_bytes
+from sqltokenizer import scan
+
+# The dumps that hold one row per product, positionally aligned with bulk.sql
+PRODUCT_DUMPS = {
+    'bulk.sql': ('Test Widget 3000', 'A widget for tests', '2025-05-01 10:00:00', '2025-05-01 10:00:00',
+                 'https://example.com/widget.jpg', '["Sturdy"]', '["https://example.com/widget.jpg"]'),
+    'products_with_text_brand.sql': ('Anker',),
+    'products_with_text_category.sql': ('Electronics',),
+    'dimensions.sql': ('1 x 2 x 3 inches',),
+    'prices.sql': (12.5, 10.0, 'USD')
+}
+
+_UPSERT = re.compile(r"INSERT INTO `(\w+)` \(([^)]*)\) VALUES\n(.*?)\nON DUPLICATE KEY UPDATE", re.DOTALL)
+
+def rewrite_dump(path, rows):
+    """Replaces the rows of the INSERT dump at path, keeping its header"""
+    name, columns = read_insert_header(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"INSERT INTO `{name}` ({', '.join(f'`{column}`' for column in columns)}) VALUES\n")
+        f.write(',\n'.join(map(format_row, rows)) + ";\nCOMMIT;\n")
+
+def delta_rows(path):
+    """{table: [{column: value}]} of the rows upserted by a delta file"""
+    tables = {}
+    for match in _UPSERT.finditer(path.read_text(encoding='utf-8')):
+        columns = [column.strip('` ') for column in match.group(2).split(',')]
+        body = ('VALUES ' + match.group(3) + ';').encode('utf-8')
+        tables.setdefault(match.group(1), []).extend(
+            dict(zip(columns, map(decode_bytes, fields))) for fields in scan(body))
+    return tables
+
+def test_appended_product_only_changes_its_rows(dataset):
+    assert run_pipeline(dataset).returncode == 0
+
+    source = dataset / 'original-data'
+    products = sum(1 for _ in iter_rows(source / 'bulk.sql'))
+    for name, row in PRODUCT_DUMPS.items():
+        rewrite_dump(source / name, list(iter_rows(source / name)) + [row])
+
+    result = run_pipeline(dataset, '--format', 'delta')
+    assert result.returncode == 0, result.stdout
+    delta = (dataset / 'DROP-TABLE-DELTA.sql').read_text(encoding='utf-8')
+    assert 'DELETE' not in delta
+
+    new_id = products + 1
+    tables = delta_rows(dataset / 'DROP-TABLE-DELTA.sql')
+    assert [row['id'] for row in tables.pop('Product')] == [new_id]
+    retailers = {row['retailer_name'] for row in tables['Product_Summary']}
+    for name in ['Product_Retailer', 'Review', 'Product_Summary', 'Search_Term']:
+        assert tables[name] and {row['product_id'] for row in tables.pop(name)} == {new_id}, name
+
+    # Facet counts are aggregates: only the facets the new product falls under change
+    for row in tables.pop('Facet_Count'):
+        facet, value, value2 = row['facet'], row['value'], row['value2']
+        if facet == 'brand':
+            assert value == 'Anker'
+        elif facet == 'retailer':
+            assert value in retailers
+        elif facet.startswith('category'):
+            assert value == 'Electronics'
+            assert value2 in {'', 'Anker'} | retailers or facet in ('category+price', 'category+rating')
+        else:
+            assert facet in ('price', 'rating')
+    assert tables == {}
+
+def test_renumbered_products_are_refused(dataset):
+    assert run_pipeline(dataset).returncode == 0
+    snapshot = sorted((path.name, path.stat().st_mtime_ns) for path in (dataset / 'delta-snapshot').rglob('*'))
+
+    # Removing the first product shifts the id of every product after it
+    source = dataset / 'original-data'
+    for name in PRODUCT_DUMPS:
+        rewrite_dump(source / name, list(iter_rows(source / name))[1:])
+
+    result = run_pipeline(dataset, '--format', 'delta')
+    assert result.returncode != 0
+    assert 'renumbered' in result.stdout
+    assert not (dataset / 'DROP-TABLE-DELTA.sql').exists()
+    assert sorted((path.name, path.stat().st_mtime_ns) for path in (dataset / 'delta-snapshot').rglob('*')) == snapshot
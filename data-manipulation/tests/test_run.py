@@ -0,0 +1,29 @@
+"""The stage runner: a failed stage stops the build instead of exporting stale tables"""
+import json
+
+from conftest import run_pipeline
+
+def test_failed_stage_stops_the_export(dataset):
+    assert run_pipeline(dataset).returncode == 0
+    export = dataset / 'DROP-TABLE-COMPLETE.sql'
+    exported = export.stat().st_mtime_ns
+
+    (dataset / 'original-data' / 'reviews.json').write_text('{broken', encoding='utf-8')
+    result = run_pipeline(dataset)
+    assert result.returncode == 1
+    assert export.stat().st_mtime_ns == exported
+
+    # The failed stage and the stages after it lose their tables and cache entries
+    manipulated = dataset / 'manipulated-data'
+    cache = json.loads((manipulated / 'stage-cache.json').read_text())
+    for name, table in [('reviews', 'reviews'), ('product_summary', 'product_summary'), ('facets', 'facet_counts')]:
+        assert name not in cache
+        assert not (manipulated / table).exists()
+    report = json.loads((dataset / 'run-report.json').read_text())
+    assert report['stages']['reviews']['status'] == 'failed'
+    assert report['stages']['facets']['status'] == 'skipped'
+    assert report['final']['status'] == 'failed'
+
+    # A delta cannot pick up the old tables either
+    assert run_pipeline(dataset, '--format', 'delta').returncode == 1
+    assert not (dataset / 'DROP-TABLE-DELTA.sql').exists()
@@ -0,0 +1,13 @@
+"""Search_Term normalisation, checked against the vectors API/test/searchTerms.test.js checks the API with"""
+import json
+from pathlib import Path
+
+import pytest
+
+from search_index import search_terms
+
+VECTORS = json.loads((Path(__file__).parent / 'search_terms_vectors.json').read_text(encoding='utf-8'))
+
+@pytest.mark.parametrize('vector', VECTORS, ids=[vector['name'] for vector in VECTORS])
+def test_search_terms_match_vectors(vector):
+    assert sorted(search_terms(vector['text'])) == vector['terms']
@@ -0,0 +1,46 @@
+"""The SQL literal codec: decode/encode round trips, text and bytes paths agree"""
+import pytest
+
+from sqlcodec import decode, decode_bytes, encode, format_row, text_bytes
+from sqltokenizer import scan
+
+TEXTS = [
+    '',
+    'plain',
+    "it's",
+    "''",
+    'back\\slash \\n not a newline',
+    'Ünïcödé — 日本語 💾',
+    'nul\0 newline\n return\r tab\t backspace\b ctrl-z\x1a bell\x07 esc\x1b',
+    '\\%_ wildcards %_',
+    "'; DROP TABLE Product; --",
+]
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_text_round_trips(text):
+    literal = encode(text)
+    assert decode(literal) == text
+    assert decode_bytes(literal.encode('utf-8')) == text
+    assert text_bytes(literal.encode('utf-8')) == text.encode('utf-8')
+
+@pytest.mark.parametrize('value', [None, 0, -17, 2 ** 40, 3.25, -0.5, 1e-07])
+def test_scalars_round_trip(value):
+    assert decode(encode(value)) == value
+
+def test_rows_round_trip_through_the_tokenizer():
+    rows = [(1, text, None, 2.5) for text in TEXTS]
+    buf = ("INSERT INTO `t` VALUES " + ",\n".join(map(format_row, rows)) + ";").encode('utf-8')
+    assert [tuple(map(decode_bytes, fields)) for fields in scan(buf)] == rows
+
+def test_mariadb_escapes_decode():
+    assert decode("'it''s'") == "it's"
+    assert decode("'a\\'b'") == "a'b"
+    assert decode("'\\0\\b\\n\\r\\t\\Z'") == '\0\b\n\r\t\x1a'
+    # \% and \_ keep their backslash, any other escaped character stands for itself
+    assert decode("'\\%\\_\\q'") == '\\%\\_q'
+    assert text_bytes("'caf\\'é'".encode('utf-8')) == "caf'é".encode('utf-8')
+
+@pytest.mark.parametrize('literal', ['abc', '1.2.3', '0x1F'])
+def test_unsupported_literals_raise(literal):
+    with pytest.raises(ValueError):
+        decode(literal)
@@ -0,0 +1,66 @@
+"""The INSERT tuple tokenizer: quoting, shard boundaries and fields longer than a read chunk"""
+import io
+
+import pytest
+
+from sqltokenizer import scan, shard_ranges, tokenize, iter_raw_tuples, CHUNK_SIZE
+
+DUMP = (
+    "INSERT INTO `t` (`a`, `b`, `c`) VALUES\n"
+    "('it\\'s', 'it''s', NULL),\n"
+    "('back\\\\slash', '', -1.5e3),\n"
+    "('comma, paren) and ''quote''', 'x),(y', 42);\n"
+    "INSERT INTO `t` (`a`, `b`, `c`) VALUES ('Ünïcödé 💾', '\\'),(\\'', 0);\n"
+)
+TUPLES = [
+    ("'it\\'s'", "'it''s'", "NULL"),
+    ("'back\\\\slash'", "''", "-1.5e3"),
+    ("'comma, paren) and ''quote'''", "'x),(y'", "42"),
+    ("'Ünïcödé 💾'", "'\\'),(\\''", "0")
+]
+
+def test_scan_keeps_escaped_quotes_inside_fields():
+    assert [tuple(field.decode('utf-8') for field in fields) for fields in scan(DUMP.encode('utf-8'))] == TUPLES
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, CHUNK_SIZE])
+def test_tokenize_matches_scan_for_any_chunk_size(chunk_size):
+    assert list(tokenize(io.StringIO(DUMP), chunk_size)) == TUPLES
+
+def test_iter_raw_tuples_reads_a_file(tmp_path):
+    path = tmp_path / 'dump.sql'
+    path.write_text(DUMP, encoding='utf-8')
+    assert [tuple(field.decode('utf-8') for field in fields) for fields in iter_raw_tuples(path)] == TUPLES
+
+def test_tokenize_field_longer_than_chunk():
+    long_text = "a\\'b''" * (CHUNK_SIZE // 3) + "),(" * 5
+    stream = io.StringIO(f"INSERT INTO `t` (`a`, `b`) VALUES ('{long_text}', 1), ('short', 2);")
+    tuples = list(tokenize(stream))
+    assert len(tuples[0][0]) > CHUNK_SIZE
+    assert tuples == [(f"'{long_text}'", '1'), ("'short'", '2')]
+
+def scan_shards(buf, shards):
+    """The tuples of buf read shard by shard, as 4merge reads them"""
+    return [fields for start, stop, in_values in shard_ranges(buf, shards)
+            for fields in scan(buf, start, stop=stop, in_values=in_values)]
+
+def test_shards_give_the_sequential_tuples():
+    rows = [f"('row {i}', 'text with ), ( and ),( inside', {i})" for i in range(200)]
+    buf = ("INSERT INTO `t` VALUES " + ",\n".join(rows) + ";").encode('utf-8')
+    sequential = list(scan(buf))
+    assert len(sequential) == 200
+    for shards in range(1, 9):
+        try:
+            assert scan_shards(buf, shards) == sequential
+        except ValueError as e:
+            # A boundary found inside a string literal must be detected, never give different tuples
+            assert 'Shard boundary' in str(e)
+
+def test_boundary_inside_a_string_is_detected():
+    # The only "),(" candidates in the middle of the buffer are inside the long literal
+    literal = "'" + "x),(" * 1000 + "'"
+    buf = f"INSERT INTO `t` VALUES ('first', 1),({literal}, 2),('last', 3);".encode('utf-8')
+    ranges = shard_ranges(buf, 2)
+    assert len(ranges) == 2 and buf.index(literal.encode('utf-8')) < ranges[1][0]
+    with pytest.raises(ValueError, match='Shard boundary'):
+        scan_shards(buf, 2)
+    assert len(list(scan(buf))) == 3